@@ -0,0 +1,99 @@
+"""
+Primary module for portfolio analytics
+
+This module contains the drawdown and risk attribution analytics for the
+stock portfolio engine, which are calculated in one pass over the daily
+returns of a portfolio and its covariance matrix.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import numpy as np
+from stats import TRADING_DAYS
+
+def portfolio_analytics(returns, weights, cov_matrix, benchmark,
+trading_days=TRADING_DAYS, risk_free_rate=0.):
+    """
+    Calculates the drawdowns, downside risk, beta and risk attribution of a
+    portfolio with whole-array operations over its stock return matrix, so
+    the cost grows with the number of days times the number of stocks and
+    not with the number of metrics.
+
+    The marginal contribution to risk of a stock is the change in the
+    portfolio's annualized volatility per unit of the stock's weight, and
+    its component contribution is its weight times its marginal
+    contribution; the component contributions add up to the volatility.
+
+    The Sortino ratio measures both the excess return and the downside
+    deviation against the same target, the risk free rate: a day counts as
+    a loss when its return is below [risk_free_rate] / [trading_days].
+
+    Args:
+        returns             numpy array; (days x stocks) daily returns, with
+                            missing returns counted as 0
+        weights             numpy array; one weight per stock
+        cov_matrix          numpy array; annualized (stocks x stocks)
+                            covariance matrix
+        benchmark           numpy array; daily benchmark returns on the same
+                            days
+        trading_days        int
+        risk_free_rate      float; annual
+    Returns:
+        analytics           dict; "max_drawdown", "max_drawdown_start",
+                            "max_drawdown_end" (day positions of the peak
+                            and trough), "max_drawdown_duration" (longest
+                            number of days below a previous peak),
+                            "current_drawdown", "annual_return" (CAGR),
+                            "sortino", "calmar", "beta", "volatility",
+                            "marginal", "component" and "percent" (numpy
+                            arrays with one entry per stock)
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    daily = np.nan_to_num(returns).dot(weights)
+    nav = np.cumprod(1. + daily)
+
+    # drawdowns from the running peak of the net asset value, which starts
+    # at 1 before the first day
+    peaks = np.maximum.accumulate(np.concatenate([[1.], nav]))[1:]
+    drawdowns = nav / peaks - 1.
+    trough = int(np.argmin(drawdowns)) if len(drawdowns) > 0 else 0
+    highs = np.flatnonzero(nav[:trough + 1] >= peaks[trough]) \
+    if len(drawdowns) > 0 else []
+    peak = int(highs[-1]) if len(highs) > 0 else 0
+    # days at a new peak split the days into stretches under water
+    at_peak = np.flatnonzero(np.concatenate([[True], drawdowns >= 0.,
+    [True]]))
+    duration = int(np.max(np.diff(at_peak)) - 1) if len(at_peak) > 1 else 0
+    max_drawdown = -float(drawdowns.min()) if len(drawdowns) > 0 else 0.
+
+    years = len(daily) / trading_days
+    annual_return = float(nav[-1] ** (1. / years) - 1.) if years > 0 else 0.
+    excess = daily - risk_free_rate / trading_days
+    downside = np.sqrt(np.mean(np.minimum(excess, 0.) ** 2) * trading_days) \
+    if len(daily) > 0 else 0.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sortino = float(np.mean(excess) * trading_days / downside) \
+        if len(daily) > 0 else np.nan
+        calmar = annual_return / max_drawdown if max_drawdown > 0 else np.nan
+
+    benchmark = np.nan_to_num(np.asarray(benchmark, dtype=np.float64))
+    centered = benchmark - benchmark.mean()
+    variance = centered.dot(centered)
+    beta = float(centered.dot(daily - daily.mean()) / variance) \
+    if variance > 0 else np.nan
+
+    risk_contributions = cov_matrix.dot(weights)
+    volatility = float(np.sqrt(weights.dot(risk_contributions)))
+    marginal = risk_contributions / volatility if volatility > 0 \
+    else np.zeros(len(weights))
+    component = weights * marginal
+    percent = component / volatility if volatility > 0 \
+    else np.zeros(len(weights))
+
+    return {"max_drawdown": max_drawdown, "max_drawdown_start": peak,
+    "max_drawdown_end": trough, "max_drawdown_duration": duration,
+    "current_drawdown": -float(drawdowns[-1]) if len(drawdowns) > 0 else 0.,
+    "annual_return": annual_return, "sortino": sortino, "calmar": calmar,
+    "beta": beta, "volatility": volatility, "marginal": marginal,
+    "component": component, "percent": percent}
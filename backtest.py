@@ -0,0 +1,256 @@
+"""
+Primary module for backtests
+
+This module contains the historical backtester for the stock portfolio
+engine. The net asset value of a weighted portfolio is simulated with NumPy
+array operations over the aligned price matrix, rebalancing on a calendar
+schedule or whenever the weights drift too far from their targets.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import numpy as np
+import pandas as pd
+from stats import TRADING_DAYS, align_rates
+
+# calendar rebalancing schedules and the pandas period each one follows
+SCHEDULES = {
+    "daily": "D",
+    "weekly": "W",
+    "monthly": "M",
+    "quarterly": "Q",
+    "yearly": "Y",
+}
+
+class BacktestResult(object):
+    """
+    Holds the output of a backtest.
+
+    Args:
+        nav                 pandas Series; net asset value of the portfolio
+                            on each day
+        turnover            pandas Series; fraction of the portfolio traded
+                            on each rebalance date
+        costs               float; total transaction costs paid, where the
+                            starting net asset value is 1.0
+        trading_days        int
+        risk_free_rate      float, or pandas Series of the annual risk free
+                            rate indexed by date
+    """
+
+    def __init__(self, nav, turnover, costs, trading_days=TRADING_DAYS,
+    risk_free_rate=0.):
+        self.nav = nav
+        self.turnover = turnover
+        self.costs = costs
+        self.trading_days = trading_days
+        self.risk_free_rate = risk_free_rate
+
+    def summary(self):
+        """
+        Returns:
+            summary         dict; total return, annualized return (CAGR),
+                            annualized volatility, Sharpe ratio (over the
+                            average risk free rate during the backtest),
+                            number of rebalances and annualized turnover
+        """
+        daily = self.nav.pct_change().dropna()
+        risk_free_rate = align_rates(self.risk_free_rate, daily.index).mean() \
+        if len(daily) > 0 else 0.
+        years = len(daily) / float(self.trading_days)
+        total_return = self.nav.iloc[-1] / self.nav.iloc[0] - 1.
+        annual_return = (1. + total_return) ** (1. / years) - 1. \
+        if years > 0 else 0.
+        volatility = daily.std() * np.sqrt(self.trading_days)
+        return {
+            "total_return": total_return,
+            "annual_return": annual_return,
+            "volatility": volatility,
+            "sharpe_ratio": (annual_return - risk_free_rate) / volatility
+            if volatility > 0 else np.nan,
+            "rebalances": len(self.turnover),
+            "annual_turnover": self.turnover.sum() / years if years > 0
+            else 0.,
+        }
+
+def calendar_rebalances(index, schedule):
+    """
+    Returns the positions in [index] of the first trading day of every
+    period of [schedule], always including position 0.
+
+    Args:
+        index               pandas DatetimeIndex
+        schedule            string; key of SCHEDULES, or "none"
+    Returns:
+        positions           numpy int array
+    """
+    if schedule == "none":
+        return np.array([0])
+    periods = index.to_period(SCHEDULES[schedule]).asi8
+    changes = np.flatnonzero(periods[1:] != periods[:-1]) + 1
+    return np.concatenate(([0], changes))
+
+def drifted_weights(prices, start, weights, cash, cash_growth):
+    """
+    Returns the weights of every stock and of cash on each day from [start]
+    onwards if the portfolio was last rebalanced on day [start].
+
+    Args:
+        prices              numpy array; (days x stocks) price matrix
+        start               int; position of the rebalance day
+        weights             numpy array; target stock weights adding to 1
+        cash                float; target fraction held in cash
+        cash_growth         numpy array; growth of $1 of cash since day 0
+    Returns:
+        stock_weights,      numpy array tuple; (days x stocks) stock weights
+        cash_weights,       and days cash weights and portfolio growth since
+        growth              day [start]
+    """
+    stock_values = (1. - cash) * weights * prices[start:] / prices[start]
+    cash_values = cash * cash_growth[start:] / cash_growth[start]
+    growth = stock_values.sum(axis=1) + cash_values
+    return stock_values / growth[:, None], cash_values / growth, growth
+
+def threshold_rebalances(prices, weights, cash, cash_growth, threshold,
+chunk=256):
+    """
+    Returns the positions of the days on which the portfolio is rebalanced
+    because a stock's weight has drifted more than [threshold] from its
+    target. The drift after each rebalance is computed for [chunk] days at
+    a time, so only the days up to the next rebalance are looked at.
+
+    Args:
+        prices              numpy array; (days x stocks) price matrix
+        weights             numpy array; target stock weights
+        cash                float; target fraction held in cash
+        cash_growth         numpy array; growth of $1 of cash since day 0
+        threshold           float; largest allowed absolute drift
+        chunk               int
+    Returns:
+        positions           numpy int array
+    """
+    targets = (1. - cash) * weights
+    positions = [0]
+    start = 0
+    days = len(prices)
+    while True:
+        found = False
+        end = start
+        while end < days - 1 and not found:
+            end = min(end + chunk, days - 1)
+            stock_weights = drifted_weights(prices[:end + 1], start, weights,
+            cash, cash_growth[:end + 1])[0]
+            drift = np.abs(stock_weights[1:] - targets).max(axis=1)
+            breaches = np.flatnonzero(drift > threshold)
+            if len(breaches) > 0:
+                start = start + breaches[0] + 1
+                positions.append(start)
+                found = True
+        if not found:
+            return np.array(positions)
+
+def backtest(prices, weights, schedule="monthly", threshold=None,
+cost=0.001, cash=0., cash_rate=0., trading_days=TRADING_DAYS,
+risk_free_rate=0.):
+    """
+    Simulates the net asset value of a portfolio of the stocks in [prices]
+    starting at 1.0. The portfolio is rebalanced back to [weights] on the
+    first trading day of each [schedule] period or, if [threshold] is given,
+    whenever a stock's weight drifts more than [threshold] from its target.
+    Each rebalance pays [cost] per unit of portfolio value traded, and
+    [cash] of the portfolio is held in cash earning [cash_rate] a year.
+
+    Days before every stock has a price are skipped.
+
+    Args:
+        prices              pandas DataFrame; daily prices with one column
+                            per stock
+        weights             numpy array; target stock weights adding to 1,
+                            in column order
+        schedule            string; "daily", "weekly", "monthly",
+                            "quarterly", "yearly" or "none"
+        threshold           float; default is None for calendar rebalancing
+        cost                float; default is 0.001 (10 basis points)
+        cash                float; default is 0.0
+        cash_rate           float; default is 0.0
+        trading_days        int
+        risk_free_rate      float, or pandas Series of the annual risk free
+                            rate indexed by date, for the Sharpe ratio
+    Returns:
+        result              BacktestResult
+    """
+    prices = prices.ffill().dropna()
+    values = prices.values.astype(np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    cash_growth = (1. + cash_rate / trading_days) ** np.arange(len(values))
+
+    if threshold is None:
+        rebalances = calendar_rebalances(prices.index, schedule)
+    else:
+        rebalances = threshold_rebalances(values, weights, cash, cash_growth,
+        threshold)
+    return simulate(prices, rebalances, np.tile(weights, (len(rebalances), 1)),
+    cost, cash, cash_rate, trading_days, risk_free_rate)
+
+def simulate(prices, rebalances, weights, cost=0.001, cash=0., cash_rate=0.,
+trading_days=TRADING_DAYS, risk_free_rate=0.):
+    """
+    Simulates the net asset value of a portfolio of the stocks in [prices]
+    starting at 1.0, which is rebalanced to row k of [weights] on day
+    rebalances[k]. Each rebalance pays [cost] per unit of portfolio value
+    traded, and [cash] of the portfolio is held in cash earning [cash_rate]
+    a year.
+
+    Args:
+        prices              pandas DataFrame; daily prices with one column
+                            per stock and no missing prices
+        rebalances          numpy int array; increasing day positions,
+                            starting with 0
+        weights             numpy array; (rebalances x stocks) matrix of
+                            target stock weights, each row adding to 1
+        cost                float
+        cash                float
+        cash_rate           float
+        trading_days        int
+        risk_free_rate      float, or pandas Series of the annual risk free
+                            rate indexed by date, for the Sharpe ratio
+    Returns:
+        result              BacktestResult
+    """
+    values = prices.values.astype(np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    days = len(values)
+    cash_growth = (1. + cash_rate / trading_days) ** np.arange(days)
+
+    # position of the last rebalance on or before each day, and which
+    # rebalance that is
+    segment = np.searchsorted(rebalances, np.arange(days), side="right") - 1
+    starts = rebalances[segment]
+    stock_growth = np.einsum("ij,ij->i", values / values[starts],
+    weights[segment])
+    growth = (1. - cash) * stock_growth + cash * cash_growth \
+    / cash_growth[starts]
+
+    # drifted weights just before each rebalance after the first, and the
+    # fraction of the portfolio traded to reach the new targets
+    previous = rebalances[:-1]
+    current = rebalances[1:]
+    stock_values = (1. - cash) * weights[:-1] * values[current] \
+    / values[previous]
+    end_growth = stock_values.sum(axis=1) + cash * cash_growth[current] \
+    / cash_growth[previous]
+    drifted = stock_values / end_growth[:, None]
+    turnover = np.abs(drifted - (1. - cash) * weights[1:]).sum(axis=1)
+    traded = np.concatenate(([1. - cash], turnover))
+    fees = cost * traded
+
+    # value of the portfolio right after each rebalance
+    segment_growth = np.concatenate(([1.], end_growth))
+    rebalance_values = np.cumprod(segment_growth * (1. - fees))
+    nav = rebalance_values[segment] * growth
+
+    paid = rebalance_values / (1. - fees) * fees
+    return BacktestResult(pd.Series(nav, index=prices.index, name="NAV"),
+    pd.Series(traded, index=prices.index[rebalances], name="Turnover"),
+    paid.sum(), trading_days, risk_free_rate)
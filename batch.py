@@ -0,0 +1,459 @@
+"""
+Primary module for batch mode
+
+This module contains the batch mode of the stock portfolio engine, which
+runs commands read from a file or standard input without any prompts and
+writes one JSON object per command. Every command runs in the same process,
+so prices, statistics and optimizations loaded by one command are reused by
+the next.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import io
+import os
+import sys
+import json
+import contextlib
+import numpy as np
+import pandas as pd
+from portfolio import *
+from chart import *
+
+# stock information fields returned by "view [ticker] profile"
+PROFILE_FIELDS = ["longName", "shortName", "address1", "city", "state", "zip",
+    "country", "phone", "website", "sector", "industry", "fullTimeEmployees",
+    "longBusinessSummary"]
+
+# stock information fields returned by "view [ticker] statistics"
+STATISTICS_FIELDS = ["fiftyTwoWeekLow", "fiftyTwoWeekHigh", "52WeekChange",
+    "sharesOutstanding", "profitMargins", "dividendRate", "shortRatio"]
+
+# names of the optimization goals accepted by "optimize portfolio [goal]"
+GOALS = {"sharpe": "max_sharpe", "max_sharpe": "max_sharpe",
+    "volatility": "min_volatility", "min_volatility": "min_volatility"}
+
+def parse_line(line):
+    """
+    Splits a batch command [line] into its words and its inline options,
+    which are the words written as name=value.
+
+    Args:
+        line                string
+    Returns:
+        words,              tuple; string list of lowercase words, and dict
+        options             of option name to value (converted to a number
+                            or None where possible)
+    """
+    words = []
+    options = {}
+    for word in line.split():
+        name, equals, value = word.partition("=")
+        if equals == "":
+            words.append(word.lower())
+        else:
+            options[name.lower()] = option_value(value)
+    return words, options
+
+def option_value(value):
+    """
+    Args:
+        value               string
+    Returns:
+        value               int, float, None (for "none") or string
+    """
+    if value.lower() == "none":
+        return None
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    return value
+
+def to_json(value):
+    """
+    Converts [value] into something json.dumps can write: NumPy numbers and
+    arrays, pandas objects and dates become Python numbers, lists and
+    strings, and NaN becomes None.
+
+    Args:
+        value               any
+    Returns:
+        value               JSON serializable value
+    """
+    if isinstance(value, dict):
+        return dict((str(key), to_json(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return to_json(value.tolist())
+    if isinstance(value, pd.Series):
+        return to_json(value.to_dict())
+    if isinstance(value, pd.DataFrame):
+        return to_json(value.to_dict(orient="records"))
+    if isinstance(value, (pd.Timestamp, date)):
+        return str(value.date() if isinstance(value, pd.Timestamp) else value)
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+class BatchSession(object):
+    """
+    Runs batch commands against portfolio [name]. Commands are the same as
+    the menu's, with the answers to its prompts given inline, e.g.:
+
+        use retirement
+        add goog aapl msft
+        remove msft
+        lot goog 10 1500.25 [2020-05-01]
+        basis
+        view goog [profile | statistics | rolling | historical data]
+        search alphabet
+        portfolio [weights=0.5,0.5]
+        optimize portfolio sharpe [estimator=ledoit_wolf]
+        backtest [schedule=quarterly] [threshold=0.05] [cost=0.001]
+        walkforward [method=min_volatility] [lookback=504]
+        frontier [portfolios=100000] [path=frontier.npy]
+        sweep
+        risk [confidence=0.95,0.99] [horizon=10] [method=monte_carlo]
+        chart goog [rolling] [path=goog.svg] [format=png] [points=1000]
+        chart portfolio | backtest | frontier [path=...]
+
+    Args:
+        name                string; name of the portfolio, default is
+                            DEFAULT_PORTFOLIO
+    """
+
+    def __init__(self, name=DEFAULT_PORTFOLIO):
+        self.portfolio = Portfolio(name)
+        self.commands = {
+            "use": self.use,
+            "add": self.add,
+            "remove": self.remove,
+            "lot": self.lot,
+            "basis": self.basis,
+            "view": self.view,
+            "search": self.search,
+            "portfolio": self.show_portfolio,
+            "optimize": self.optimize,
+            "backtest": self.backtest,
+            "walkforward": self.walk_forward,
+            "frontier": self.frontier,
+            "sweep": self.sweep,
+            "risk": self.risk,
+            "chart": self.chart,
+        }
+
+    def execute(self, line):
+        """
+        Runs one batch command. Anything the command prints is discarded.
+
+        Args:
+            line            string
+        Returns:
+            record          dict; "command", "ok" and either "result" or
+                            "error" and "message"
+        """
+        record = {"command": line}
+        words, options = parse_line(line)
+        try:
+            if len(words) == 0 or words[0] not in self.commands:
+                raise Malformed
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = self.commands[words[0]](words[1:], options)
+            record.update({"ok": True, "result": to_json(result)})
+        except Exception as error:
+            record.update({"ok": False, "error": type(error).__name__,
+            "message": str(error)})
+        return record
+
+    def run(self, lines, output=sys.stdout):
+        """
+        Runs every command in [lines], skipping blank lines and lines
+        starting with "#", and writes one JSON object per command to
+        [output] as soon as it finishes.
+
+        Args:
+            lines           iterable of strings; e.g. an open file
+            output          file; default is standard output
+        Returns:
+            failures        int; number of commands that failed
+        """
+        failures = 0
+        for line in lines:
+            line = line.strip()
+            if line == "" or line.startswith("#"):
+                continue
+            record = self.execute(line)
+            if not record["ok"]:
+                failures += 1
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+        return failures
+
+    def require_stocks(self, minimum=1):
+        """
+        Raises:
+            ValueError      exception raised when the portfolio has fewer
+                            than [minimum] stocks
+        """
+        if len(self.portfolio.get_stock_list()) < minimum:
+            raise ValueError("the portfolio needs at least " + str(minimum)
+            + " stock" + ("s" if minimum > 1 else ""))
+
+    def portfolio_weights(self, options):
+        """
+        Returns the weights given with the "weights" option, or else the
+        saved weights, or else equally distributed weights.
+
+        Args:
+            options         dict
+        Returns:
+            weights         numpy array
+        """
+        if "weights" in options:
+            return self.portfolio.validate_weights(str(options["weights"]))
+        return self.portfolio.current_weights()
+
+    def use(self, words, options):
+        if len(words) != 1:
+            raise Malformed
+        self.portfolio = Portfolio(words[0])
+        return {"portfolio": words[0],
+        "stock_list": self.portfolio.get_stock_list()}
+
+    def add(self, words, options):
+        if len(words) == 0:
+            raise Malformed
+        pf_dict, failed = self.portfolio.add_stocks(words)
+        return {"stock_list": pf_dict["Stock List"], "failed": failed}
+
+    def remove(self, words, options):
+        if len(words) != 1:
+            raise Malformed
+        pf_dict = self.portfolio.remove_stock(words[0])
+        return {"stock_list": pf_dict["Stock List"]}
+
+    def lot(self, words, options):
+        if len(words) not in (3, 4):
+            raise Malformed
+        return basis_record(self.portfolio.add_lot(*words))
+
+    def basis(self, words, options):
+        if len(words) != 0:
+            raise Malformed
+        return basis_record(self.portfolio.cost_basis())
+
+    def view(self, words, options):
+        if len(words) == 0:
+            raise Malformed
+        symbol = capitalize(words[0])
+        check_symbol(symbol)
+        stock = Stock(symbol)
+        category = " ".join(words[1:])
+        if category == "":
+            price, market_cap = stock.get_summary()
+            return {"symbol": symbol, "price": price,
+            "market_cap": market_cap, "info": stock.get_info()}
+        elif category == "profile":
+            info = stock.get_info()
+            return dict([("symbol", symbol)] + [(field, info.get(field))
+            for field in PROFILE_FIELDS])
+        elif category == "statistics":
+            info = stock.get_info()
+            result = dict([("symbol", symbol)] + [(field, info.get(field))
+            for field in STATISTICS_FIELDS])
+            result.update(zip(STATISTICS_LABELS, stock.get_statistics()))
+            return result
+        elif category == "rolling":
+            risk_free_rates = self.portfolio.risk_free_rates(
+            minus_five_years())
+            return {"symbol": symbol, "windows": dict((str(window),
+            dict((name, values.iloc[-1]) for name, values
+            in stock.rolling_statistics(window, risk_free_rates).items()))
+            for window in WINDOWS)}
+        elif category == "historical data":
+            returns = get_price_history(symbol, minus_five_years()) \
+            .sort_index().pct_change()
+            return {"symbol": symbol,
+            "annual_return": returns.mean() * TRADING_DAYS,
+            "volatility": returns.std() * np.sqrt(TRADING_DAYS)}
+        raise Malformed
+
+    def search(self, words, options):
+        if len(words) == 0:
+            raise Malformed
+        return symbol_index.search(" ".join(words),
+        int(options.get("limit", 10)))
+
+    def show_portfolio(self, words, options):
+        result = self.score_portfolio(words, options)
+        if "weights" in options:
+            self.portfolio.set_weights(str(options["weights"]))
+        return result
+
+    def score_portfolio(self, words, options):
+        """
+        Scores the portfolio with the "weights" option, without saving them,
+        or else with its saved weights.
+        """
+        self.require_stocks()
+        weights = self.portfolio_weights(options)
+        risk_free_rate = self.portfolio.risk_free_rate()
+        expected_returns, expected_sd, sharpe_ratios, variances = \
+        get_stats_engine(self.portfolio.get_stock_list(), minus_ten_years()) \
+        .evaluate(weights, risk_free_rate)
+        return {"stock_list": self.portfolio.get_stock_list(),
+        "weights": weights, "expected_return": expected_returns[0],
+        "volatility": expected_sd[0], "sharpe_ratio": sharpe_ratios[0],
+        "variance": variances[0], "risk_free_rate": risk_free_rate,
+        "analytics": self.portfolio.portfolio_analytics(weights)}
+
+    def optimize(self, words, options):
+        if len(words) != 2 or words[0] != "portfolio" \
+        or words[1] not in GOALS:
+            raise Malformed
+        self.require_stocks(2)
+        session = self.portfolio.optimization_session(options.get("estimator"))
+        weights, performance = getattr(session, GOALS[words[1]])()
+        return {"goal": GOALS[words[1]], "weights": dict(weights),
+        "expected_return": performance[0], "volatility": performance[1],
+        "sharpe_ratio": performance[2]}
+
+    def run_backtest(self, options):
+        """
+        Args:
+            options         dict
+        Returns:
+            result          BacktestResult
+        """
+        self.require_stocks()
+        return self.portfolio.backtest(self.portfolio_weights(options),
+        options.get("schedule", "monthly"), options.get("threshold"),
+        options.get("cost", 0.001), options.get("cash", 0.),
+        options.get("cash_rate", 0.))
+
+    def backtest(self, words, options):
+        return backtest_record(self.run_backtest(options))
+
+    def walk_forward(self, words, options):
+        self.require_stocks(2)
+        result = self.portfolio.walk_forward(
+        options.get("method", "max_sharpe"), options.get("lookback", 756),
+        options.get("schedule", "quarterly"), options.get("estimator"),
+        options.get("cost", 0.001), options.get("processes"))
+        record = backtest_record(result)
+        record["weights"] = dict((str(day.date()), weights)
+        for day, weights in result.weights.iterrows())
+        return record
+
+    def frontier(self, words, options):
+        self.require_stocks(2)
+        with self.portfolio.efficient_frontier(options.get("portfolios",
+        1000000), options.get("processes"), options.get("path")) as result:
+            pass
+        stock_list = self.portfolio.get_stock_list()
+        return {"path": None if result.temporary else result.path,
+        "max_sharpe": {"sharpe_ratio": result.max_sharpe[0],
+        "weights": dict(zip(stock_list, result.max_sharpe[1]))},
+        "min_volatility": {"volatility": result.min_volatility[0],
+        "weights": dict(zip(stock_list, result.min_volatility[1]))},
+        "frontier": result.frontier}
+
+    def sweep(self, words, options):
+        self.require_stocks(2)
+        results = self.portfolio.parameter_sweep(processes=
+        options.get("processes"))
+        return {"path": os.path.join(DATA_DIR, "sweeps", "sweep.csv"),
+        "rows": len(results), "best": results.sort_values("sharpe_ratio",
+        ascending=False).iloc[0].to_dict()}
+
+    def risk(self, words, options):
+        self.require_stocks()
+        levels = [float(level) for level
+        in str(options.get("confidence", "0.95,0.99")).split(",")]
+        methods = [options["method"]] if "method" in options else METHODS
+        weights = self.portfolio_weights(options)
+        result = {"weights": weights, "horizon": options.get("horizon", 1)}
+        for method in methods:
+            var, cvar = self.portfolio.value_at_risk(weights, levels,
+            options.get("horizon", 1), method, options.get("scenarios",
+            100000), options.get("seed"))
+            result[method] = dict((str(level), {"var": var[i, 0],
+            "cvar": cvar[i, 0]}) for i, level in enumerate(levels))
+        return result
+
+    def chart(self, words, options):
+        if len(words) == 0 or len(words) > 2:
+            raise Malformed
+        chart = Chart(capitalize(words[0]), options.get("path"),
+        options.get("format", None if "path" in options else "png"),
+        options.get("points", MAX_POINTS),
+        portfolio=self.portfolio)
+        category = words[1] if len(words) == 2 else None
+        if words[0] == "portfolio" and category is None:
+            self.require_stocks()
+            path = chart.portfolio_stock_returns()
+        elif words[0] == "backtest" and category is None:
+            path = chart.backtest_chart(self.run_backtest(options))
+        elif words[0] == "frontier" and category is None:
+            self.require_stocks(2)
+            with self.portfolio.efficient_frontier(options.get("portfolios",
+            1000000), options.get("processes")) as result:
+                path = chart.efficient_frontier(result)
+        else:
+            check_symbol(chart.symbol)
+            if category is None or category == "history":
+                path = chart.historical_data_chart()
+            elif category == "rolling":
+                path = chart.rolling_statistics_chart(
+                options.get("window", WINDOWS[1]))
+            else:
+                raise Malformed
+        return {"path": path, "format": chart.format}
+
+def basis_record(cost_basis):
+    """
+    Args:
+        cost_basis          dict; stock to (shares, total cost, average cost)
+    Returns:
+        record              dict; stock to dict of "shares", "cost" and
+                            "average_cost"
+    """
+    return dict((symbol, {"shares": shares, "cost": cost,
+    "average_cost": average}) for symbol, (shares, cost, average)
+    in cost_basis.items())
+
+def backtest_record(result):
+    """
+    Args:
+        result              BacktestResult
+    Returns:
+        record              dict; backtest summary with its dates and
+                            transaction costs
+    """
+    record = result.summary()
+    record.update({"start": result.nav.index[0], "end": result.nav.index[-1],
+    "costs": result.costs})
+    return record
+
+def run_batch(path=None, name=DEFAULT_PORTFOLIO):
+    """
+    Runs the batch commands in the file at [path], or from standard input
+    if [path] is None or "-".
+
+    Args:
+        path                string
+        name                string; name of the portfolio to start with
+    Returns:
+        failures            int; number of commands that failed
+    """
+    session = BatchSession(name)
+    if path is None or path == "-":
+        return session.run(sys.stdin)
+    with open(path) as f:
+        return session.run(f)
@@ -0,0 +1,110 @@
+"""
+Primary module for the startup benchmark
+
+This module contains the startup benchmark for the stock portfolio engine,
+which starts the engine in a new process, times how long it takes to show
+its first prompt, and then times the first use of each of a list of
+commands, so that slow imports and slow first commands are easy to spot.
+
+    python benchmark.py [runs] ["command" "command" ...]
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import os
+import sys
+import time
+import subprocess
+
+# commands timed by default, none of which ask any follow-up questions
+DEFAULT_COMMANDS = ["search alphabet", "view aapl", "view aapl statistics",
+    "view aapl rolling", "backtest", "walkforward"]
+
+# prompt printed by the menu when it is ready for the next command
+PROMPT = b"> "
+
+def read_until_prompt(process):
+    """
+    Reads the output of [process] until the menu prompts for a command.
+
+    Args:
+        process         subprocess.Popen
+    Returns:
+        output          bytes; None if the process ended first
+    """
+    output = b""
+    while not output.endswith(PROMPT):
+        chunk = os.read(process.stdout.fileno(), 65536)
+        if chunk == b"":
+            return None
+        output = output + chunk
+    return output
+
+def time_session(commands):
+    """
+    Starts the engine in a new process and times how long it takes to show
+    its first prompt and to finish each of [commands]. Charts are drawn
+    without being shown.
+
+    Args:
+        commands        string list
+    Returns:
+        timings         list of (name, seconds) tuples, starting with
+                        "startup"
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    environment = dict(os.environ, MPLBACKEND="Agg")
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-u",
+    os.path.join(directory, "main.py")], cwd=directory, env=environment,
+    stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    timings = []
+    try:
+        if read_until_prompt(process) is None:
+            raise RuntimeError("the engine exited before its first prompt")
+        timings.append(("startup", time.perf_counter() - start))
+        for command in commands:
+            start = time.perf_counter()
+            process.stdin.write(command.encode() + b"\n")
+            process.stdin.flush()
+            if read_until_prompt(process) is None:
+                raise RuntimeError("the engine exited during " + command)
+            timings.append((command, time.perf_counter() - start))
+        process.stdin.write(b"quit\n")
+        process.stdin.flush()
+        process.wait(timeout=30)
+    finally:
+        if process.poll() is None:
+            process.kill()
+    return timings
+
+def run_benchmark(commands=DEFAULT_COMMANDS, runs=3):
+    """
+    Times [runs] sessions of [commands] and prints the fastest and median
+    time of the startup and of each command's first use.
+
+    Args:
+        commands        string list
+        runs            int
+    Returns:
+        timings         dict; name to list of seconds, one per run
+    """
+    timings = {}
+    for run in range(runs):
+        for name, seconds in time_session(commands):
+            timings.setdefault(name, []).append(seconds)
+    width = max(len(name) for name in timings)
+    print("First use".ljust(width) + "       min    median")
+    for name, seconds in timings.items():
+        seconds = sorted(seconds)
+        print(name.ljust(width) + "  " + ("%8.3f" % seconds[0])
+        + ("%10.3f" % seconds[len(seconds) // 2]))
+    return timings
+
+if __name__ == "__main__":
+    arguments = sys.argv[1:]
+    runs = 3
+    if len(arguments) > 0 and arguments[0].isdigit():
+        runs = int(arguments.pop(0))
+    run_benchmark(arguments or DEFAULT_COMMANDS, runs)
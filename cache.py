@@ -0,0 +1,140 @@
+"""
+Primary module for caches
+
+This module contains the price history cache for the stock portfolio engine.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from datetime import date
+from store import *
+
+class PriceCache(object):
+    """
+    Keeps price history in memory so that repeated calculations on the same
+    stocks do not read the price store again. Entries are keyed by
+    (symbols, start, end, field), expire after [ttl] seconds, and the least
+    recently used entry is evicted once the cache holds more than
+    [max_entries] entries. The cache can be shared between threads.
+
+    Args:
+        ttl             float; number of seconds an entry stays fresh
+        max_entries     int; maximum number of entries kept in the cache
+    """
+
+    def __init__(self, ttl=900, max_entries=32):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def make_key(self, symbols, start, end, field):
+        """
+        Builds the cache key for a price history request. A list of symbols
+        is keyed by its set of symbols, so the same stocks in a different
+        order share one entry.
+
+        Args:
+            symbols         string or string list
+            start           string; formatted YYYY-MM-DD
+            end             string; formatted YYYY-MM-DD
+            field           string; price column, e.g. "Adj Close"
+        Returns:
+            key             tuple
+        """
+        if isinstance(symbols, str):
+            return (symbols, start, end, field)
+        return (tuple(sorted(set(symbols))), start, end, field)
+
+    def get(self, key):
+        """
+        Returns the cached value for [key], or None if there is no entry or
+        the entry has expired. A hit marks the entry as most recently used.
+
+        Args:
+            key             tuple
+        Returns:
+            value           pandas DataFrame or Series, or None
+        """
+        with self.lock:
+            if key not in self.entries:
+                return None
+            stored_at, value = self.entries[key]
+            if time.time() - stored_at > self.ttl:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        """
+        Stores [value] under [key], evicting the least recently used entries
+        if the cache is full.
+
+        Args:
+            key             tuple
+            value           pandas DataFrame or Series
+        """
+        with self.lock:
+            self.entries[key] = (time.time(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes every entry from the cache.
+        """
+        with self.lock:
+            self.entries.clear()
+
+    def get_history(self, symbols, start, end=None, field="Adj Close"):
+        """
+        Returns the daily [field] prices of [symbols] between [start] and
+        [end], reading them from the price store only on a cache miss.
+
+        Args:
+            symbols         string or string list
+            start           string; formatted YYYY-MM-DD
+            end             string; formatted YYYY-MM-DD, default is today
+            field           string; default is "Adj Close"
+        Returns:
+            prices          pandas Series if [symbols] is a string, pandas
+                            DataFrame with one column per symbol otherwise
+        """
+        if end is None:
+            end = str(date.today())
+        key = self.make_key(symbols, start, end, field)
+        prices = self.get(key)
+        if prices is None:
+            if isinstance(symbols, str):
+                prices = price_store.get_history(symbols, start, end, field)
+            else:
+                prices = price_store.get_history(list(key[0]), start, end,
+                field)
+            self.put(key, prices)
+
+        if isinstance(symbols, str):
+            return prices.copy()
+        return prices[list(symbols)].copy()
+
+price_cache = PriceCache()
+
+def get_price_history(symbols, start, end=None, field="Adj Close"):
+    """
+    Returns the daily [field] prices of [symbols] between [start] and [end]
+    through the shared price cache.
+
+    Args:
+        symbols             string or string list
+        start               string; formatted YYYY-MM-DD
+        end                 string; formatted YYYY-MM-DD, default is today
+        field               string; default is "Adj Close"
+    Returns:
+        prices              pandas Series or DataFrame
+    """
+    return price_cache.get_history(symbols, start, end, field)
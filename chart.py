@@ -10,51 +10,388 @@ May 3rd, 2020
 from stock import *
 from portfolio import *
 from datetime import date
+import os
+import time
+import shutil
+import tempfile
+import threading
+import hashlib
 import pandas as pd
-import pandas_datareader as web
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib import style
-import matplotlib as mpl
-from pandas.plotting import register_matplotlib_converters
-register_matplotlib_converters()
+from store import DATA_DIR
+
+# matplotlib's pyplot module, imported by pyplot on first use
+plt = None
+
+# largest number of points drawn for each line of a chart
+MAX_POINTS = 1000
+
+# file formats a chart can be saved in
+FORMATS = ("png", "svg")
+
+# number of seconds a saved chart is kept after it was last used
+MAX_AGE = 30*86400
+
+# largest number of saved charts kept
+MAX_CHARTS = 256
+
+# number of seconds a saved chart is kept after it was last used, whatever
+# the limits, so that the request it was drawn or looked up for can still
+# read it
+MIN_AGE = 60
+
+# held while a chart is drawn, since neither matplotlib nor pandas' plotting
+# can draw from many threads at once
+draw_lock = threading.Lock()
+
+def pyplot():
+    """
+    Imports matplotlib on the first chart drawn, since it takes a long time
+    to import and most commands never draw a chart.
+
+    Returns:
+        plt             matplotlib pyplot module
+    """
+    global plt
+    if plt is None:
+        import matplotlib.pyplot
+        from pandas.plotting import register_matplotlib_converters
+        register_matplotlib_converters()
+        plt = matplotlib.pyplot
+    return plt
+
+def lttb(x, y, n_points):
+    """
+    Picks [n_points] of the points ([x], [y]) that keep the shape of the
+    line through them, with the Largest-Triangle-Three-Buckets algorithm:
+    the first and last points are kept, and the points in between are split
+    into equal buckets, from each of which the point forming the largest
+    triangle with the point kept from the bucket before and the average of
+    the bucket after is kept.
+
+    Args:
+        x               numpy float array; increasing
+        y               numpy float array
+        n_points        int
+    Returns:
+        positions       numpy int array; positions of the points kept
+    """
+    n = len(x)
+    if n_points >= n or n_points < 3:
+        return np.arange(n)
+    edges = (np.arange(n_points - 1) * (n - 2) / (n_points - 2)).astype(int) \
+    + 1
+    edges[-1] = n - 1
+    positions = np.zeros(n_points, dtype=int)
+    kept = 0
+    for bucket in range(n_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        average_x = x[end:next_end].mean()
+        average_y = y[end:next_end].mean()
+        areas = np.abs((x[kept] - average_x) * (y[start:end] - y[kept])
+        - (x[kept] - x[start:end]) * (average_y - y[kept]))
+        kept = start + int(np.argmax(areas))
+        positions[bucket + 1] = kept
+    positions[-1] = n - 1
+    return positions
+
+def downsample(series, max_points=MAX_POINTS):
+    """
+    Returns at most [max_points] of the values of [series], picked with
+    lttb so that the line drawn through them looks like the full series.
+
+    Args:
+        series          pandas Series
+        max_points      int; None to keep every value
+    Returns:
+        series          pandas Series
+    """
+    series = series.dropna()
+    if max_points is None or len(series) <= max_points:
+        return series
+    if isinstance(series.index, pd.DatetimeIndex):
+        x = series.index.asi8.astype(np.float64)
+    else:
+        x = np.arange(len(series), dtype=np.float64)
+    return series.iloc[lttb(x, series.values.astype(np.float64), max_points)]
+
+def data_version(data):
+    """
+    Returns a digest of [data], so that a chart is drawn again when the data
+    it shows changes.
+
+    Args:
+        data            list of pandas Series, DataFrames or numpy arrays
+    Returns:
+        version         string
+    """
+    digest = hashlib.sha1()
+    for item in data:
+        if isinstance(item, (pd.Series, pd.DataFrame)):
+            digest.update(pd.util.hash_pandas_object(item).values.tobytes())
+            if isinstance(item, pd.DataFrame):
+                digest.update(str(list(item.columns)).encode())
+        else:
+            digest.update(np.ascontiguousarray(item).tobytes())
+    return digest.hexdigest()
 
 class Chart():
     """
-    Creates charts for stock interested.
+    Creates charts for stock interested. Charts are shown in a window,
+    unless [path] or [format] is given: then they are drawn without a
+    display, with matplotlib's Agg renderer, and saved as a file. Saved
+    charts are kept in [directory], keyed by the kind of chart, its symbols,
+    its date range and the version of the data it shows, so drawing the same
+    chart again only copies the saved file. Saved charts not used for
+    [max_age] seconds are removed, and so are the least recently used ones
+    beyond [max_charts], except those used in the last MIN_AGE seconds.
+    Charts can be rendered from many threads at once: saved charts are
+    looked up concurrently, while drawing takes turns, and each chart is
+    saved to its own temporary file before being moved into place.
 
     Args:
         symbol      string; ticker symbol of the stock interested
+        path        string; file the chart is saved to, as PNG or SVG
+                    depending on its extension, default is None
+        format      string; "png" or "svg", default is the extension of
+                    [path], or "png"
+        max_points  int; largest number of points drawn for each line
+        directory   string; folder where saved charts are kept
+        portfolio   Portfolio; portfolio charted, default is user's portfolio
+        max_age     float; number of seconds a saved chart is kept unused
+        max_charts  int; largest number of saved charts kept
     """
 
-    def __init__(self, symbol):
+    def __init__(self, symbol, path=None, format=None, max_points=MAX_POINTS,
+    directory=os.path.join(DATA_DIR, "charts"), portfolio=None,
+    max_age=MAX_AGE, max_charts=MAX_CHARTS):
         self.symbol = symbol
+        self.portfolio = portfolio if portfolio is not None else Portfolio()
+        self.path = path
+        if format is None and path is not None:
+            format = os.path.splitext(path)[1][1:].lower() or "png"
+        if format is not None and format not in FORMATS:
+            raise ValueError("charts can only be saved as "
+            + " or ".join(FORMATS))
+        self.format = format
+        self.max_points = max_points
+        self.directory = directory
+        self.max_age = max_age
+        self.max_charts = max_charts
+
+    def headless(self):
+        """
+        Returns:
+            headless    bool; True if charts are saved instead of shown
+        """
+        return self.format is not None
+
+    def render(self, name, symbols, start, end, data, draw, rows=1):
+        """
+        Draws a chart on [rows] axes sharing their x axis by calling [draw]
+        with the axes, and shows it or saves it.
+
+        Args:
+            name        string; kind of chart
+            symbols     string list; symbols the chart shows
+            start       string; first date the chart shows
+            end         string; last date the chart shows
+            data        list; the data the chart shows, to version it
+            draw        function; takes a list of matplotlib Axes
+            rows        int
+        Returns:
+            path        string; location of the saved chart, or None if it
+                        was shown
+        """
+        if not self.headless():
+            figure, axes = pyplot().subplots(rows, 1, sharex=True,
+            squeeze=False)
+            draw(list(axes[:, 0]))
+            plt.show()
+            return None
+
+        key = hashlib.sha1("|".join([name, ",".join(sorted(symbols)),
+        str(start), str(end), str(self.max_points), data_version(data)])
+        .encode()).hexdigest()
+        cached_path = os.path.join(self.directory, key + "." + self.format)
+        try:
+            # marks the saved chart as used, if it was not removed
+            os.utime(cached_path)
+        except FileNotFoundError:
+            from matplotlib.figure import Figure
+            os.makedirs(self.directory, exist_ok=True)
+            descriptor, tmp_path = tempfile.mkstemp(prefix=key + "-",
+            suffix=".tmp", dir=self.directory)
+            try:
+                with os.fdopen(descriptor, "wb") as f, draw_lock:
+                    figure = Figure()
+                    axes = figure.subplots(rows, 1, sharex=True,
+                    squeeze=False)
+                    draw(list(axes[:, 0]))
+                    figure.tight_layout()
+                    figure.savefig(f, format=self.format)
+                os.replace(tmp_path, cached_path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+            self.prune()
+        if self.path is None:
+            return cached_path
+        if os.path.abspath(self.path) != os.path.abspath(cached_path):
+            shutil.copyfile(cached_path, self.path)
+        return self.path
+
+    def prune(self):
+        """
+        Removes the saved charts in the chart folder last used more than
+        [max_age] seconds ago, then the least recently used ones until at
+        most [max_charts] are left. Charts used in the last MIN_AGE seconds,
+        such as the one just saved, are never removed.
+        """
+        charts = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() \
+            and os.path.splitext(entry.name)[1][1:] in FORMATS:
+                try:
+                    charts.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    continue
+        charts.sort(reverse=True)
+        now = time.time()
+        for position, (used_at, path) in enumerate(charts):
+            if used_at < now - MIN_AGE and (used_at < now - self.max_age
+            or position >= self.max_charts):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
 
     def historical_data_chart(self):
+        """
+        Plots the adjusted closing price of the stock interested over the
+        past ten years.
+
+        Returns:
+            path            string; location of the saved chart, or None
+        """
         period1 = minus_ten_years()
         period2 = str(date.today())
-        stock = web.get_data_yahoo(self.symbol, period1, period2)
-        stock['Adj Close'].plot()
-        plt.xlabel("Date")
-        plt.ylabel("Adjusted Closing Price")
-        plt.title(self.symbol + " Historical Price Data")
-        plt.show()
+        stock = get_price_history(self.symbol, period1, period2)
+
+        def draw(axes):
+            downsample(stock, self.max_points).plot(ax=axes[0])
+            axes[0].set_xlabel("Date")
+            axes[0].set_ylabel("Adjusted Closing Price")
+            axes[0].set_title(self.symbol + " Historical Price Data")
+        return self.render("history", [self.symbol], period1, period2,
+        [stock], draw)
+
+    def rolling_statistics_chart(self, window=WINDOWS[1]):
+        """
+        Plots the rolling annualized return, volatility, Sharpe ratio and beta
+        of the stock interested over windows of [window] trading days.
+
+        Args:
+            window          int
+        Returns:
+            path            string; location of the saved chart, or None
+        """
+        statistics = Stock(self.symbol).rolling_statistics(window,
+        self.portfolio.risk_free_rates(minus_five_years()))
+        names = (("return", "Return"), ("volatility", "Volatility"),
+        ("sharpe", "Sharpe Ratio"), ("beta", "Beta"))
+
+        def draw(axes):
+            for axis, (name, label) in zip(axes, names):
+                downsample(statistics[name], self.max_points).plot(ax=axis)
+                axis.set_ylabel(label)
+            axes[-1].set_xlabel("Date")
+            axes[0].set_title(self.symbol + " Rolling " + str(window)
+            + "-Day Statistics")
+        return self.render("rolling-" + str(window), [self.symbol],
+        minus_five_years(), str(date.today()),
+        [statistics[name] for name, label in names], draw, rows=4)
 
     def portfolio_stock_returns(self):
-        stock_list = Portfolio().get_stock_list()
+        """
+        Plots the daily and monthly cumulative returns of the stocks in
+        user's portfolio and of the portfolio itself, weighted by its saved
+        weights (or equally), over the past ten years.
+
+        Returns:
+            path            string; location of the saved chart, or None
+        """
+        stock_list = self.portfolio.get_stock_list()
+        weights = self.portfolio.current_weights()
         period1 = minus_ten_years()
         period2 = str(date.today())
-        stocks = web.get_data_yahoo(stock_list, period1, period2)
-        stocks_daily_returns = stocks['Adj Close'].pct_change()
-        stocks_monthly_returns = stocks['Adj Close'].resample('M').ffill().pct_change()
-
-        daily = (stocks_daily_returns + 1).cumprod().plot()
-        daily.set_xlabel("Date")
-        daily.set_ylabel("Growth of $1 Investment")
-        daily.set_title("Your Stock Portfolio Daily Cumulative Returns Data")
-
-        monthly = (stocks_monthly_returns + 1).cumprod().plot()
-        monthly.set_xlabel("Date")
-        monthly.set_ylabel("Growth of $1 Investment")
-        monthly.set_title("Your Stock Portfolio Monthly Cumulative Returns Data")
-        plt.show()
\ No newline at end of file
+        series = self.portfolio.return_series(period1, period2)
+
+        def draw(axes):
+            for axis, frequency in zip(axes, ("daily", "monthly")):
+                growth = series.cumulative(frequency)
+                for symbol in stock_list:
+                    downsample(growth[symbol], self.max_points).plot(ax=axis,
+                    label=symbol)
+                downsample(series.portfolio_cumulative(weights, frequency),
+                self.max_points).plot(ax=axis, label="Portfolio", color="black",
+                linewidth=2)
+                axis.legend()
+                axis.set_ylabel("Growth of $1 Investment")
+                axis.set_title("Your Stock Portfolio " + frequency.capitalize()
+                + " Cumulative Returns Data")
+            axes[-1].set_xlabel("Date")
+        return self.render("returns", stock_list, period1, period2,
+        [series.prices, weights], draw, rows=2)
+
+    def backtest_chart(self, result):
+        """
+        Plots the net asset value of a backtested portfolio, marking the days
+        it was rebalanced.
+
+        Args:
+            result          BacktestResult
+        Returns:
+            path            string; location of the saved chart, or None
+        """
+        def draw(axes):
+            downsample(result.nav, self.max_points).plot(ax=axes[0])
+            result.nav.loc[result.turnover.index].plot(ax=axes[0],
+            style="r.", markersize=3)
+            axes[0].set_xlabel("Date")
+            axes[0].set_ylabel("Growth of $1 Investment")
+            axes[0].set_title("Your Stock Portfolio Backtest")
+        return self.render("backtest", self.portfolio.get_stock_list(),
+        result.nav.index[0].date(), result.nav.index[-1].date(),
+        [result.nav, result.turnover], draw)
+
+    def efficient_frontier(self, result, max_points=50000):
+        """
+        Plots the sampled portfolios of a FrontierResult colored by Sharpe
+        ratio, together with the traced efficient frontier. At most
+        [max_points] sampled portfolios are drawn.
+
+        Args:
+            result          FrontierResult
+            max_points      int
+        Returns:
+            path            string; location of the saved chart, or None
+        """
+        samples = result.samples()
+        step = max(1, len(samples) // max_points)
+        samples = np.asarray(samples[::step])
+
+        def draw(axes):
+            points = axes[0].scatter(samples[:, 1], samples[:, 0],
+            c=samples[:, 2], s=1, cmap="viridis")
+            axes[0].figure.colorbar(points, ax=axes[0], label="Sharpe Ratio")
+            if len(result.frontier) > 0:
+                axes[0].plot(result.frontier[:, 1], result.frontier[:, 0],
+                "r-", label="Efficient Frontier")
+                axes[0].legend()
+            axes[0].set_xlabel("Annualized Volatility")
+            axes[0].set_ylabel("Annualized Expected Return")
+            axes[0].set_title("Your Stock Portfolio Efficient Frontier")
+        return self.render("frontier", self.portfolio.get_stock_list(), None,
+        None, [samples, np.asarray(result.frontier)], draw)
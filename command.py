@@ -9,6 +9,51 @@ May 3rd, 2020
 
 from help import *
 
+# words that can follow a ticker symbol in a view command
+VIEW_CATEGORIES = ("profile", "statistics", "chart", "rolling", "historical",
+    "data")
+
+# commands that are entered on their own, without anything after them
+STANDALONE_COMMANDS = ("portfolio", "basis", "frontier", "backtest",
+    "walkforward", "sweep", "risk", "help", "quit")
+
+# command handlers registered with the register decorator, by command name
+COMMANDS = {}
+
+def register(name):
+    """
+    Returns a decorator that registers the decorated function as the handler
+    of command [name]. A handler takes the parsed command (as returned by
+    parse) without its first word.
+
+    Args:
+        name                string; lowercase command name
+    Returns:
+        decorator           function
+    """
+    def decorator(handler):
+        COMMANDS[name] = handler
+        return handler
+    return decorator
+
+def dispatch(input):
+    """
+    Parses string [input] once and runs the handler registered for its
+    command.
+
+    Args:
+        input               string
+    Raises:
+        Empty               exception when command inputted is empty
+        Malformed           exception when command is malformed or no
+                            handler is registered for it
+    """
+    parsed = parse(input)
+    handler = COMMANDS.get(parsed[0])
+    if handler is None:
+        raise Malformed
+    handler(parsed[1:])
+
 def parse(input):
     """
     Returns string [input] parsed into a string list.
@@ -21,6 +66,15 @@ def parse(input):
         [command,           string list containing commands "view", "add", or
         ticker_symbol]      "remove" (depending on which one is called) and
                             the ticker symbol that follows
+        [command,           list containing command "view" or "add" and a
+        ticker_symbols]     string list of the ticker symbols that follow,
+                            when more than one ticker symbol is entered
+        [command, query]    string list containing command "search" and the
+                            words that follow
+        [command,           string list containing command "lot", the ticker
+        ticker_symbol,      symbol that follows, and the shares, price and
+        shares, price,      (optionally) date of the purchase
+        date]
     Raises:
         Empty               exception when command inputted is empty
         Malformed           exception when command is malformed; in other
@@ -44,9 +98,17 @@ def parse(input):
                 ticker_symbol = remove_empty[1]
                 after_command = remove_empty[1:]
                 category = remove_empty[2:]
-                if ((command == "view" or command == "add" or command == "remove")
+                if (command == "search"):
+                    return [command, " ".join(after_command)]
+                elif (command == "lot" and len(after_command) in (3, 4)):
+                    return [command, capitalize(ticker_symbol)] \
+                    + after_command[1:]
+                elif ((command == "view" or command == "add" or command == "remove")
                 and (len(category) == 0)):
                     return [command, capitalize(ticker_symbol)]
+                elif ((command == "view" or command == "add")
+                and not any(word in VIEW_CATEGORIES for word in category)):
+                    return [command, [capitalize(x) for x in after_command]]
                 elif (command == "optimize" and len(after_command) == 1):
                     portfolio = after_command[0]
                     if (portfolio == "portfolio"):
@@ -55,10 +117,10 @@ def parse(input):
                         raise Malformed
                 elif (command == "view" and len(category) == 1):
                     second_command = category[0]
-                    if (second_command == "profile" or second_command == "statistics" or second_command == "chart") \
-                    and (not after_command[0] == "portfolio"):
+                    if (second_command == "profile" or second_command == "statistics" or second_command == "chart"
+                    or second_command == "rolling") and (not after_command[0] == "portfolio"):
                         return [command, capitalize(ticker_symbol), category[0]]
-                    elif (second_command == "chart") and (after_command[0] == "portfolio"):
+                    elif (second_command == "chart" or second_command == "rolling") and (after_command[0] == "portfolio"):
                         return [command, lower(ticker_symbol), category[0]]
                     else:
                         raise Malformed
@@ -72,7 +134,7 @@ def parse(input):
                 else:
                     raise Malformed
             elif (len(remove_empty) == 1):
-                if (command == "portfolio" or command == "help" or command == "quit"):
+                if command in STANDALONE_COMMANDS:
                     return [command]
                 else:
                     raise Malformed
@@ -100,4 +162,10 @@ class Malformed(Exception):
     """
     Raised when the input command is malformed.
     """
+    pass
+
+class Quit(Exception):
+    """
+    Raised by the quit command to end the menu loop.
+    """
     pass
\ No newline at end of file
@@ -0,0 +1,334 @@
+"""
+Primary module for covariance estimators
+
+This module contains the covariance estimators for the stock portfolio
+engine. Every estimator keeps running sums of the daily returns it has seen,
+so adding a new day of returns, or removing the oldest one from a rolling
+window, is a rank-1 update whose cost does not depend on how much history
+came before it.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import numpy as np
+
+class CovarianceEstimator(object):
+    """
+    Interface that every covariance estimator implements. Estimators work on
+    daily returns and return daily (not annualized) covariance matrices.
+    Days with a missing return for any stock are skipped unless the
+    estimator accepts missing returns.
+    """
+
+    # whether update and remove take days with missing (NaN) returns
+    accepts_missing = False
+
+    def fit(self, returns):
+        """
+        Resets the estimator to the daily returns in [returns]. Days with a
+        missing return for any stock are skipped.
+
+        Args:
+            returns         pandas DataFrame or numpy array; (days x stocks)
+        Returns:
+            self            CovarianceEstimator
+        """
+        returns = np.asarray(returns, dtype=np.float64)
+        returns = returns[~np.isnan(returns).any(axis=1)]
+        self.reset(returns.shape[1])
+        for row in returns:
+            self.update(row)
+        return self
+
+    def reset(self, n_stocks):
+        """
+        Clears all running sums for [n_stocks] stocks.
+
+        Args:
+            n_stocks        int
+        """
+        raise NotImplementedError
+
+    def update(self, row):
+        """
+        Adds one day of returns to the running sums.
+
+        Args:
+            row             numpy array; one return per stock
+        """
+        raise NotImplementedError
+
+    def remove(self, row):
+        """
+        Takes one day of returns that was added before back out of the
+        running sums, so that the oldest day of a rolling window can be
+        dropped.
+
+        Args:
+            row             numpy array; one return per stock
+        """
+        raise NotImplementedError
+
+    def covariance(self):
+        """
+        Returns:
+            cov_matrix      numpy array; daily covariance matrix
+        """
+        raise NotImplementedError
+
+class SampleCovariance(CovarianceEstimator):
+    """
+    Sample covariance, kept with Welford's online algorithm.
+    """
+
+    def fit(self, returns):
+        returns = np.asarray(returns, dtype=np.float64)
+        returns = returns[~np.isnan(returns).any(axis=1)]
+        self.n = len(returns)
+        self.mean = returns.mean(axis=0)
+        centered = returns - self.mean
+        self.m2 = centered.T.dot(centered)
+        return self
+
+    def reset(self, n_stocks):
+        self.n = 0
+        self.mean = np.zeros(n_stocks)
+        self.m2 = np.zeros((n_stocks, n_stocks))
+
+    def update(self, row):
+        self.n += 1
+        delta = row - self.mean
+        self.mean = self.mean + delta / self.n
+        self.m2 += np.outer(delta, row - self.mean)
+
+    def remove(self, row):
+        self.n -= 1
+        if self.n == 0:
+            self.reset(len(row))
+            return
+        mean = self.mean - (row - self.mean) / self.n
+        self.m2 -= np.outer(row - mean, row - self.mean)
+        self.mean = mean
+
+    def covariance(self):
+        return self.m2 / (self.n - 1)
+
+class PairwiseCovariance(CovarianceEstimator):
+    """
+    Sample covariance where every pair of stocks uses the days on which both
+    have a return, the same as the pandas DataFrame.cov, so that stocks with
+    a shorter history do not shorten the history of the others. It keeps,
+    for every pair, the number of shared days and the sums of returns and of
+    products over them.
+    """
+
+    accepts_missing = True
+
+    def fit(self, returns):
+        returns = np.asarray(returns, dtype=np.float64)
+        present = (~np.isnan(returns)).astype(np.float64)
+        values = np.nan_to_num(returns)
+        self.n = present.T.dot(present)
+        self.sums = values.T.dot(present)
+        self.products = values.T.dot(values)
+        return self
+
+    def reset(self, n_stocks):
+        self.n = np.zeros((n_stocks, n_stocks))
+        self.sums = np.zeros((n_stocks, n_stocks))
+        self.products = np.zeros((n_stocks, n_stocks))
+
+    def update(self, row):
+        present = (~np.isnan(row)).astype(np.float64)
+        values = np.nan_to_num(row)
+        self.n += np.outer(present, present)
+        self.sums += np.outer(values, present)
+        self.products += np.outer(values, values)
+
+    def remove(self, row):
+        present = (~np.isnan(row)).astype(np.float64)
+        values = np.nan_to_num(row)
+        self.n -= np.outer(present, present)
+        self.sums -= np.outer(values, present)
+        self.products -= np.outer(values, values)
+
+    def covariance(self):
+        # sums[i, j] is the sum of stock i's returns on the days stock j also
+        # has a return
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = (self.products - self.sums * self.sums.T / self.n) \
+            / (self.n - 1)
+        return np.where(self.n > 1, cov, np.nan)
+
+class LedoitWolfCovariance(CovarianceEstimator):
+    """
+    Ledoit-Wolf covariance, shrinking the sample covariance towards a scaled
+    identity matrix. The shrinkage intensity needs fourth moments of the
+    centered returns, which are recovered from running sums of raw moments
+    (x, x^2, x x^T, x^2 x^T and x^2 (x^2)^T) so that they do not have to be
+    recomputed over the whole history.
+    """
+
+    def fit(self, returns):
+        returns = np.asarray(returns, dtype=np.float64)
+        returns = returns[~np.isnan(returns).any(axis=1)]
+        squares = returns ** 2
+        self.n = len(returns)
+        self.s1 = returns.sum(axis=0)
+        self.s2 = squares.sum(axis=0)
+        self.xx = returns.T.dot(returns)
+        self.x2x = squares.T.dot(returns)
+        self.x2x2 = squares.T.dot(squares)
+        return self
+
+    def reset(self, n_stocks):
+        self.n = 0
+        self.s1 = np.zeros(n_stocks)
+        self.s2 = np.zeros(n_stocks)
+        self.xx = np.zeros((n_stocks, n_stocks))
+        self.x2x = np.zeros((n_stocks, n_stocks))
+        self.x2x2 = np.zeros((n_stocks, n_stocks))
+
+    def update(self, row):
+        square = row ** 2
+        self.n += 1
+        self.s1 += row
+        self.s2 += square
+        self.xx += np.outer(row, row)
+        self.x2x += np.outer(square, row)
+        self.x2x2 += np.outer(square, square)
+
+    def remove(self, row):
+        square = row ** 2
+        self.n -= 1
+        self.s1 -= row
+        self.s2 -= square
+        self.xx -= np.outer(row, row)
+        self.x2x -= np.outer(square, row)
+        self.x2x2 -= np.outer(square, square)
+
+    def covariance(self):
+        n = self.n
+        n_stocks = len(self.s1)
+        m = self.s1 / n
+        emp_cov = self.xx / n - np.outer(m, m)
+
+        # sum over days of (x_i - m_i)^2 (x_j - m_j)^2, expanded into the
+        # running raw moment sums
+        m_i = m[:, None]
+        m_j = m[None, :]
+        fourth = (self.x2x2 - 2 * m_j * self.x2x - 2 * m_i * self.x2x.T
+        + m_j ** 2 * self.s2[:, None] + m_i ** 2 * self.s2[None, :]
+        + 4 * m_i * m_j * self.xx - 2 * m_i * m_j ** 2 * self.s1[:, None]
+        - 2 * m_i ** 2 * m_j * self.s1[None, :] + n * m_i ** 2 * m_j ** 2)
+
+        mu = np.trace(emp_cov) / n_stocks
+        delta = (np.sum(emp_cov ** 2) - 2 * mu * np.trace(emp_cov)
+        + n_stocks * mu ** 2) / n_stocks
+        beta = (np.sum(fourth) / n - np.sum(emp_cov ** 2)) / (n_stocks * n)
+        beta = min(beta, delta)
+        shrinkage = 0. if delta == 0 else beta / delta
+        return (1. - shrinkage) * emp_cov + shrinkage * mu * np.eye(n_stocks)
+
+class EWMACovariance(CovarianceEstimator):
+    """
+    Exponentially weighted covariance, where the weight of a day halves every
+    [halflife] days.
+
+    Args:
+        halflife        float; number of days
+    """
+
+    def __init__(self, halflife=60):
+        self.halflife = halflife
+        self.alpha = 1. - 0.5 ** (1. / halflife)
+
+    def reset(self, n_stocks):
+        self.n = 0
+        self.mean = np.zeros(n_stocks)
+        self.cov = np.zeros((n_stocks, n_stocks))
+
+    def update(self, row):
+        self.n += 1
+        if self.n == 1:
+            self.mean = row.copy()
+            return
+        delta = row - self.mean
+        self.mean = self.mean + self.alpha * delta
+        self.cov = (1. - self.alpha) * (self.cov
+        + self.alpha * np.outer(delta, delta))
+
+    def remove(self, row):
+        # the weight of a day has decayed to almost nothing by the time it
+        # leaves a window of years, so it is left in the running average
+        pass
+
+    def covariance(self):
+        return self.cov
+
+class SemiCovariance(CovarianceEstimator):
+    """
+    Semicovariance, which only counts returns below [benchmark] so that
+    upside volatility is not penalized.
+
+    Args:
+        benchmark       float; daily return threshold
+    """
+
+    def __init__(self, benchmark=0.):
+        self.benchmark = benchmark
+
+    def fit(self, returns):
+        returns = np.asarray(returns, dtype=np.float64)
+        returns = returns[~np.isnan(returns).any(axis=1)]
+        downside = np.minimum(returns - self.benchmark, 0.)
+        self.n = len(returns)
+        self.dd = downside.T.dot(downside)
+        return self
+
+    def reset(self, n_stocks):
+        self.n = 0
+        self.dd = np.zeros((n_stocks, n_stocks))
+
+    def update(self, row):
+        downside = np.minimum(row - self.benchmark, 0.)
+        self.n += 1
+        self.dd += np.outer(downside, downside)
+
+    def remove(self, row):
+        downside = np.minimum(row - self.benchmark, 0.)
+        self.n -= 1
+        self.dd -= np.outer(downside, downside)
+
+    def covariance(self):
+        return self.dd / self.n
+
+# covariance estimators that can be selected by name
+ESTIMATORS = {
+    "sample": SampleCovariance,
+    "pairwise": PairwiseCovariance,
+    "ledoit_wolf": LedoitWolfCovariance,
+    "ewma": EWMACovariance,
+    "semicovariance": SemiCovariance,
+}
+
+def make_estimator(spec):
+    """
+    Creates the covariance estimator described by [spec], which is the name
+    of an estimator in ESTIMATORS optionally followed by ":" and its
+    parameter, e.g. "ewma:30" for a 30-day half-life.
+
+    Args:
+        spec                string
+    Returns:
+        estimator           CovarianceEstimator
+    Raises:
+        ValueError          exception raised when [spec] names no estimator
+    """
+    name, _, parameter = spec.partition(":")
+    if name not in ESTIMATORS:
+        raise ValueError("unknown covariance estimator " + name)
+    if parameter == "":
+        return ESTIMATORS[name]()
+    return ESTIMATORS[name](float(parameter))
@@ -0,0 +1,324 @@
+"""
+Primary module for page extraction
+
+This module contains the HTML extraction layer for the stock portfolio
+engine. Fields are pulled out of a Yahoo! Finance page in one pass, without
+building a document tree: from the JSON state embedded in the page when it
+is there, and otherwise with a streaming parser that stops as soon as every
+field has been found. Each function takes the page as bytes, so it can be
+run against saved HTML files.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import re
+import json
+from html.parser import HTMLParser
+
+# number of bytes fed to the lxml parser at a time, so that parsing can stop
+# once every field has been found
+CHUNK_SIZE = 32768
+
+# marker of the JSON state embedded in Yahoo! Finance pages
+STATE_MARKER = re.compile(rb"root\.App\.main\s*=\s*")
+
+# fields of the quote page, as (tag, attribute, value) of the element whose
+# text is the field, and as the path to the field in the embedded state;
+# the elements are checked against the saved pages in tests/data/pages
+SUMMARY_ELEMENTS = {
+    "price": ("span", "data-reactid", "50"),
+    "market_cap": ("td", "data-test", "MARKET_CAP-value"),
+}
+SUMMARY_PATHS = {
+    "price": ("price", "regularMarketPrice"),
+    "market_cap": ("summaryDetail", "marketCap"),
+}
+
+# fields of the key statistics page, as the label in the first cell of the
+# table row holding the field, and as the path in the embedded state
+STATISTICS_LABELS = {
+    "revenue": "Revenue (ttm)",
+    "revenue_per_share": "Revenue Per Share (ttm)",
+    "gross_profit": "Gross Profit (ttm)",
+    "operating_margin": "Operating Margin (ttm)",
+    "return_on_assets": "Return on Assets (ttm)",
+    "return_on_equity": "Return on Equity (ttm)",
+}
+STATISTICS_PATHS = {
+    "revenue": ("financialData", "totalRevenue"),
+    "revenue_per_share": ("financialData", "revenuePerShare"),
+    "gross_profit": ("financialData", "grossProfits"),
+    "operating_margin": ("financialData", "operatingMargins"),
+    "return_on_assets": ("financialData", "returnOnAssets"),
+    "return_on_equity": ("financialData", "returnOnEquity"),
+}
+
+# fields of the quote page of a rate
+RATE_ELEMENTS = {
+    "price": ("span", "data-reactid", "33"),
+}
+RATE_PATHS = {
+    "price": ("price", "regularMarketPrice"),
+}
+
+# lxml's etree module, imported on first use; False if lxml is not installed
+etree = None
+
+class ExtractionDone(Exception):
+    """
+    Raised inside the streaming parser once every field has been found.
+    """
+    pass
+
+class FieldTarget(object):
+    """
+    Parser target that collects fields from a stream of start tag, end tag
+    and text events. A field in [elements] is the text of the first element
+    with the given tag and attribute value; a field in [labels] is the text
+    of the last cell of the first table row whose first cell reads the
+    given label (ignoring footnote numbers). The same target works with the
+    lxml parser and with the standard library parser.
+
+    Args:
+        elements        dict; field name to (tag, attribute, value)
+        labels          dict; field name to label
+    """
+
+    def __init__(self, elements=None, labels=None):
+        self.elements = dict(elements or {})
+        self.labels = dict((normalize(label), name)
+        for name, label in (labels or {}).items())
+        self.values = {}
+        self.capture = None
+        self.depth = 0
+        self.text = []
+        self.row = None
+        self.cell = None
+
+    def done(self):
+        """
+        Returns:
+            done            bool; True once every field has been found
+        """
+        return len(self.elements) == 0 and len(self.labels) == 0
+
+    def start(self, tag, attributes):
+        if self.capture is not None:
+            if tag == self.elements[self.capture][0]:
+                self.depth += 1
+        else:
+            for name, (field_tag, attribute, value) in self.elements.items():
+                if tag == field_tag and attributes.get(attribute) == value:
+                    self.capture = name
+                    self.depth = 1
+                    self.text = []
+                    break
+        if len(self.labels) > 0:
+            if tag == "tr":
+                self.row = []
+            elif tag in ("td", "th") and self.row is not None:
+                self.cell = []
+
+    def end(self, tag):
+        if self.capture is not None \
+        and tag == self.elements[self.capture][0]:
+            self.depth -= 1
+            if self.depth == 0:
+                self.values[self.capture] = "".join(self.text).strip()
+                del self.elements[self.capture]
+                self.capture = None
+        if self.row is not None:
+            if tag in ("td", "th") and self.cell is not None:
+                self.row.append(" ".join("".join(self.cell).split()))
+                self.cell = None
+            elif tag == "tr":
+                if len(self.row) > 1:
+                    name = self.labels.pop(normalize(self.row[0]), None)
+                    if name is not None:
+                        self.values[name] = self.row[-1]
+                self.row = None
+
+    def data(self, text):
+        if self.capture is not None:
+            self.text.append(text)
+        if self.cell is not None:
+            self.cell.append(text)
+
+    def close(self):
+        return self.values
+
+class StreamingParser(HTMLParser):
+    """
+    Standard library HTML parser that sends its events to a FieldTarget and
+    stops as soon as the target has every field.
+
+    Args:
+        target          FieldTarget
+    """
+
+    def __init__(self, target):
+        HTMLParser.__init__(self, convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag, dict(attrs))
+        if self.target.done():
+            raise ExtractionDone
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+        if self.target.done():
+            raise ExtractionDone
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+def normalize(label):
+    """
+    Returns [label] with its whitespace collapsed and any footnote number
+    after it removed, e.g. "Return on Assets (ttm) 4" becomes "Return on
+    Assets (ttm)".
+
+    Args:
+        label           string
+    Returns:
+        label           string
+    """
+    return re.sub(r"\s*\d+$", "", " ".join(label.split()))
+
+def embedded_state(page):
+    """
+    Returns the quote summary data in the JSON state embedded in [page].
+
+    Args:
+        page            bytes
+    Returns:
+        state           dict, or None if [page] has no embedded state
+    """
+    match = STATE_MARKER.search(page)
+    if match is None:
+        return None
+    try:
+        state = json.JSONDecoder().raw_decode(
+        page[match.end():].decode("utf-8", "replace"))[0]
+        return state["context"]["dispatcher"]["stores"]["QuoteSummaryStore"]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+def state_value(state, path):
+    """
+    Returns the formatted value at [path] in the embedded [state].
+
+    Args:
+        state           dict
+        path            string tuple
+    Returns:
+        value           string, or None if there is no value
+    """
+    value = state
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    if isinstance(value, dict):
+        value = value.get("fmt")
+    return None if value is None else str(value)
+
+def lxml_etree():
+    """
+    Imports lxml on first use, since most commands never parse a page.
+
+    Returns:
+        etree           lxml etree module, or None if lxml is not installed
+    """
+    global etree
+    if etree is None:
+        try:
+            from lxml import etree as module
+            etree = module
+        except ImportError:
+            etree = False
+    return etree or None
+
+def extract_fields(page, elements=None, labels=None, paths=None):
+    """
+    Extracts the fields described by [elements] and [labels] from [page] in
+    one pass, stopping once they have all been found. Fields found at
+    [paths] in the page's embedded JSON state are taken from there, and the
+    HTML is only parsed for the rest. The HTML is parsed with lxml if it is
+    installed, and with the standard library parser otherwise.
+
+    Args:
+        page            bytes
+        elements        dict; field name to (tag, attribute, value)
+        labels          dict; field name to table row label
+        paths           dict; field name to path in the embedded state
+    Returns:
+        fields          dict; field name to string, "N/A" for fields that
+                        were not found
+    """
+    elements = dict(elements or {})
+    labels = dict(labels or {})
+    values = {}
+    if paths:
+        state = embedded_state(page)
+        if state is not None:
+            for name, path in paths.items():
+                value = state_value(state, path)
+                if value is not None:
+                    values[name] = value
+                    elements.pop(name, None)
+                    labels.pop(name, None)
+
+    target = FieldTarget(elements, labels)
+    if not target.done():
+        if lxml_etree() is not None:
+            parser = etree.HTMLParser(target=target)
+            for start in range(0, len(page), CHUNK_SIZE):
+                parser.feed(page[start:start + CHUNK_SIZE])
+                if target.done():
+                    break
+            else:
+                parser.close()
+        else:
+            parser = StreamingParser(target)
+            try:
+                parser.feed(page.decode("utf-8", "replace"))
+                parser.close()
+            except ExtractionDone:
+                pass
+        values.update(target.values)
+
+    names = list(elements) + list(labels) + list(paths or {})
+    return dict((name, values.get(name) or "N/A") for name in names)
+
+def extract_summary(page):
+    """
+    Args:
+        page            bytes; HTML of a quote page
+    Returns:
+        fields          dict; "price" and "market_cap"
+    """
+    return extract_fields(page, SUMMARY_ELEMENTS, paths=SUMMARY_PATHS)
+
+def extract_statistics(page):
+    """
+    Args:
+        page            bytes; HTML of a key statistics page
+    Returns:
+        fields          dict; "revenue", "revenue_per_share",
+                        "gross_profit", "operating_margin",
+                        "return_on_assets" and "return_on_equity"
+    """
+    return extract_fields(page, labels=STATISTICS_LABELS,
+    paths=STATISTICS_PATHS)
+
+def extract_rate(page):
+    """
+    Args:
+        page            bytes; HTML of the quote page of a rate
+    Returns:
+        fields          dict; "price"
+    """
+    return extract_fields(page, RATE_ELEMENTS, paths=RATE_PATHS)
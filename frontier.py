@@ -0,0 +1,205 @@
+"""
+Primary module for the efficient frontier
+
+This module contains the Monte Carlo efficient frontier generator for the
+stock portfolio engine. Random long-only portfolios are scored in chunks
+across a pool of processes that share one copy of the mean returns and
+covariance matrix, and the results are written to disk as they arrive.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import os
+import tempfile
+import numpy as np
+from multiprocessing import Pool, shared_memory
+from optimize import *
+from store import DATA_DIR
+
+# largest number of bytes each worker process may hold for a chunk of
+# random portfolios
+MEMORY_BUDGET = 64 * 2**20
+
+def chunk_bytes(n_stocks):
+    """
+    Args:
+        n_stocks            int
+    Returns:
+        bytes               int; memory sample_chunk holds per portfolio:
+                            the random draws, the weights and the weights
+                            times the covariance matrix, then the scores in
+                            float64 and float32
+    """
+    return 8 * 3 * n_stocks + 8 * 6 + 4 * 3
+
+class FrontierResult(object):
+    """
+    Holds the output of generate_frontier. A result whose samples were
+    written to a temporary file removes it when it is closed, or at the end
+    of a with block:
+
+        with generate_frontier(session) as result:
+            ...
+
+    Args:
+        path                string; location of the .npy file with one row
+                            (expected return, volatility, Sharpe ratio) per
+                            sampled portfolio
+        max_sharpe          tuple; (Sharpe ratio, weights) of the sampled
+                            portfolio with the highest Sharpe ratio
+        min_volatility      tuple; (volatility, weights) of the sampled
+                            portfolio with the lowest volatility
+        frontier            numpy array; (points x 2) matrix of expected
+                            return and volatility along the traced frontier
+        temporary           bool; whether [path] is removed on close
+    """
+
+    def __init__(self, path, max_sharpe, min_volatility, frontier,
+    temporary=False):
+        self.path = path
+        self.max_sharpe = max_sharpe
+        self.min_volatility = min_volatility
+        self.frontier = frontier
+        self.temporary = temporary
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Removes the samples file if it is temporary.
+        """
+        if self.temporary and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def samples(self):
+        """
+        Returns:
+            samples         numpy array; memory-mapped (portfolios x 3)
+                            matrix read from self.path
+        """
+        return np.load(self.path, mmap_mode="r")
+
+def sample_chunk(task):
+    """
+    Scores one chunk of random portfolios. Runs in a worker process, reading
+    the mean returns and covariance matrix from shared memory.
+
+    Args:
+        task                tuple; (shared memory name, number of stocks,
+                            chunk size, numpy SeedSequence, risk free rate)
+    Returns:
+        stats,              tuple; (chunk size x 3) float32 matrix of
+        max_sharpe,         expected return, volatility and Sharpe ratio,
+        min_volatility      then (Sharpe ratio, weights) and (volatility,
+                            weights) of the best portfolios in the chunk
+    """
+    name, n_stocks, chunk_size, seed, risk_free_rate = task
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        universe = np.ndarray((n_stocks + 1, n_stocks), dtype=np.float64,
+        buffer=shm.buf)
+        mean_returns = universe[0]
+        cov_matrix = universe[1:]
+        weights = np.random.default_rng(seed).dirichlet(np.ones(n_stocks),
+        chunk_size)
+        returns = weights.dot(mean_returns)
+        sds = np.sqrt(np.einsum("ij,ij->i", weights.dot(cov_matrix), weights))
+        sharpe_ratios = (returns - risk_free_rate) / sds
+    finally:
+        shm.close()
+
+    best = int(np.argmax(sharpe_ratios))
+    safest = int(np.argmin(sds))
+    stats = np.column_stack((returns, sds, sharpe_ratios)).astype(np.float32)
+    return stats, (float(sharpe_ratios[best]), weights[best]), \
+    (float(sds[safest]), weights[safest])
+
+def generate_frontier(session, n_portfolios=1000000,
+memory_budget=MEMORY_BUDGET, processes=None, path=None, n_points=50,
+seed=None):
+    """
+    Samples [n_portfolios] random long-only portfolios of the stocks in
+    [session] across [processes] worker processes, in chunks as large as
+    fit in [memory_budget] bytes per process given the number of stocks,
+    writes their expected return, volatility and Sharpe ratio to [path] as
+    each chunk finishes, and traces the efficient frontier. Only a few
+    chunks are held in memory at a time, whatever [n_portfolios] is.
+    Without a [path], the samples go to a temporary file of their own in
+    DATA_DIR, so that runs at the same time do not overwrite each other's
+    samples, and the file is removed when the result is closed.
+
+    Args:
+        session             OptimizationSession
+        n_portfolios        int; at least 1
+        memory_budget       int; bytes each worker process may hold for its
+                            chunk
+        processes           int; default is the number of CPUs
+        path                string; location of the .npy output file,
+                            default is a temporary file
+        n_points            int; number of points on the traced frontier
+        seed                int; default is None
+    Returns:
+        result              FrontierResult
+    Raises:
+        ValueError          exception raised when [n_portfolios] is less
+                            than 1 or a single portfolio does not fit in
+                            [memory_budget]
+    """
+    engine = session.engine
+    risk_free_rate = session.risk_free_rate
+    n_stocks = len(engine.symbols)
+    if n_portfolios < 1:
+        raise ValueError("at least one portfolio must be sampled")
+    chunk_size = min(memory_budget // chunk_bytes(n_stocks), n_portfolios)
+    if chunk_size < 1:
+        raise ValueError("the memory budget is too small for "
+        + str(n_stocks) + " stocks")
+    universe = np.vstack((engine.mean_returns, engine.cov_matrix))
+    shm = shared_memory.SharedMemory(create=True, size=universe.nbytes)
+    np.ndarray(universe.shape, dtype=np.float64, buffer=shm.buf)[:] = universe
+
+    sizes = [chunk_size] * (n_portfolios // chunk_size)
+    if n_portfolios % chunk_size > 0:
+        sizes.append(n_portfolios % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    offsets = np.concatenate(([0], np.cumsum(sizes)))
+    tasks = [(shm.name, n_stocks, size, seeds[i], risk_free_rate)
+    for i, size in enumerate(sizes)]
+
+    temporary = path is None
+    if temporary:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix=".npy", prefix="frontier-",
+        dir=DATA_DIR)
+        os.close(fd)
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    result = FrontierResult(path, (-np.inf, None), (np.inf, None), None,
+    temporary)
+    try:
+        output = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32,
+        shape=(n_portfolios, 3))
+        try:
+            with Pool(processes) as pool:
+                for i, (stats, best, safest) in enumerate(pool.imap(
+                sample_chunk, tasks)):
+                    output[offsets[i]:offsets[i + 1]] = stats
+                    if best[0] > result.max_sharpe[0]:
+                        result.max_sharpe = best
+                    if safest[0] < result.min_volatility[0]:
+                        result.min_volatility = safest
+            output.flush()
+        finally:
+            del output
+            shm.close()
+            shm.unlink()
+        result.frontier = session.trace_frontier(n_points)
+    except BaseException:
+        result.close()
+        raise
+    return result
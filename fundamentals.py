@@ -0,0 +1,142 @@
+"""
+Primary module for fundamentals
+
+This module contains the fundamentals cache for the stock portfolio engine,
+which keeps a snapshot of everything fetched about each stock (its stock
+information and the fields scraped from its quote pages) so that viewing the
+same stock again does not fetch or parse anything twice.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import os
+import json
+import time
+import threading
+from store import DATA_DIR
+
+# sources of data kept in each snapshot
+SOURCES = ("info", "summary", "statistics")
+
+class FundamentalsCache(object):
+    """
+    Keeps one snapshot per stock, in memory and on disk, holding the value
+    fetched from each source together with the time it was fetched. A value
+    is reused until it is older than [ttl] seconds, so a stock's summary,
+    profile and statistics share one fetch of each source.
+
+    Args:
+        ttl             float; number of seconds a value stays fresh
+        directory       string; folder where the snapshots are kept
+    """
+
+    def __init__(self, ttl=900,
+    directory=os.path.join(DATA_DIR, "fundamentals")):
+        self.ttl = ttl
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.snapshots = {}
+
+    def path(self, symbol):
+        """
+        Args:
+            symbol          string
+        Returns:
+            path            string; location of the snapshot of [symbol]
+        """
+        return os.path.join(self.directory, symbol + ".json")
+
+    def snapshot(self, symbol):
+        """
+        Returns the snapshot of [symbol], reading it from disk on first use.
+
+        Args:
+            symbol          string
+        Returns:
+            snapshot        dict; source to {"value": value, "fetched_at":
+                            seconds since the epoch}
+        """
+        with self.lock:
+            if symbol not in self.snapshots:
+                try:
+                    with open(self.path(symbol)) as f:
+                        self.snapshots[symbol] = json.load(f)
+                except (IOError, ValueError):
+                    self.snapshots[symbol] = {}
+            return self.snapshots[symbol]
+
+    def fresh(self, symbol, source):
+        """
+        Args:
+            symbol          string
+            source          string; one of SOURCES
+        Returns:
+            fresh           bool; True if [source] was fetched for [symbol]
+                            less than [ttl] seconds ago
+        """
+        entry = self.snapshot(symbol).get(source)
+        return entry is not None and time.time() - entry["fetched_at"] \
+        <= self.ttl
+
+    def put(self, symbol, source, value):
+        """
+        Stores [value] fetched from [source] for [symbol] and saves the
+        snapshot to disk.
+
+        Args:
+            symbol          string
+            source          string
+            value           JSON serializable value
+        """
+        snapshot = self.snapshot(symbol)
+        with self.lock:
+            snapshot[source] = {"value": value, "fetched_at": time.time()}
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self.path(symbol) + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot, f, default=str)
+            os.replace(tmp_path, self.path(symbol))
+
+    def get(self, symbol, source, fetch):
+        """
+        Returns the value of [source] for [symbol], calling [fetch] to fetch
+        it only if the snapshot has no fresh value. Errors raised by [fetch]
+        are not cached.
+
+        Args:
+            symbol          string
+            source          string
+            fetch           function; takes no arguments and returns the
+                            value
+        Returns:
+            value           JSON serializable value
+        """
+        if self.fresh(symbol, source):
+            return self.snapshot(symbol)[source]["value"]
+        value = fetch()
+        self.put(symbol, source, value)
+        return value
+
+    def clear(self, symbol=None):
+        """
+        Forgets the snapshot of [symbol], or of every stock, in memory and
+        on disk.
+
+        Args:
+            symbol          string; default is None for every stock
+        """
+        with self.lock:
+            symbols = list(self.snapshots) if symbol is None else [symbol]
+            if symbol is None and os.path.isdir(self.directory):
+                symbols += [name[:-len(".json")]
+                for name in os.listdir(self.directory)
+                if name.endswith(".json")]
+            for name in set(symbols):
+                self.snapshots.pop(name, None)
+                try:
+                    os.remove(self.path(name))
+                except OSError:
+                    pass
+
+fundamentals_cache = FundamentalsCache()
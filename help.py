@@ -47,6 +47,19 @@ def help_manual(input):
     annualized =        ["annualized"]
 
     optimize =          ["optimize", "portfolio"]
+    search =            ["search"]
+    lot =               ["lot"]
+    cost_basis =        ["cost", "basis"]
+    backtest =          ["backtest"]
+    walk_forward =      ["walk", "forward"]
+    walkforward =       ["walkforward"]
+    sweep =             ["sweep"]
+    value_at_risk =     ["value", "risk"]
+    var =               ["var"]
+    cvar =              ["cvar"]
+    shortfall =         ["shortfall"]
+    risk =              ["risk"]
+    frontier =          ["frontier"]
 
     type_help =         ["help"]
 
@@ -128,6 +141,66 @@ def help_manual(input):
         + " your portfolio in two ways: 1) By maximizing your portfolio's"
         + " Sharpe ratio and 2) By minimizing your portfolio's volatility"
         + " or risk.")
+    elif intersection(input, search, what) or \
+    intersection(input, search, how):
+        print("\nTo look up a stock's ticker symbol, type 'search' followed"
+        + " by its symbol or company name in the main menu, e.g. 'search"
+        + " alphabet'. This engine will then list the closest matches, even"
+        + " if the name is misspelled.")
+    elif intersection(input, lot, what) or intersection(input, lot, how):
+        print("\nA lot is one purchase or sale of a stock. To record one,"
+        + " type 'lot [ticker] [shares] [price] [date]' in the main menu,"
+        + " e.g. 'lot goog 10 1500.25 2020-05-01'. The date is formatted"
+        + " YYYY-MM-DD and is today if left out, and a negative number of"
+        + " shares records a sale.")
+    elif intersection(input, cost_basis, what) or \
+    intersection(input, cost_basis, how):
+        print("\nCost basis is what you paid for the shares you hold. To view"
+        + " it, type 'basis' in the main menu. This engine will then show"
+        + " the shares, total cost and average cost of each stock you have"
+        + " recorded lots for, where a sale is taken out at the average cost"
+        + " on its date.")
+    elif intersection(input, backtest, what) or \
+    intersection(input, backtest, how):
+        print("\nA backtest simulates how your portfolio would have done in"
+        + " the past. To backtest your portfolio, type 'backtest' in the"
+        + " main menu. This engine will then simulate your portfolio with"
+        + " its saved weights over the past ten years, rebalanced back to"
+        + " them each month after transaction costs.")
+    elif intersection(input, walk_forward, what) or \
+    intersection(input, walk_forward, how) or \
+    intersection(input, walkforward, what) or \
+    intersection(input, walkforward, how):
+        print("\nA walk-forward backtest re-optimizes your portfolio each"
+        + " quarter using only the three years of prices before it, so it"
+        + " never relies on prices it could not have known. To run one, type"
+        + " 'walkforward' in the main menu with at least two stocks in your"
+        + " portfolio.")
+    elif intersection(input, sweep, what) or intersection(input, sweep, how):
+        print("\nA parameter sweep optimizes and backtests your portfolio"
+        + " with every combination of settings: the years of price history,"
+        + " the covariance estimator, the risk free rate, the rebalancing"
+        + " schedule and the way of optimizing. To run one, type 'sweep' in"
+        + " the main menu. This engine will then print the best settings"
+        + " and save every result to a CSV file.")
+    elif intersection(input, value_at_risk, what) or \
+    intersection(input, var, what) or intersection(input, cvar, what) or \
+    intersection(input, shortfall, what) or \
+    intersection(input, risk, how):
+        print("\nValue-at-Risk (VaR) is the loss your portfolio should not"
+        + " exceed except on its worst days, e.g. the worst 5% of days at"
+        + " 95% confidence. Expected shortfall, or Conditional Value-at-Risk"
+        + " (CVaR), is the average loss on those worst days. To view both,"
+        + " type 'risk' in the main menu. This engine will then show them at"
+        + " 95% and 99% confidence over 1 and 10 trading days.")
+    elif intersection(input, frontier, what) or \
+    intersection(input, frontier, how):
+        print("\nThe efficient frontier is the set of portfolios with the"
+        + " highest expected return for each level of volatility. To view"
+        + " yours, type 'frontier' in the main menu. This engine will then"
+        + " sample a million random portfolios of your stocks, chart them"
+        + " with the frontier, and show the ones with the highest Sharpe"
+        + " ratio and the lowest volatility.")
     elif intersection(input, type_help, type_help):
         print("\nYou have already activated the help command. Please type a"
         + " question below:")
@@ -0,0 +1,270 @@
+"""
+Primary module for the portfolio store
+
+This module contains the on-disk portfolio store for the stock portfolio
+engine. Named portfolios, with their stocks, weights and purchase lots, are
+kept in one SQLite database, so a portfolio survives quitting the engine.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import os
+import sqlite3
+import threading
+from store import DATA_DIR
+
+# name of the portfolio used when no other one is chosen
+DEFAULT_PORTFOLIO = "default"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS portfolios (
+    name TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS holdings (
+    portfolio TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    weight REAL,
+    PRIMARY KEY (portfolio, symbol)
+);
+CREATE TABLE IF NOT EXISTS lots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    portfolio TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    shares REAL NOT NULL,
+    price REAL NOT NULL,
+    date TEXT NOT NULL
+);
+"""
+
+class PortfolioStore(object):
+    """
+    Stores named portfolios in the SQLite database at [path]. Nothing is
+    read until a portfolio is first asked for, and each portfolio is read
+    from the database only once; every change after that is written to the
+    database and to the copy kept in memory.
+
+    Args:
+        path            string; location of the database file
+    """
+
+    def __init__(self, path=os.path.join(DATA_DIR, "portfolios.db")):
+        self.path = path
+        self.lock = threading.RLock()
+        self.connection = None
+        self.portfolios = {}
+
+    def connect(self):
+        """
+        Returns the database connection, opening it and creating the tables
+        on first use.
+
+        Returns:
+            connection      sqlite3 Connection
+        """
+        if self.connection is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.connection = sqlite3.connect(self.path,
+            check_same_thread=False)
+            self.connection.executescript(SCHEMA)
+        return self.connection
+
+    def names(self):
+        """
+        Returns:
+            names           string list; names of the stored portfolios
+        """
+        with self.lock:
+            rows = self.connect().execute(
+            "SELECT name FROM portfolios ORDER BY name").fetchall()
+        return [row[0] for row in rows]
+
+    def load(self, name=DEFAULT_PORTFOLIO):
+        """
+        Returns a copy of portfolio [name], creating it if it does not exist,
+        so that changing it does not change the stored portfolio.
+
+        Args:
+            name            string
+        Returns:
+            pf_dict         dict; "Stock List" to the string list of stocks
+                            and "Weights" to a dict of stock to weight (empty
+                            if no weights were saved)
+        """
+        with self.lock:
+            pf_dict = self.cached(name)
+            return {"Stock List": list(pf_dict["Stock List"]),
+            "Weights": dict(pf_dict["Weights"])}
+
+    def cached(self, name):
+        """
+        Returns portfolio [name] as kept in memory, reading it from the
+        database on first use. Only the store itself changes it.
+
+        Args:
+            name            string
+        Returns:
+            pf_dict         dict; see load
+        """
+        with self.lock:
+            if name not in self.portfolios:
+                connection = self.connect()
+                with connection:
+                    connection.execute("INSERT OR IGNORE INTO portfolios "
+                    "(name) VALUES (?)", (name,))
+                rows = connection.execute("SELECT symbol, weight FROM "
+                "holdings WHERE portfolio = ? ORDER BY position",
+                (name,)).fetchall()
+                self.portfolios[name] = {
+                    "Stock List": [row[0] for row in rows],
+                    "Weights": {row[0]: row[1] for row in rows
+                    if row[1] is not None},
+                }
+            return self.portfolios[name]
+
+    def delete(self, name):
+        """
+        Deletes portfolio [name] with its stocks and lots.
+
+        Args:
+            name            string
+        """
+        with self.lock:
+            with self.connect() as connection:
+                connection.execute("DELETE FROM portfolios WHERE name = ?",
+                (name,))
+                connection.execute("DELETE FROM holdings WHERE portfolio = ?",
+                (name,))
+                connection.execute("DELETE FROM lots WHERE portfolio = ?",
+                (name,))
+            self.portfolios.pop(name, None)
+
+    def add_symbol(self, name, symbol):
+        """
+        Adds [symbol] to the end of portfolio [name] if it is not already in
+        it. Saved weights are cleared, since they no longer cover every
+        stock.
+
+        Args:
+            name            string
+            symbol          string
+        """
+        with self.lock:
+            pf_dict = self.cached(name)
+            if symbol in pf_dict["Stock List"]:
+                return
+            with self.connect() as connection:
+                connection.execute("INSERT INTO holdings (portfolio, symbol, "
+                "position) SELECT ?, ?, COALESCE(MAX(position), -1) + 1 FROM "
+                "holdings WHERE portfolio = ?", (name, symbol, name))
+                connection.execute("UPDATE holdings SET weight = NULL "
+                "WHERE portfolio = ?", (name,))
+            pf_dict["Stock List"].append(symbol)
+            pf_dict["Weights"].clear()
+
+    def remove_symbol(self, name, symbol):
+        """
+        Removes [symbol] and its lots from portfolio [name]. Saved weights
+        are cleared.
+
+        Args:
+            name            string
+            symbol          string
+        """
+        with self.lock:
+            pf_dict = self.cached(name)
+            if symbol not in pf_dict["Stock List"]:
+                return
+            with self.connect() as connection:
+                connection.execute("DELETE FROM holdings WHERE portfolio = ? "
+                "AND symbol = ?", (name, symbol))
+                connection.execute("DELETE FROM lots WHERE portfolio = ? "
+                "AND symbol = ?", (name, symbol))
+                connection.execute("UPDATE holdings SET weight = NULL "
+                "WHERE portfolio = ?", (name,))
+            pf_dict["Stock List"].remove(symbol)
+            pf_dict["Weights"].clear()
+
+    def set_weights(self, name, weights):
+        """
+        Saves the weights of the stocks in portfolio [name].
+
+        Args:
+            name            string
+            weights         dict; stock to weight, for every stock in the
+                            portfolio
+        """
+        with self.lock:
+            pf_dict = self.cached(name)
+            with self.connect() as connection:
+                connection.executemany("UPDATE holdings SET weight = ? WHERE "
+                "portfolio = ? AND symbol = ?", [(float(weights[symbol]),
+                name, symbol) for symbol in pf_dict["Stock List"]])
+            pf_dict["Weights"] = {symbol: float(weights[symbol])
+            for symbol in pf_dict["Stock List"]}
+
+    def add_lot(self, name, symbol, shares, price, day):
+        """
+        Records buying [shares] of [symbol] at [price] on [day] in portfolio
+        [name], adding [symbol] to the portfolio if needed. Sales are lots
+        with negative [shares].
+
+        Args:
+            name            string
+            symbol          string
+            shares          float
+            price           float
+            day             string; formatted YYYY-MM-DD
+        """
+        with self.lock:
+            self.add_symbol(name, symbol)
+            with self.connect() as connection:
+                connection.execute("INSERT INTO lots (portfolio, symbol, "
+                "shares, price, date) VALUES (?, ?, ?, ?, ?)", (name, symbol,
+                float(shares), float(price), str(day)))
+
+    def lots(self, name, symbol=None):
+        """
+        Args:
+            name            string
+            symbol          string; default is None for every stock
+        Returns:
+            lots            tuple list; (symbol, shares, price, date) of each
+                            lot by date, and in the order they were added
+                            on the same date
+        """
+        query = "SELECT symbol, shares, price, date FROM lots WHERE " \
+        + "portfolio = ?"
+        parameters = (name,)
+        if symbol is not None:
+            query += " AND symbol = ?"
+            parameters = (name, symbol)
+        with self.lock:
+            return self.connect().execute(query + " ORDER BY date, id",
+            parameters).fetchall()
+
+    def cost_basis(self, name):
+        """
+        Returns the shares held and the cost basis of each stock with lots
+        in portfolio [name]. Sales reduce the cost basis at the average cost
+        of the shares held on their date, so lots recorded after later ones
+        are counted in date order.
+
+        Args:
+            name            string
+        Returns:
+            cost_basis      dict; stock to (shares, total cost, average cost)
+        """
+        held = {}
+        for symbol, shares, price, day in self.lots(name):
+            total_shares, total_cost = held.get(symbol, (0., 0.))
+            if shares >= 0 or total_shares <= 0:
+                total_cost += shares * price
+            else:
+                total_cost += shares * total_cost / total_shares
+            held[symbol] = (total_shares + shares, total_cost)
+        return {symbol: (shares, cost, cost / shares if shares != 0 else 0.)
+        for symbol, (shares, cost) in held.items()}
+
+portfolio_store = PortfolioStore()
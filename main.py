@@ -6,14 +6,49 @@ in a folder with the following files:
     stock.py        (the primary location for stock functions)
     portfolio.py    (the primary location for portfolio functions)
     colors.py       (the primary location for different terminal colors)
+    cache.py        (the primary location for the price history cache)
+    store.py        (the primary location for the on-disk price store)
+    provider.py     (the primary location for market data providers)
+    rates.py        (the primary location for the risk free rate service)
+    stats.py        (the primary location for the portfolio statistics engine)
+    risk.py         (the primary location for Value-at-Risk)
+    analytics.py    (the primary location for drawdown and risk attribution)
+    returns.py      (the primary location for portfolio return series)
+    covariance.py   (the primary location for covariance estimators)
+    rolling.py      (the primary location for rolling statistics)
+    optimize.py     (the primary location for portfolio optimization)
+    frontier.py     (the primary location for the efficient frontier)
+    backtest.py     (the primary location for portfolio backtests)
+    walkforward.py  (the primary location for walk-forward backtests)
+    sweep.py        (the primary location for parameter sweeps)
+    holdings.py     (the primary location for the portfolio store)
+    symbols.py      (the primary location for the symbol index)
+    fundamentals.py (the primary location for the fundamentals cache)
+    extract.py      (the primary location for page extraction)
+    batch.py        (the primary location for batch mode)
+    benchmark.py    (the primary location for the startup benchmark)
+    server.py       (the primary location for the API server)
 
 Moving any of these folders or files will prevent the engine from working
 properly.
 
+To run commands without prompts, e.g. from a script or cron job, pass a file
+of commands (or "-" for standard input) in batch mode:
+
+    python main.py --batch commands.txt
+
+Each command's result is written as one line of JSON.
+
+To serve the engine as a local HTTP/JSON API, so that dashboards and scripts
+share one warm process, run:
+
+    python main.py --serve [host:][port]
+
 Author:         Daisy Shu
 Date Created:   May 3rd, 2020 (Python 3.7.3 Version)
 """
 
+import os
 import sys
 from colors import *
 from command import *
@@ -21,9 +56,19 @@ from stock import *
 from portfolio import *
 from chart import *
 from help import *
+from batch import *
+from server import *
 import math
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--batch":
+        path = sys.argv[2] if len(sys.argv) > 2 else None
+        sys.exit(1 if run_batch(path) > 0 else 0)
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        host, colon, port = (sys.argv[2] if len(sys.argv) > 2 else "") \
+        .rpartition(":")
+        run_server(host or HOST, int(port) if port else PORT)
+        return
     menuInstructions()
     menu()
 
@@ -50,6 +95,8 @@ def menuInstructions():
         )
     print("View   [ticker]                  "
         + "(to view any stock summary with a given ticker symbol [ticker])\n"
+        + "View   [ticker] [ticker] ...     "
+        + "(to view the stock summaries of many ticker symbols at once)\n"
         + "View   [ticker] profile          "
         + "(to view any stock profile with a given ticker symbol [ticker])\n"
         + "View   [ticker] statistics       "
@@ -60,18 +107,47 @@ def menuInstructions():
         + " given ticker symbol [ticker])\n"
         + "View   [ticker] chart            "
         + "(to view any stock chart with a given ticker symbol [ticker])\n"
+        + "View   [ticker] rolling          "
+        + "(to view any stock's rolling return, volatility, Sharpe ratio and"
+        + " beta with a given ticker symbol [ticker])\n"
         + "View  portfolio chart            "
         + "(to view your daily and monthly portfolio returns)\n"
+        + "View  portfolio rolling          "
+        + "(to view your portfolio's rolling statistics and correlations)\n"
         + "Add    [ticker]                  "
         + "(to add any stock with a given ticker symbol [ticker] to your"
         + " portfolio)\n"
+        + "Add    [ticker] [ticker] ...     "
+        + "(to add many stocks to your portfolio at once)\n"
         + "Remove [ticker]                  "
         + "(to remove any stock with a given ticker symbol [ticker] from your"
         + " portfolio)\n"
+        + "Lot    [ticker] [shares] [price] [date]\n"
+        + "                                 "
+        + "(to record buying [shares] of a stock at [price] on [date],"
+        + " formatted YYYY-MM-DD and today if left out; negative [shares]"
+        + " record a sale)\n"
+        + "Basis                            "
+        + "(to view the shares you hold and what you paid for them)\n"
+        + "Search [company name]            "
+        + "(to look up ticker symbols by symbol or company name)\n"
         + "Portfolio                        "
         + "(to view your current portfolio and its data)\n"
         + "Optimize portfolio               "
         + "(to optimize your current portfolio based on different criteria)\n"
+        + "Backtest                         "
+        + "(to simulate your portfolio with its saved weights, rebalanced"
+        + " monthly, over the past ten years)\n"
+        + "Walkforward                      "
+        + "(to backtest re-optimizing your portfolio each quarter on the"
+        + " three years before it)\n"
+        + "Sweep                            "
+        + "(to optimize and backtest your portfolio across a grid of"
+        + " settings)\n"
+        + "Risk                             "
+        + "(to view your portfolio's Value-at-Risk and expected shortfall)\n"
+        + "Frontier                         "
+        + "(to sample random portfolios and view your efficient frontier)\n"
         + "Help                             "
         + "(to access the help manual)\n"
         + "Quit                             "
@@ -79,249 +155,443 @@ def menuInstructions():
         + "Examples:\n"
         + "view goog\n"
         + "view goog profile\n"
+        + "view aapl msft goog\n"
+        + "search alphabet\n"
         + "add goog\n"
         + "remove goog\n"
+        + "lot goog 10 1500.25 2020-05-01\n"
         + "portfolio\n\n"
         + Colors.yellow + "Note: you can enter uppercase or lowercase"
         + " letters, whichever you prefer!\n" + Colors.end)
 
 def menu():
     """
-    Returns actions associated with menu options selected by user input.
+    Reads commands from user input, one line at a time, and runs the handler
+    registered for each until the user quits. Each line is parsed once. An
+    empty or malformed command, or a stock that does not exist, is reported
+    to the user and the next command is read.
+    """
+    while True:
+        try:
+            option = input("> ")
+        except EOFError:
+            return
+        try:
+            dispatch(option)
+        except Quit:
+            return
+        except Empty:
+            print(Colors.red + "Please enter a command.\n" + Colors.end)
+        except Malformed:
+            print(Colors.red + "Invalid command." + Colors.end)
+            print("\nYou must choose one of the menu options.")
+        except InexistentStock:
+            print(Colors.red + "The stock you entered does not exist.\n"
+            + Colors.end)
+            print("Please enter a valid stock.")
 
-    Returns:
-        actions             various data types
+@register("view")
+def view_command(after_command):
+    """
+    Handler for the view command.
+
+    Args:
+        after_command       list; parsed command without "view"
     Raises:
-        Empty               exception raised when command is empty
-        Malformed           exception raised when command is malformed
         InexistentStock     exception raised when stock entered does not
                             exist
     """
-    option = input("> ")
+    # View Many Stock Summaries
+    if isinstance(after_command[0], list):
+        failed = fetch_stock_summaries(after_command[0])
+        if len(failed) > 0:
+            print(Colors.red + "Could not fetch " + list_to_string(failed)
+            + ".\n" + Colors.end)
+        return
+    symbol = after_command[0]
+    if not symbol == "portfolio":
+        check_symbol(symbol)
+    # View Stock Summary
+    if len(after_command) == 1:
+        Stock(symbol).fetch_stock_summary()
+    # View Stock Historical Data
+    elif len(after_command) == 3:
+        Stock(symbol).fetch_stock_historical_data()
+        Stock(symbol).stock_return_sd()
+    # View Stock Profile
+    elif after_command[1] == "profile":
+        Stock(symbol).fetch_stock_profile()
+    # View Stock Statistics
+    elif after_command[1] == "statistics":
+        Stock(symbol).fetch_stock_statistics()
+    # View Portfolio Chart
+    elif after_command[1] == "chart" and symbol == "portfolio":
+        if len(Portfolio().get_stock_list()) == 0:
+            print("\nYour stock portfolio is currently empty. Add"
+            + " more stocks to visualize your portfolio!\n")
+        else:
+            Chart(symbol).portfolio_stock_returns()
+    # View Stock Chart
+    elif after_command[1] == "chart":
+        Chart(symbol).historical_data_chart()
+    # View Portfolio Rolling Statistics
+    elif after_command[1] == "rolling" and symbol == "portfolio":
+        if len(Portfolio().get_stock_list()) == 0:
+            print("\nYour stock portfolio is currently empty. Add"
+            + " more stocks to see your portfolio statistics!\n")
+        else:
+            Portfolio().print_rolling_statistics()
+    # View Stock Rolling Statistics
+    elif after_command[1] == "rolling":
+        Stock(symbol).print_rolling_statistics(
+        Portfolio().risk_free_rates(minus_five_years()))
+        Chart(symbol).rolling_statistics_chart()
+
+@register("search")
+def search_command(after_command):
+    """
+    Handler for the search command.
 
+    Args:
+        after_command       list; [query]
+    """
+    records = symbol_index.search(after_command[0])
+    if len(records) == 0:
+        print("\nNo stocks match your search.\n")
+    else:
+        print("")
+        for record in records:
+            print(Colors.blue + record["symbol"].ljust(8) + Colors.end
+            + record["name"] + Colors.darkgrey + " ("
+            + record["exchange"] + ")" + Colors.end)
+        print("")
+
+@register("add")
+def add_command(after_command):
+    """
+    Handler for the add command.
+
+    Args:
+        after_command       list; [ticker_symbol] or [ticker_symbols]
+    Raises:
+        InexistentStock     exception raised when stock entered does not
+                            exist
+    """
+    # Add Many Stocks
+    if isinstance(after_command[0], list):
+        portfolio, failed = Portfolio().add_stocks(after_command[0])
+        if len(failed) > 0:
+            print(Colors.red + "\nCould not add " + list_to_string(failed)
+            + "." + Colors.end)
+    # Add Stock
+    else:
+        portfolio = Portfolio().add_stock(after_command[0])
+    print("Your stock portfolio currently contains "
+    + list_to_string(portfolio["Stock List"]) + ".\n")
+
+@register("remove")
+def remove_command(after_command):
+    """
+    Handler for the remove command.
+
+    Args:
+        after_command       list; [ticker_symbol]
+    """
+    portfolio = Portfolio().remove_stock(after_command[0])
+    stock_list = portfolio["Stock List"]
+    if len(stock_list) == 0:
+        print("Your stock portfolio is currently empty."
+        + " Add more stocks to your portfolio!\n")
+    else:
+        print("Your stock portfolio currently contains "
+        + list_to_string(stock_list) + ".\n")
+
+@register("lot")
+def lot_command(after_command):
+    """
+    Handler for the lot command.
+
+    Args:
+        after_command       list; [ticker_symbol, shares, price] or
+                            [ticker_symbol, shares, price, date]
+    Raises:
+        InexistentStock     exception raised when stock entered does not
+                            exist
+    """
     try:
-        first = parse(option)[0]
-        after_command = parse(option)[1:]
-        # View Stock Summary
-        if (first == "view" and len(after_command) == 1):
-            symbol = parse(option)[1]
-            Stock(symbol).fetch_stock_summary()
-            menu()
-        elif (first == "view" and len(after_command) == 2):
-            symbol = parse(option)[1]
-            second = parse(option)[2]
-        # View Stock Profile
-            if second == "profile":
-                Stock(symbol).fetch_stock_profile()
-        # View Stock Statistics
-            if second == "statistics":
-                Stock(symbol).fetch_stock_statistics()
-        # View Stock Chart
-            if (second == "chart") and (not symbol == "portfolio"):
-                Chart(symbol).historical_data_chart()
-        # View Portfolio Chart
-            if (second == "chart") and (symbol == "portfolio"):
-                stock_list = Portfolio().get_stock_list()
-                if len(stock_list) == 0:
-                    print("\nYour stock portfolio is currently empty. Add"
-                    + " more stocks to visualize your portfolio!\n")
-                else:
-                    Chart(symbol).portfolio_stock_returns()
-            menu()
-        # View Stock Historical Data
-        elif (first == "view" and len(after_command) == 3):
-            symbol = parse(option)[1]
-            Stock(symbol).fetch_stock_historical_data()
-            Stock(symbol).stock_return_sd()
-            menu()
-        # Add Stock
-        elif (first == "add"):
-            symbol = parse(option)[1]
-            portfolio = Portfolio().add_stock(symbol)
-            stock_list = portfolio["Stock List"]
-            print("Your stock portfolio currently contains "
-            + list_to_string(stock_list) + ".\n")
-            menu()
-        # Remove Stock
-        elif (first == "remove"):
-            symbol = parse(option)[1]
-            portfolio = Portfolio().remove_stock(symbol)
-            stock_list = portfolio["Stock List"]
-            if len(stock_list) == 0:
-                print("Your stock portfolio is currently empty."
-                + " Add more stocks to your portfolio!\n")
-            else:
-                print("Your stock portfolio currently contains "
-                + list_to_string(stock_list) + ".\n")
-            menu()
-        # Portfolio
-        elif (first == "portfolio"):
-            stock_list = Portfolio().get_stock_list()
-            if len(stock_list) == 0:
-                print("\nYour stock portfolio is currently empty. Add more"
-                + " stocks to see your portfolio data!\n")
-                menu()
-            elif len(stock_list) == 1:
-                Portfolio().print_portfolio("1.0")
-                menu()
-            else:
-                yes_no = input(Colors.purple + "\nWould you like to enter"
-                + " weights for each stock?" + Colors.end
-                + " (enter 'yes', 'no', or 'back'"
-                + " to go back to the main menu)"
-                + Colors.yellow + "\nNote: if you enter 'no', your stocks"
-                + " will have equally distributed weight in your portfolio."
-                + Colors.end + "\n> ")
-                add_weights(yes_no)
-                menu()
-        # Optimize Portfolio
-        elif (first == "optimize"):
-            stock_list = Portfolio().get_stock_list()
-            if len(stock_list) == 0:
-                print("\nYour stock portfolio is currently empty. Add more"
-                + " stocks to optimize your portfolio!\n")
-                menu()
-            elif len(stock_list) == 1:
-                Portfolio().print_portfolio("1.0")
-                menu()
-            else:
-                way = input(Colors.purple
-                + "\nHow would you like to optimize your portfolio?"
-                + Colors.end + " (enter 'back' to go back to the main menu)\n\n"
-                + "You can optimize your portfolio in one of two ways, enter:\n"
-                + Colors.blue + "1) Maximize Sharpe ratio, or\n"
-                + "2) Minimize volatility\n\n" + Colors.end + "> ")
-                ways_to_optimize(way)
-                menu()
-        # Help
-        elif (first == "help"):
-            question = input(Colors.purple
-            + "\nWhat can I help you with today?" + Colors.end
-            + " (enter 'back' anytime to go back to the main menu)\n> ")
-            ask(question)
-            menu()
-        # Quit
-        elif (first == "quit"):
-            print("\nSorry to see you go!\n")
-            sys.exit
-        else:
-            menu()
-    except Empty:
-        print(Colors.red + "Please enter a command.\n" + Colors.end)
-        menu()
-    except Malformed:
-        print(Colors.red + "Invalid command." + Colors.end)
-        print("\nYou must choose one of the menu options.")
-        menu()
-    except InexistentStock:
-        print(Colors.red + "The stock you entered does not exist.\n"
-        + Colors.end)
-        print("Please enter a valid stock.")
-        menu()
+        Portfolio().add_lot(*after_command)
+    except LotMalformed:
+        print(Colors.red + "The lot you entered was malformed." + Colors.end
+        + " Please enter a nonzero number of shares, a positive price and"
+        + " a date formatted YYYY-MM-DD.\n")
+        return
+    shares = after_command[1]
+    print(Colors.darkgrey + "\nYou recorded " + ("selling " + shares[1:]
+    if shares.startswith("-") else "buying " + shares) + " shares of "
+    + after_command[0] + " at " + after_command[2] + "." + Colors.end)
+    Portfolio().print_cost_basis()
+
+@register("basis")
+def basis_command(after_command):
+    """
+    Handler for the cost basis command.
+
+    Args:
+        after_command       list; empty
+    """
+    Portfolio().print_cost_basis()
+
+@register("portfolio")
+def portfolio_command(after_command):
+    """
+    Handler for the portfolio command.
+
+    Args:
+        after_command       list; empty
+    """
+    stock_list = Portfolio().get_stock_list()
+    if len(stock_list) == 0:
+        print("\nYour stock portfolio is currently empty. Add more"
+        + " stocks to see your portfolio data!\n")
+    elif len(stock_list) == 1:
+        Portfolio().print_portfolio("1.0")
+    else:
+        yes_no = input(Colors.purple + "\nWould you like to enter"
+        + " weights for each stock?" + Colors.end
+        + " (enter 'yes', 'no', or 'back'"
+        + " to go back to the main menu)"
+        + Colors.yellow + "\nNote: if you enter 'no', your stocks"
+        + " will have equally distributed weight in your portfolio."
+        + Colors.end + "\n> ")
+        add_weights(yes_no)
+
+@register("optimize")
+def optimize_command(after_command):
+    """
+    Handler for the optimize portfolio command.
+
+    Args:
+        after_command       list; ["portfolio"]
+    """
+    stock_list = Portfolio().get_stock_list()
+    if len(stock_list) == 0:
+        print("\nYour stock portfolio is currently empty. Add more"
+        + " stocks to optimize your portfolio!\n")
+    elif len(stock_list) == 1:
+        Portfolio().print_portfolio("1.0")
+    else:
+        way = input(Colors.purple
+        + "\nHow would you like to optimize your portfolio?"
+        + Colors.end + " (enter 'back' to go back to the main menu)\n\n"
+        + "You can optimize your portfolio in one of two ways, enter:\n"
+        + Colors.blue + "1) Maximize Sharpe ratio, or\n"
+        + "2) Minimize volatility\n\n" + Colors.end + "> ")
+        ways_to_optimize(way)
+
+@register("frontier")
+def frontier_command(after_command):
+    """
+    Handler for the efficient frontier command.
+
+    Args:
+        after_command       list; empty
+    """
+    if len(Portfolio().get_stock_list()) < 2:
+        print("\nAdd at least two stocks to your portfolio to see"
+        + " its efficient frontier!\n")
+    else:
+        with Portfolio().efficient_frontier() as result:
+            Chart("portfolio").efficient_frontier(result)
+
+@register("backtest")
+def backtest_command(after_command):
+    """
+    Handler for the backtest command.
+
+    Args:
+        after_command       list; empty
+    """
+    if len(Portfolio().get_stock_list()) == 0:
+        print("\nYour stock portfolio is currently empty. Add more"
+        + " stocks to backtest your portfolio!\n")
+    else:
+        result = Portfolio().backtest()
+        Portfolio().print_backtest(result)
+        Chart("portfolio").backtest_chart(result)
+
+@register("walkforward")
+def walkforward_command(after_command):
+    """
+    Handler for the walk-forward backtest command.
+
+    Args:
+        after_command       list; empty
+    """
+    if len(Portfolio().get_stock_list()) < 2:
+        print("\nAdd at least two stocks to your portfolio to"
+        + " backtest optimizing it!\n")
+    else:
+        try:
+            result = Portfolio().walk_forward()
+        except NotEnoughHistory:
+            print(Colors.red + "\nYour stocks do not have enough price"
+            + " history in common to backtest optimizing them. Every"
+            + " stock needs three years of prices." + Colors.end + "\n")
+            return
+        Portfolio().print_backtest(result)
+        Chart("portfolio").backtest_chart(result)
+
+@register("sweep")
+def sweep_command(after_command):
+    """
+    Handler for the parameter sweep command.
+
+    Args:
+        after_command       list; empty
+    """
+    if len(Portfolio().get_stock_list()) < 2:
+        print("\nAdd at least two stocks to your portfolio to"
+        + " sweep its settings!\n")
+    else:
+        results = Portfolio().parameter_sweep()
+        columns = ["years", "estimator", "risk_free", "schedule",
+        "method", "annual_return", "volatility", "sharpe_ratio"]
+        print(Colors.bold + Colors.blue + "\nBest settings by"
+        + " backtested Sharpe ratio:" + Colors.end)
+        print(results.sort_values("sharpe_ratio", ascending=False)
+        [columns].head(10).round(3).to_string(index=False))
+        print("\nAll " + str(len(results)) + " results were saved to "
+        + os.path.join(DATA_DIR, "sweeps", "sweep.csv") + ".\n")
+
+@register("risk")
+def risk_command(after_command):
+    """
+    Handler for the Value-at-Risk command.
+
+    Args:
+        after_command       list; empty
+    """
+    if len(Portfolio().get_stock_list()) == 0:
+        print("\nYour stock portfolio is currently empty. Add more"
+        + " stocks to see your portfolio's risk!\n")
+    else:
+        Portfolio().print_risk()
+
+@register("help")
+def help_command(after_command):
+    """
+    Handler for the help command.
+
+    Args:
+        after_command       list; empty
+    """
+    question = input(Colors.purple
+    + "\nWhat can I help you with today?" + Colors.end
+    + " (enter 'back' anytime to go back to the main menu)\n> ")
+    ask(question)
+
+@register("quit")
+def quit_command(after_command):
+    """
+    Handler for the quit command.
+
+    Args:
+        after_command       list; empty
+    Raises:
+        Quit                exception raised to end the menu loop
+    """
+    print("\nSorry to see you go!\n")
+    raise Quit
 
 def add_weights(yes_no):
     """
-    Helper function for portfolio command.
+    Helper function for portfolio command. Asks again until the user enters
+    valid weights, 'no' or 'back'.
 
     Args:
         yes_no                      string input
-    Returns:
-        answer                      string
-    Raises:
-        WeightsMismatch             exception raised when total number of
-                                    weights don't match the number of stocks
-                                    in user's current portfolio
-        WeightsMiscalculation       exception raised when total weights
-                                    entered do not add up to 1
-        WeightsMalformed            exception raised when weights are
-                                    malformed
     """
-    try:
-        if (yes_no.strip() == "yes"):
-            weights_list = input("\nPlease enter your weights"
-            + " below (separated by commas) for the following stocks in your"
-            + " portfolio:\n"
-            + Colors.yellow + "Note: Your weights should add to 1.\n\n"
-            + Colors.end + "  "
-            + list_to_string(Portfolio().get_stock_list()) + "\n> ")
-            Portfolio().print_portfolio(weights_list)
-        elif (yes_no.strip() == "no"):
-            stock_list = Portfolio().get_stock_list()
-            len_stock_list = len(stock_list)
-            weights_list = ""
-            for stock in stock_list:
-                weights_list = weights_list + "," \
-                + str(round(float(1/len_stock_list), 10))
-            Portfolio().print_portfolio(weights_list)
-        elif (yes_no.strip() == "back"):
-            print("\nYou may now choose any options from the main menu.")
-        else:
-            answer = input("\nPlease enter 'yes', 'no', or"
-            + " 'back' if you want to go back to the main menu.\n> ")
-            if answer == "back":
+    while True:
+        try:
+            if (yes_no.strip() == "yes"):
+                weights_list = input("\nPlease enter your weights"
+                + " below (separated by commas) for the following stocks in"
+                + " your portfolio:\n"
+                + Colors.yellow + "Note: Your weights should add to 1.\n\n"
+                + Colors.end + "  "
+                + list_to_string(Portfolio().get_stock_list()) + "\n> ")
+                Portfolio().print_portfolio(weights_list)
+                Portfolio().set_weights(weights_list)
+                return
+            elif (yes_no.strip() == "no"):
+                stock_list = Portfolio().get_stock_list()
+                len_stock_list = len(stock_list)
+                weights_list = ""
+                for stock in stock_list:
+                    weights_list = weights_list + "," \
+                    + str(round(float(1/len_stock_list), 10))
+                Portfolio().print_portfolio(weights_list)
+                return
+            elif (yes_no.strip() == "back"):
                 print("\nYou may now choose any options from the main menu.")
+                return
             else:
-                add_weights(answer)
-    except WeightsMismatch:
-        print(Colors.red + "The number of weights does not match"
-        + " the number of stocks in your portfolio." + Colors.end)
-        add_weights("yes")
-    except WeightsMiscalculation:
-        print(Colors.red + "The total weights you entered do not add"
-        + " up to 1." + Colors.end)
-        add_weights("yes")
-    except WeightsMalformed:
-        print(Colors.red + "The weights you entered were malformed."
-        + Colors.end + "Please make sure the numbers you enter sum to"
-        + " 1 and are separated by commas.")
-        add_weights("yes")
-
-def ways_to_optimize(input):
-    """
-    Helper function for optimize portfolio command.
+                yes_no = input("\nPlease enter 'yes', 'no', or"
+                + " 'back' if you want to go back to the main menu.\n> ")
+        except WeightsMismatch:
+            print(Colors.red + "The number of weights does not match"
+            + " the number of stocks in your portfolio." + Colors.end)
+            yes_no = "yes"
+        except WeightsMiscalculation:
+            print(Colors.red + "The total weights you entered do not add"
+            + " up to 1." + Colors.end)
+            yes_no = "yes"
+        except WeightsMalformed:
+            print(Colors.red + "The weights you entered were malformed."
+            + Colors.end + "Please make sure the numbers you enter sum to"
+            + " 1 and are separated by commas.")
+            yes_no = "yes"
+
+def ways_to_optimize(way):
+    """
+    Helper function for optimize portfolio command. Asks again until the
+    user enters a valid option or 'back'.
 
     Args:
-        ways        string input
-    Returns:
-        result      string
+        way         string input
     """
-    input = lower(input).strip()
     sharpe_ratio = ("1", "1)", "max", "maximize", "sharpe", "ratio")
     volatility = ("2", "2)", "min", "minimize", "vol", "volatility")
-    if any(word in input for word in sharpe_ratio):
-        Portfolio().optimize_pf_max_sharpe()
-    elif any(word in input for word in volatility):
-        Portfolio().optimize_pf_min_volatility()
-    elif (input.strip() == "back"):
-        print("\nYou may now choose any options from the main menu.")
-    else:
-        way = input("\nThat is not a valid option. Please try again.\n> ")
-        ways_to_optimize(way)
+    while True:
+        way = lower(way).strip()
+        if any(word in way for word in sharpe_ratio):
+            Portfolio().optimize_pf_max_sharpe()
+            return
+        elif any(word in way for word in volatility):
+            Portfolio().optimize_pf_min_volatility()
+            return
+        elif (way == "back"):
+            print("\nYou may now choose any options from the main menu.")
+            return
+        else:
+            way = input("\nThat is not a valid option. Please try again."
+            + "\n> ")
 
 def ask(question):
     """
-    Helper function for help command.
+    Helper function for help command. Answers questions until the user
+    enters 'back'.
 
     Args:
         question        string input
-    Returns:
-        answer          string
-    Raises:
-        NoAnswer        exception raised when help manual does not have an
-                        answer to the question asked
     """
-    try:
-        if (question == "again"):
-            question = input("\n> ")
-            ask(question)
-        elif (question.strip() == "back"):
-            print("\nYou may now choose any options from the main menu.")
-        else:
+    while (question.strip() != "back"):
+        try:
             help_manual(question)
-            ask("again")
-    except NoAnswer:
-        print("\nI don't know how to answer that.")
-        ask("again")
+        except NoAnswer:
+            print("\nI don't know how to answer that.")
+        question = input("\n> ")
+    print("\nYou may now choose any options from the main menu.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,234 @@
+"""
+Primary module for optimization
+
+This module contains the optimization session for the stock portfolio
+engine, which answers many optimization queries about the same stocks from
+one set of expected returns, covariance matrix and risk free rate.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import threading
+from datetime import date
+import numpy as np
+import pandas as pd
+from stats import *
+
+class OptimizationSession(object):
+    """
+    Builds the expected returns and covariance matrix of a universe of stocks
+    once, together with the risk free rate, and answers max-Sharpe,
+    min-volatility, efficient-return, efficient-risk and custom-objective
+    queries against them. Results are cached, and the efficient frontier
+    solved for a target return or risk is kept so that asking again with a
+    different target only updates the target and re-solves the same problem.
+    Sessions are shared between threads, so queries that solve a cached
+    problem or fill in the results take the session's lock.
+
+    Args:
+        engine              StatsEngine
+        risk_free_rate      float
+    """
+
+    def __init__(self, engine, risk_free_rate):
+        self.engine = engine
+        self.symbols = engine.symbols
+        self.expected_returns = pd.Series(engine.mean_returns,
+        index=engine.symbols)
+        self.cov_matrix = pd.DataFrame(engine.cov_matrix,
+        index=engine.symbols, columns=engine.symbols)
+        self.risk_free_rate = risk_free_rate
+        self.frontiers = {}
+        self.results = {}
+        self.lock = threading.Lock()
+
+    def new_frontier(self, weight_bounds=(0, 1)):
+        """
+        Args:
+            weight_bounds       tuple; minimum and maximum weight of each
+                                stock
+        Returns:
+            ef                  pypfopt EfficientFrontier
+        """
+        # imported here because pypfopt (and its solvers) take a long time
+        # to import and are only needed once something is optimized
+        from pypfopt.efficient_frontier import EfficientFrontier
+        return EfficientFrontier(self.expected_returns, self.cov_matrix,
+        weight_bounds=weight_bounds)
+
+    def solve(self, ef):
+        """
+        Returns the cleaned weights and the performance of the portfolio
+        that [ef] was just solved for.
+
+        Args:
+            ef                  pypfopt EfficientFrontier
+        Returns:
+            weights,            tuple; OrderedDict of stock to weight, and
+            performance         (expected return, volatility, Sharpe ratio)
+        """
+        return ef.clean_weights(), ef.portfolio_performance(verbose=False,
+        risk_free_rate=self.risk_free_rate)
+
+    def max_sharpe(self, weight_bounds=(0, 1)):
+        """
+        Returns the weights and performance of the portfolio with the highest
+        Sharpe ratio.
+
+        Args:
+            weight_bounds       tuple
+        Returns:
+            weights,            tuple
+            performance
+        """
+        key = ("max_sharpe", weight_bounds)
+        with self.lock:
+            if key not in self.results:
+                ef = self.new_frontier(weight_bounds)
+                ef.max_sharpe(self.risk_free_rate)
+                self.results[key] = self.solve(ef)
+            return self.results[key]
+
+    def min_volatility(self, weight_bounds=(0, 1)):
+        """
+        Returns the weights and performance of the portfolio with the lowest
+        volatility.
+
+        Args:
+            weight_bounds       tuple
+        Returns:
+            weights,            tuple
+            performance
+        """
+        key = ("min_volatility", weight_bounds)
+        with self.lock:
+            if key not in self.results:
+                ef = self.new_frontier(weight_bounds)
+                ef.min_volatility()
+                self.results[key] = self.solve(ef)
+            return self.results[key]
+
+    def targeted(self, method, target, weight_bounds):
+        """
+        Solves [method] ("efficient_return" or "efficient_risk") for
+        [target], reusing the problem already built for [method] and
+        [weight_bounds] if there is one.
+
+        Args:
+            method              string
+            target              float
+            weight_bounds       tuple
+        Returns:
+            weights,            tuple
+            performance
+        """
+        key = (method, weight_bounds, target)
+        with self.lock:
+            if key not in self.results:
+                ef = self.frontiers.get((method, weight_bounds))
+                if ef is None:
+                    ef = self.new_frontier(weight_bounds)
+                    self.frontiers[(method, weight_bounds)] = ef
+                getattr(ef, method)(float(target))
+                self.results[key] = self.solve(ef)
+            return self.results[key]
+
+    def efficient_return(self, target_return, weight_bounds=(0, 1)):
+        """
+        Returns the weights and performance of the portfolio with the lowest
+        volatility for an annualized expected return of [target_return].
+
+        Args:
+            target_return       float
+            weight_bounds       tuple
+        Returns:
+            weights,            tuple
+            performance
+        """
+        return self.targeted("efficient_return", target_return, weight_bounds)
+
+    def efficient_risk(self, target_volatility, weight_bounds=(0, 1)):
+        """
+        Returns the weights and performance of the portfolio with the highest
+        expected return for an annualized volatility of [target_volatility].
+
+        Args:
+            target_volatility   float
+            weight_bounds       tuple
+        Returns:
+            weights,            tuple
+            performance
+        """
+        return self.targeted("efficient_risk", target_volatility,
+        weight_bounds)
+
+    def custom_objective(self, objective, weight_bounds=(0, 1), **kwargs):
+        """
+        Returns the weights and performance of the portfolio minimizing the
+        convex function [objective], called as objective(w, **kwargs) where
+        w is the cvxpy weights variable.
+
+        Args:
+            objective           function
+            weight_bounds       tuple
+            kwargs              keyword arguments passed to [objective]
+        Returns:
+            weights,            tuple
+            performance
+        """
+        ef = self.new_frontier(weight_bounds)
+        ef.convex_objective(objective, **kwargs)
+        return self.solve(ef)
+
+    def trace_frontier(self, n_points=50, weight_bounds=(0, 1)):
+        """
+        Traces the efficient frontier by solving for the minimum volatility
+        portfolio at [n_points] target returns, from the minimum volatility
+        portfolio's return up to the highest expected return.
+
+        Args:
+            n_points            int
+            weight_bounds       tuple
+        Returns:
+            frontier            numpy array; (points x 2) matrix of expected
+                                return and volatility
+        """
+        low = self.min_volatility(weight_bounds)[1][0]
+        high = np.max(self.engine.mean_returns)
+        frontier = []
+        for target in np.linspace(low, high, n_points)[:-1]:
+            try:
+                performance = self.efficient_return(target, weight_bounds)[1]
+            except Exception:
+                continue
+            frontier.append((performance[0], performance[1]))
+        return np.array(frontier)
+
+session_cache = PriceCache(max_entries=8)
+
+def get_optimization_session(stock_list, start, risk_free_rate, end=None,
+estimator=None):
+    """
+    Returns the optimization session for the stocks in [stock_list] priced
+    between [start] and [end], building it only if it is not cached.
+
+    Args:
+        stock_list          string list
+        start               string; formatted YYYY-MM-DD
+        risk_free_rate      float
+        end                 string; formatted YYYY-MM-DD, default is today
+        estimator           string; covariance estimator spec, default is
+                            None for the pandas sample covariance
+    Returns:
+        session             OptimizationSession
+    """
+    if end is None:
+        end = str(date.today())
+    key = (tuple(stock_list), start, end, risk_free_rate, estimator)
+    session = session_cache.get(key)
+    if session is None:
+        session = OptimizationSession(get_stats_engine(stock_list, start,
+        end, estimator), risk_free_rate)
+        session_cache.put(key, session)
+    return session
@@ -10,20 +10,44 @@ May 3rd, 2020
 from colors import *
 from command import *
 from stock import *
-from pypfopt.efficient_frontier import EfficientFrontier
+from rates import *
+from stats import *
+from optimize import *
+from frontier import *
+from backtest import *
+from walkforward import *
+from sweep import *
+from holdings import *
+from risk import *
+from analytics import *
+from datetime import date, datetime
+import math
 
 class Portfolio(object):
     """
     Adds and removes specific stocks, as well as displays all the
-    calculations from a user's personalized stock portfolio.
+    calculations from a user's personalized stock portfolio. The portfolio
+    is kept in the portfolio store, so it is still there after the engine
+    is restarted.
 
     Args:
-        pf_dict     dict; portfolio dictionary that contains a list of
-                    stocks
+        name        string; name of the portfolio, default is
+                    DEFAULT_PORTFOLIO
+        store       PortfolioStore; default is the shared portfolio_store
     """
 
-    def __init__(self, pf_dict={"Stock List": []}):
-        self.pf_dict = pf_dict
+    def __init__(self, name=DEFAULT_PORTFOLIO, store=None):
+        self.name = name
+        self.store = portfolio_store if store is None else store
+
+    @property
+    def pf_dict(self):
+        """
+        Portfolio dictionary that contains a list of stocks and their saved
+        weights: a copy of the one in the portfolio store, which is only
+        changed through the store.
+        """
+        return self.store.load(self.name)
 
     def get_stock_list(self):
         """
@@ -34,22 +58,118 @@ class Portfolio(object):
         """
         return self.pf_dict["Stock List"]
 
+    def get_weights(self):
+        """
+        Returns the saved weights of the stocks in user's portfolio.
+
+        Returns:
+            weights         numpy array in stock list order, or None if no
+                            weights are saved
+        """
+        weights = self.pf_dict["Weights"]
+        if len(weights) == 0:
+            return None
+        return np.array([weights[symbol] for symbol in self.get_stock_list()])
+
+    def current_weights(self):
+        """
+        Returns the saved weights of the stocks in user's portfolio, or
+        equally distributed weights if none are saved.
+
+        Returns:
+            weights         numpy array in stock list order
+        """
+        weights = self.get_weights()
+        if weights is None:
+            stock_list = self.get_stock_list()
+            weights = np.ones(len(stock_list)) / len(stock_list)
+        return weights
+
+    def return_series(self, start=None, end=None):
+        """
+        Returns the shared return series of the stocks in user's portfolio.
+
+        Args:
+            start           string; formatted YYYY-MM-DD, default is ten
+                            years ago
+            end             string; formatted YYYY-MM-DD, default is today
+        Returns:
+            series          ReturnSeries
+        """
+        if start is None:
+            start = minus_ten_years()
+        return get_return_series(self.get_stock_list(), start, end)
+
+    def set_weights(self, weights):
+        """
+        Saves [weights] as the weights of the stocks in user's portfolio.
+
+        Args:
+            weights         string; weights separated by commas
+        Raises:
+            WeightsMismatch, WeightsMiscalculation, WeightsMalformed
+        """
+        weights = self.validate_weights(weights)
+        self.store.set_weights(self.name, dict(zip(self.get_stock_list(),
+        weights)))
+
+    def add_lot(self, symbol, shares, price, day=None):
+        """
+        Records buying [shares] of [symbol] at [price] on [day], adding the
+        stock to user's portfolio if needed.
+
+        Args:
+            symbol          string
+            shares          float or string; negative for a sale
+            price           float or string
+            day             string; formatted YYYY-MM-DD, default is today
+        Returns:
+            cost_basis      dict; stock to (shares, total cost, average cost)
+        Raises:
+            InexistentStock     exception when the stock does not exist
+            LotMalformed        exception when the shares, price or date are
+                                malformed
+        """
+        symbol = capitalize(symbol)
+        try:
+            shares = float(shares)
+            price = float(price)
+            day = str(date.today()) if day is None \
+            else str(datetime.strptime(str(day), "%Y-%m-%d").date())
+        except ValueError:
+            raise LotMalformed
+        if shares == 0 or not math.isfinite(shares) \
+        or not (price > 0 and math.isfinite(price)):
+            raise LotMalformed
+        if not symbol_index.exists(symbol):
+            raise InexistentStock
+        self.store.add_lot(self.name, symbol, shares, price, day)
+        return self.cost_basis()
+
+    def cost_basis(self):
+        """
+        Returns:
+            cost_basis      dict; stock to (shares, total cost, average cost)
+        """
+        return self.store.cost_basis(self.name)
+
     def add_stock(self, symbol):
         """
         Adds symbol of stock interested to the stock list in user's portfolio
         only if the stock does not already exist in the portfolio. If it
         exists, do nothing. The stock list should not have any duplicates.
+        The stock is checked against the symbol index, and only with the
+        market data provider if the index cannot vouch for it.
         
         Args:
             symbol      string
         Returns:
             pf_dict     dict; portfolio dictionary that contains a list of
                         stocks
+        Raises:
+            InexistentStock     exception when the stock does not exist
         """
-        try:
-            stock = yf.Ticker(symbol)
-            json_text = stock.info
-        except:
+        if not symbol_index.exists(capitalize(symbol)):
             raise InexistentStock
 
         stock_list = self.get_stock_list()
@@ -58,11 +178,48 @@ class Portfolio(object):
             + " is already in your stock portfolio." + Colors.end)
             return self.pf_dict
         else:
-            stock_list = stock_list.append(capitalize(symbol))
+            self.store.add_symbol(self.name, capitalize(symbol))
             print(Colors.darkgrey + "\nYou added " + symbol
             + " to your portfolio." + Colors.end)
             return self.pf_dict
 
+    def add_stocks(self, symbols):
+        """
+        Adds every stock in [symbols] that exists to the stock list in user's
+        portfolio. The stocks are validated against the symbol index, and
+        the ones it cannot vouch for are validated concurrently with the
+        market data provider. Stocks that do not exist or could not be
+        fetched are skipped.
+
+        Args:
+            symbols     string list
+        Returns:
+            pf_dict,    tuple; portfolio dictionary that contains a list of
+            failed      stocks, and string list of symbols that were not added
+        """
+        symbols = [capitalize(symbol) for symbol in symbols]
+        valid = dict((symbol, symbol_index.validate(symbol))
+        for symbol in symbols)
+        unknown = [symbol for symbol in symbols if valid[symbol] is None]
+        try:
+            info = get_provider().get_info(unknown) if len(unknown) > 0 \
+            else {}
+        except Exception:
+            info = {}
+        symbol_index.confirm(list(info))
+        failed = []
+        for symbol in symbols:
+            if valid[symbol] is None and symbol not in info:
+                failed.append(symbol)
+            elif symbol in self.get_stock_list():
+                print(Colors.darkgrey + "\n" + symbol
+                + " is already in your stock portfolio." + Colors.end)
+            else:
+                self.store.add_symbol(self.name, symbol)
+                print(Colors.darkgrey + "\nYou added " + symbol
+                + " to your portfolio." + Colors.end)
+        return self.pf_dict, failed
+
     def remove_stock(self, symbol):
         """
         Removes symbol of stock interested from the stock list in user's
@@ -74,14 +231,18 @@ class Portfolio(object):
         Returns:
             pf_dict     dict; portfolio dictionary that contains a list of
                         stocks
+        Raises:
+            InexistentStock     exception when the stock is not in the
+                                portfolio and does not exist
         """
         stock_list = self.get_stock_list()
         if capitalize(symbol) in stock_list:
-            stock_list = stock_list.remove(capitalize(symbol))
+            self.store.remove_symbol(self.name, capitalize(symbol))
             print(Colors.darkgrey + "\nYou removed " + symbol
             + " from your portfolio." + Colors.end)
             return self.pf_dict
         else:
+            check_symbol(capitalize(symbol))
             print(Colors.darkgrey + "\nYou cannot remove "
             + symbol + " because it is not in your stock portfolio."
             + Colors.end)
@@ -109,10 +270,36 @@ class Portfolio(object):
         except:
             raise WeightsMalformed
 
+    def validate_weights(self, weights):
+        """
+        Converts a given weights string to a numpy array, checking that there
+        is one weight per stock and that the weights add to 1.
+
+        Args:
+            weights                 string
+        Returns:
+            weights_list            numpy array
+        Raises:
+            WeightsMismatch         exception raised when number of weights
+                                    does not match number of stocks in user's
+                                    current portfolio
+            WeightsMiscalculation   exception raised when weights do not add
+                                    to 1
+            WeightsMalformed        exception raised when weights are
+                                    malformed
+        """
+        weights = self.convert_weights_to_array(weights)
+        if len(weights) != len(self.get_stock_list()):
+            raise WeightsMismatch
+        elif round(np.sum(weights), 9) != 1.:
+            raise WeightsMiscalculation
+        return weights
+
     def risk_free_rate(self, inflation_rate=0.018):
         """
         Calculates the current risk free rate based on government bond rate
-        and inflation rate.
+        and inflation rate. The government bond rate is cached by the rate
+        service, so it is only fetched once it has gone stale.
 
         Args:
             inflation_rate      float; default is set to 0.018 – the
@@ -120,7 +307,29 @@ class Portfolio(object):
         Returns:
             risk_free_rate      float
         """
-        return ((1.0 + get_gov_bond_rate())/(1.0 + inflation_rate)) - 1.0
+        return ((1.0 + rate_service.current())/(1.0 + inflation_rate)) - 1.0
+
+    def risk_free_rates(self, start, end=None, inflation_rate=0.018):
+        """
+        Calculates the daily risk free rates between [start] and [end] based
+        on the historical government bond rates and inflation rate, for
+        Sharpe ratios over past windows. If the historical rates cannot be
+        fetched, the current risk free rate is used for every day.
+
+        Args:
+            start               string; formatted YYYY-MM-DD
+            end                 string; formatted YYYY-MM-DD, default is
+                                today
+            inflation_rate      float; default is set to 0.018 – the
+                                inflation rate in 2019
+        Returns:
+            risk_free_rates     pandas Series indexed by date, or float
+        """
+        try:
+            return ((1.0 + rate_service.history(start, end))
+            /(1.0 + inflation_rate)) - 1.0
+        except IOError:
+            return self.risk_free_rate(inflation_rate)
 
     def portfolio_calculations(self, weights):
         """
@@ -134,21 +343,103 @@ class Portfolio(object):
             sharpe_ratio, variance
         """
         stock_list = self.get_stock_list()
-        data = web.DataReader(stock_list, data_source="yahoo", \
-        start=minus_ten_years())['Adj Close']
-        returns = data.pct_change()
-        mean_return = returns.mean()
-        # there are 252 trading days this year (2020)
-        covariance_matrix = returns.cov() * 252
-        
-        expected_returns = round(np.sum(mean_return * weights) * 252, 2)
-        variance = round(np.dot(weights.T, \
-        np.dot(covariance_matrix, weights)), 2)
+        engine = get_stats_engine(stock_list, minus_ten_years())
+        returns, sds, sharpe_ratios, variances = engine.evaluate(weights)
+
+        expected_returns = round(returns[0], 2)
+        variance = round(variances[0], 2)
         expected_sd = round(np.sqrt(variance), 2)
         sharpe_ratio = round((expected_returns-self.risk_free_rate())/expected_sd, 2)
 
         return expected_returns, expected_sd, sharpe_ratio, variance
 
+    def portfolio_analytics(self, weights):
+        """
+        Calculates the drawdowns, Sortino and Calmar ratios, beta to the
+        S&P 500 and risk contribution of each stock of user's portfolio over
+        the past ten years, from the shared return series and statistics
+        engine.
+
+        Args:
+            weights             numpy array
+        Returns:
+            analytics           dict; see portfolio_analytics, with
+                                "max_drawdown_start" and "max_drawdown_end"
+                                as dates
+        """
+        stock_list = self.get_stock_list()
+        start = minus_ten_years()
+        returns = self.return_series(start).returns().iloc[1:]
+        benchmark = get_return_series([BENCHMARK], start).returns()[BENCHMARK] \
+        .reindex(returns.index)
+        analytics = portfolio_analytics(returns.values, weights,
+        get_stats_engine(stock_list, start).cov_matrix, benchmark.values,
+        risk_free_rate=self.risk_free_rate())
+        for name in ("max_drawdown_start", "max_drawdown_end"):
+            analytics[name] = returns.index[analytics[name]].date() \
+            if len(returns) > 0 else None
+        return analytics
+
+    def print_analytics(self, weights, max_rows=10):
+        """
+        Prints the drawdown and risk attribution analytics of user's
+        portfolio, with the risk contributions of the [max_rows] stocks
+        contributing the most.
+
+        Args:
+            weights             numpy array
+            max_rows            int
+        Returns:
+            analytics           string
+        """
+        stock_list = self.get_stock_list()
+        analytics = self.portfolio_analytics(weights)
+        print(Colors.bold + "Risk Analytics" + Colors.end
+        + Colors.blue + "\nMax Drawdown:     " + Colors.end
+        + format(analytics["max_drawdown"], ".1%") + " ("
+        + str(analytics["max_drawdown_start"]) + " to "
+        + str(analytics["max_drawdown_end"]) + ")"
+        + Colors.blue + "\nLongest Drawdown: " + Colors.end
+        + str(analytics["max_drawdown_duration"]) + " trading days"
+        + Colors.blue + "\nCurrent Drawdown: " + Colors.end
+        + format(analytics["current_drawdown"], ".1%")
+        + Colors.blue + "\nSortino Ratio:    " + Colors.end
+        + str(round(analytics["sortino"], 2))
+        + Colors.blue + "\nCalmar Ratio:     " + Colors.end
+        + str(round(analytics["calmar"], 2))
+        + Colors.blue + "\nBeta:             " + Colors.end
+        + str(round(analytics["beta"], 2)) + " (to the S&P 500)\n")
+
+        order = np.argsort(-analytics["component"])[:max_rows]
+        print(Colors.blue + "Stock     Weight  Marginal  Component"
+        + "  % of Risk" + Colors.end)
+        for i in order:
+            print(stock_list[i].ljust(8) + str(round(weights[i], 2)).rjust(8)
+            + str(round(analytics["marginal"][i], 3)).rjust(10)
+            + str(round(analytics["component"][i], 3)).rjust(11)
+            + format(analytics["percent"][i], ".1%").rjust(11))
+        if len(stock_list) > max_rows:
+            print("... and " + str(len(stock_list) - max_rows)
+            + " more stocks")
+        print("")
+
+    def score_portfolios(self, weights):
+        """
+        Calculates annualized expected returns, annualized expected standard
+        deviations, Sharpe ratios, and variances of many portfolios of the
+        stocks in user's portfolio at once, e.g. to screen candidate weights.
+
+        Args:
+            weights                             numpy array; (portfolios x
+                                                stocks) matrix, with columns
+                                                in stock list order
+        Returns:
+            expected_returns, expected_sd,      numpy array tuple
+            sharpe_ratios, variances
+        """
+        engine = get_stats_engine(self.get_stock_list(), minus_ten_years())
+        return engine.evaluate(weights, self.risk_free_rate())
+
     def print_portfolio(self, weights):
         """
         Prints the user's current portfolio when users type in menu command
@@ -167,96 +458,345 @@ class Portfolio(object):
                                         add to 1
         """
         stock_list = self.get_stock_list()
-        weights = self.convert_weights_to_array(weights)
+        weights = self.validate_weights(weights)
+        expected_return, expected_sd, sharpe_ratio, variance = \
+        [str(x) for x in self.portfolio_calculations(weights)]
+
+        print(Colors.bold + Colors.blue
+        + "\nThis is your current portfolio:" + Colors.end
+        + "\nStocks:          " + list_to_string(stock_list)
+        + "\nExpected Return: " + expected_return
+        + "\nSharpe Ratio:    " + sharpe_ratio
+        + "\nVariance:        " + variance + "\n"
+        + Colors.blue + "\nYour portfolio annualized expected return is "
+        + expected_return
+        + " and portfolio annualized volatility is "
+        + expected_sd + ".\n" + Colors.end)
+        self.print_analytics(weights)
+
+    def print_rolling_statistics(self, weights=None):
+        """
+        Prints the latest rolling statistics of user's portfolio over the past
+        month, quarter and year, and the correlations between its stocks over
+        the past year.
 
-        if len(weights) != len(stock_list):
-            raise WeightsMismatch
-        elif round(np.sum(weights), 9) != 1.:
-            raise WeightsMiscalculation
-        else:
-            expected_return = str(self.portfolio_calculations(weights)[0])
-            expected_sd = str(self.portfolio_calculations(weights)[1])
-            sharpe_ratio = str(self.portfolio_calculations(weights)[2])
-            variance = str(self.portfolio_calculations(weights)[3])
-
-            print(Colors.bold + Colors.blue
-            + "\nThis is your current portfolio:" + Colors.end
-            + "\nStocks:          " + list_to_string(stock_list)
-            + "\nExpected Return: " + expected_return
-            + "\nSharpe Ratio:    " + sharpe_ratio
-            + "\nVariance:        " + variance + "\n"
-            + Colors.blue + "\nYour portfolio annualized expected return is "
-            + expected_return
-            + " and portfolio annualized volatility is "
-            + expected_sd + ".\n" + Colors.end)
-
-    def optimize_pf_max_sharpe(self):
+        Args:
+            weights                 numpy array; default is None for the
+                                    saved weights, or equally distributed
+                                    weights if none are saved
+        Returns:
+            rolling_statistics      string
         """
-        Optimizes the user's portfolio by maximizing its Sharpe ratio.
+        if weights is None:
+            weights = self.current_weights()
+        series = self.return_series()
+        stock_returns = series.returns().iloc[1:].fillna(0.)
+        portfolio_returns = series.portfolio_returns(weights).iloc[1:] \
+        .to_frame()
+        benchmark = get_price_history(BENCHMARK, minus_ten_years()) \
+        .pct_change()
+
+        risk_free_rates = self.risk_free_rates(minus_ten_years())
+        latest = [rolling_statistics(portfolio_returns, benchmark, window,
+        risk_free_rate=risk_free_rates) for window in WINDOWS]
+        print("\n" + Colors.bold + "Your Portfolio Rolling Statistics"
+        + Colors.end + "\n" + Colors.blue + "Window:       " + Colors.end
+        + "".join(str(window).rjust(9) + " days" for window in WINDOWS))
+        for name, label in (("return", "Return:       "),
+        ("volatility", "Volatility:   "), ("sharpe", "Sharpe Ratio: "),
+        ("beta", "Beta:         "), ("correlation", "Correlation:  ")):
+            print(Colors.blue + label + Colors.end + "".join(
+            str(round(statistics[name]["Portfolio"].iloc[-1], 2)).rjust(14)
+            for statistics in latest))
+
+        print("\n" + Colors.bold + "Correlations over the past "
+        + str(WINDOWS[-1]) + " days" + Colors.end)
+        print(current_correlations(stock_returns).round(2).to_string())
+        print("\nBeta and correlation are measured against the S&P 500.\n")
+
+    def value_at_risk(self, weights=None, confidence=(0.95, 0.99),
+    horizon=1, method="historical", n_scenarios=100000, seed=None):
+        """
+        Calculates the Value-at-Risk and Conditional Value-at-Risk of user's
+        portfolio, or of many portfolios of its stocks at once, over the past
+        ten years.
 
+        Args:
+            weights             numpy array; weights vector or (portfolios x
+                                stocks) matrix, default is None for the
+                                saved weights, or equally distributed
+                                weights if none are saved
+            confidence          float or float tuple
+            horizon             int; number of trading days
+            method              string; "historical", "parametric" or
+                                "monte_carlo"
+            n_scenarios         int; number of Monte Carlo scenarios
+            seed                int; default is None
         Returns:
-            expected_return, volatility,        string
-            sharpe_ratio
+            var,                numpy array tuple; (confidence levels x
+            cvar                portfolios) matrices of losses as fractions
+                                of the portfolio's value
         """
-        stock_list = self.get_stock_list()
-        data = web.DataReader(stock_list, data_source="yahoo", \
-        start=minus_ten_years())['Adj Close']
-        returns = data.pct_change()
-        expected_returns = returns.mean() * 252
-        cov_matrix = returns.cov() * 252
+        if weights is None:
+            weights = self.current_weights()
+        engine = get_risk_engine(self.get_stock_list(), minus_ten_years())
+        return engine.value_at_risk(weights, confidence, horizon, method,
+        n_scenarios, seed)
+
+    def print_cost_basis(self):
+        """
+        Prints the shares held, the total cost and the average cost of each
+        stock with purchase lots in user's portfolio.
+
+        Returns:
+            cost_basis          string
+        """
+        cost_basis = self.cost_basis()
+        if len(cost_basis) == 0:
+            print("\nYou have not recorded any purchases. Record one with"
+            + " 'lot [ticker] [shares] [price] [date]'.\n")
+            return
+        print("\n" + Colors.bold + "Your Portfolio Cost Basis" + Colors.end
+        + "\n" + Colors.blue + "Stock" + "Shares".rjust(13)
+        + "Total Cost".rjust(15) + "Average Cost".rjust(15) + Colors.end)
+        for symbol, (shares, cost, average) in sorted(cost_basis.items()):
+            print(Colors.blue + symbol.ljust(5) + Colors.end
+            + format(shares, ",.2f").rjust(13) + format(cost, ",.2f").rjust(15)
+            + format(average, ",.2f").rjust(15))
+        print("")
+
+    def print_risk(self, weights=None, confidence=(0.95, 0.99),
+    horizons=(1, 10)):
+        """
+        Prints the Value-at-Risk and Conditional Value-at-Risk of user's
+        portfolio with every method, at each [confidence] level and over
+        each of [horizons] trading days.
+
+        Args:
+            weights             numpy array; default is None for the saved
+                                weights, or equally distributed weights
+            confidence          float tuple
+            horizons            int tuple
+        Returns:
+            risk                string
+        """
+        header = "".join(("VaR " + format(level, ".0%")).rjust(11)
+        + ("CVaR " + format(level, ".0%")).rjust(11) for level in confidence)
+        for horizon in horizons:
+            print("\n" + Colors.bold + "Your Portfolio Value-at-Risk over "
+            + str(horizon) + " trading day" + ("s" if horizon > 1 else "")
+            + Colors.end + "\n" + Colors.blue + "Method:       " + Colors.end
+            + header)
+            for method, label in (("historical", "Historical:   "),
+            ("parametric", "Parametric:   "), ("monte_carlo", "Monte Carlo:  ")):
+                var, cvar = self.value_at_risk(weights, confidence, horizon,
+                method)
+                print(Colors.blue + label + Colors.end + "".join(
+                format(var[i, 0], ".2%").rjust(11)
+                + format(cvar[i, 0], ".2%").rjust(11)
+                for i in range(len(confidence))))
+        print("\nLosses are percentages of your portfolio's value.\n")
+
+    def backtest(self, weights=None, schedule="monthly", threshold=None,
+    cost=0.001, cash=0., cash_rate=0.):
+        """
+        Simulates the user's portfolio over the past ten years, rebalancing
+        back to [weights] on a calendar [schedule] or, if [threshold] is
+        given, whenever a stock drifts more than [threshold] from its weight.
+
+        Args:
+            weights             numpy array; default is None for the
+                                saved weights, or equally distributed
+                                weights if none are saved
+            schedule            string; "daily", "weekly", "monthly",
+                                "quarterly", "yearly" or "none"
+            threshold           float; default is None
+            cost                float; transaction cost per unit traded,
+                                default is 0.001 (10 basis points)
+            cash                float; fraction held in cash, default is 0.0
+            cash_rate           float; annual return on cash, default is 0.0
+        Returns:
+            result              BacktestResult
+        """
+        if weights is None:
+            weights = self.current_weights()
+        prices = get_price_history(self.get_stock_list(), minus_ten_years())
+        return backtest(prices, weights, schedule, threshold, cost, cash,
+        cash_rate, risk_free_rate=self.risk_free_rates(minus_ten_years()))
+
+    def walk_forward(self, method="max_sharpe", lookback=756,
+    schedule="quarterly", estimator=None, cost=0.001, processes=None):
+        """
+        Backtests optimizing user's portfolio over the past ten years
+        without look-ahead: on each [schedule] rebalance date the weights
+        are optimized with [method] on the previous [lookback] days only.
+
+        Args:
+            method              string; "max_sharpe" or "min_volatility"
+            lookback            int; trading days in each training window,
+                                default is 756 (three years)
+            schedule            string; "monthly", "quarterly" or "yearly"
+            estimator           string; covariance estimator spec, default
+                                is None for the sample covariance
+            cost                float; transaction cost per unit traded
+            processes           int; default is the number of CPUs
+        Returns:
+            result              WalkForwardResult
+        Raises:
+            NotEnoughHistory    exception raised when the stocks in user's
+                                portfolio have less than [lookback] days of
+                                prices in common
+        """
+        prices = get_price_history(self.get_stock_list(), minus_ten_years())
+        return walk_forward(prices, method, lookback, schedule, estimator,
+        self.risk_free_rates(minus_ten_years()), cost, processes)
+
+    def parameter_sweep(self, grid=DEFAULT_GRID, processes=None):
+        """
+        Optimizes and backtests user's portfolio for every combination of
+        the settings in [grid], writing the results to one CSV file.
+
+        Args:
+            grid                dict; parameter name to a list of values,
+                                default is DEFAULT_GRID
+            processes           int; default is the number of CPUs
+        Returns:
+            results             pandas DataFrame; one row per combination
+        """
+        today = str(date.today())
+        start = str(int(today[:4]) - max(grid["years"])) + today[4:]
+        prices = get_price_history(self.get_stock_list(), start)
+        return run_sweep(prices, grid, processes)
+
+    def print_backtest(self, result):
+        """
+        Prints the summary of a backtest of user's portfolio.
+
+        Args:
+            result              BacktestResult
+        Returns:
+            backtest            string
+        """
+        summary = result.summary()
+        print(Colors.bold + Colors.blue + "\nYour portfolio backtest from "
+        + str(result.nav.index[0].date()) + " to "
+        + str(result.nav.index[-1].date()) + ":" + Colors.end
+        + "\nTotal Return:       " + str(round(summary["total_return"], 2))
+        + "\nAnnual Return:      " + str(round(summary["annual_return"], 2))
+        + "\nAnnual Volatility:  " + str(round(summary["volatility"], 2))
+        + "\nSharpe Ratio:       " + str(round(summary["sharpe_ratio"], 2))
+        + "\nRebalances:         " + str(summary["rebalances"])
+        + "\nAnnual Turnover:    " + str(round(summary["annual_turnover"], 2))
+        + "\nTransaction Costs:  " + str(round(result.costs, 4)) + "\n")
+
+    def optimization_session(self, estimator=None):
+        """
+        Returns the optimization session for the stocks in user's portfolio,
+        so that every optimization of the same stocks shares one set of
+        expected returns, covariance matrix and risk free rate.
 
-        ef = EfficientFrontier(expected_returns, cov_matrix)
-        max_sharpe_weights = ef.max_sharpe(self.risk_free_rate())
-        clean_weights = ef.clean_weights()
+        Args:
+            estimator       string; covariance estimator, e.g. "ledoit_wolf",
+                            "ewma:60" or "semicovariance", default is None
+                            for the sample covariance
+        Returns:
+            session         OptimizationSession
+        """
+        return get_optimization_session(self.get_stock_list(),
+        minus_ten_years(), self.risk_free_rate(), estimator=estimator)
 
+    def print_optimized(self, goal, weights, performance):
+        """
+        Prints the weights and performance of an optimized portfolio.
+
+        Args:
+            goal                string; what the weights achieve
+            weights             dict; stock to weight
+            performance         tuple; (expected return, volatility,
+                                Sharpe ratio)
+        """
         print("\nThe weights of each stock below will"
-        + Colors.bold + " maximize your"
-        + " portfolio's Sharpe ratio" + Colors.end + ":")
-        for stock, weight in clean_weights.items():
+        + Colors.bold + " " + goal + Colors.end + ":")
+        for stock, weight in weights.items():
             print(Colors.blue + stock + ":" + Colors.end + extra_spaces(stock)
                  + str(round(weight, 2)))
         print()
 
-        performance = ef.portfolio_performance(verbose=False, \
-        risk_free_rate=self.risk_free_rate())
         print("Expected Annual Return: " + str(round(performance[0], 2))
             + "\nAnnual Volatility:      " + str(round(performance[1], 2))
             + "\nVariance:               " + str(round(performance[1]**2, 2))
             + "\nSharpe Ratio:           " + str(round(performance[2], 2)) + "\n")
-        
-    def optimize_pf_min_volatility(self):
+
+    def optimize_pf_max_sharpe(self, estimator=None):
         """
-        Optimizes the user's portfolio by minimizing its volatility.
+        Optimizes the user's portfolio by maximizing its Sharpe ratio.
 
+        Args:
+            estimator                           string; covariance estimator,
+                                                default is None for the
+                                                sample covariance
         Returns:
             expected_return, volatility,        string
             sharpe_ratio
         """
-        stock_list = self.get_stock_list()
-        data = web.DataReader(stock_list, data_source="yahoo", \
-        start=minus_ten_years())['Adj Close']
-        returns = data.pct_change()
-        expected_returns = returns.mean() * 252
-        cov_matrix = returns.cov() * 252
+        weights, performance = self.optimization_session(estimator) \
+        .max_sharpe()
+        self.print_optimized("maximize your portfolio's Sharpe ratio",
+        weights, performance)
 
-        ef = EfficientFrontier(expected_returns, cov_matrix)
-        min_vol_weights = ef.min_volatility()
-        clean_weights = ef.clean_weights()
+    def optimize_pf_min_volatility(self, estimator=None):
+        """
+        Optimizes the user's portfolio by minimizing its volatility.
 
-        print("\nThe weights of each stock below will"
-        + Colors.bold + " minimize your"
-        + " portfolio's volatility" + Colors.end + ":")
-        for stock, weight in clean_weights.items():
-            print(Colors.blue + stock + ":" + Colors.end + extra_spaces(stock)
-                 + str(round(weight, 2)))
-        print()
+        Args:
+            estimator                           string; covariance estimator,
+                                                default is None for the
+                                                sample covariance
+        Returns:
+            expected_return, volatility,        string
+            sharpe_ratio
+        """
+        weights, performance = self.optimization_session(estimator) \
+        .min_volatility()
+        self.print_optimized("minimize your portfolio's volatility",
+        weights, performance)
 
-        performance = ef.portfolio_performance(verbose=False, \
-        risk_free_rate=self.risk_free_rate())
-        print("Expected Annual Return: " + str(round(performance[0], 2))
-            + "\nAnnual Volatility:      " + str(round(performance[1], 2))
-            + "\nVariance:               " + str(round(performance[1]**2, 2))
-            + "\nSharpe Ratio:           " + str(round(performance[2], 2)) + "\n")
+    def efficient_frontier(self, n_portfolios=1000000, processes=None,
+    path=None):
+        """
+        Samples [n_portfolios] random portfolios of the stocks in user's
+        portfolio across [processes] worker processes, traces the efficient
+        frontier, and prints the best sampled portfolios.
+
+        Args:
+            n_portfolios        int
+            processes           int; default is the number of CPUs
+            path                string; where to save the statistics of
+                                every sampled portfolio, default is a
+                                temporary file removed when the result is
+                                closed
+        Returns:
+            result              FrontierResult
+        """
+        stock_list = self.get_stock_list()
+        result = generate_frontier(self.optimization_session(), n_portfolios,
+        processes=processes, path=path)
+
+        for title, (value, weights) in (("highest Sharpe ratio ("
+        + str(round(result.max_sharpe[0], 2)) + ")", result.max_sharpe),
+        ("lowest volatility (" + str(round(result.min_volatility[0], 2))
+        + ")", result.min_volatility)):
+            print("\nOut of " + str(n_portfolios) + " random portfolios,"
+            + " these weights have the" + Colors.bold + " " + title
+            + Colors.end + ":")
+            for stock, weight in zip(stock_list, weights):
+                print(Colors.blue + stock + ":" + Colors.end
+                + extra_spaces(stock) + str(round(weight, 2)))
+        if not result.temporary:
+            print("\nThe statistics of every portfolio were saved to "
+            + result.path + ".")
+        print("")
+        return result
 
 class WeightsMismatch(Exception):
     """
@@ -278,6 +818,14 @@ class WeightsMalformed(Exception):
     """
     pass
 
+class LotMalformed(Exception):
+    """
+    Raised when a purchase lot is malformed. For example, a lot with no
+    shares, a price that is not positive or a date that is not formatted
+    YYYY-MM-DD would be deemed malformed.
+    """
+    pass
+
 def list_to_string(lst):
     """
     Converts any list into a pretty formatted string.
@@ -0,0 +1,446 @@
+"""
+Primary module for market data providers
+
+This module contains the market data providers for the stock portfolio
+engine. Every download and web scrape in the engine goes through the current
+provider, which is Yahoo! Finance by default. A local provider serves the
+same data from files on disk, so the engine can run without a network.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import os
+import csv
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import pandas as pd
+from extract import *
+
+# columns of the daily bars returned by every provider
+COLUMNS = ["Open", "High", "Low", "Close", "Volume", "Adj Close"]
+
+# fields of each symbol in the symbol master
+SYMBOL_FIELDS = ["symbol", "name", "exchange", "sector", "status"]
+
+# symbol directories listing every stock traded in the US, and the names of
+# the exchange codes used in them
+SYMBOL_DIRECTORIES = [
+    "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt",
+    "https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt",
+]
+EXCHANGES = {"A": "NYSE American", "N": "NYSE", "P": "NYSE Arca",
+    "Z": "Cboe BZX", "V": "IEX"}
+
+class MarketDataProvider(object):
+    """
+    Interface that every market data provider implements.
+    """
+
+    def get_history(self, symbols, start, end):
+        """
+        Fetches daily bars of [symbols] between [start] and [end]. Symbols
+        whose bars could not be fetched are left out of the result.
+
+        Args:
+            symbols         string list
+            start           string; formatted YYYY-MM-DD
+            end             string; formatted YYYY-MM-DD
+        Returns:
+            history         dict; symbol to pandas DataFrame indexed by date
+                            with columns COLUMNS
+        Raises:
+            IOError         exception raised when the request failed
+        """
+        raise NotImplementedError
+
+    def get_info(self, symbols):
+        """
+        Fetches the stock information of [symbols], in the format of
+        yfinance's Ticker.info. If a single symbol is requested and its
+        information cannot be fetched, the error is raised; otherwise symbols
+        whose information could not be fetched are left out of the result.
+
+        Args:
+            symbols         string list
+        Returns:
+            info            dict; symbol to information dict
+        """
+        raise NotImplementedError
+
+    def get_page(self, symbol, page=""):
+        """
+        Fetches the HTML of the Yahoo! Finance quote page of [symbol], or of
+        its subpage [page] (e.g. "key-statistics").
+
+        Args:
+            symbol          string
+            page            string
+        Returns:
+            content         bytes
+        """
+        raise NotImplementedError
+
+    def get_pages(self, symbols, page=""):
+        """
+        Fetches the HTML of the quote page, or subpage [page], of every
+        symbol in [symbols]. Symbols whose page could not be fetched are left
+        out of the result.
+
+        Args:
+            symbols         string list
+            page            string
+        Returns:
+            pages           dict; symbol to bytes
+        """
+        pages = {}
+        for symbol in symbols:
+            try:
+                pages[symbol] = self.get_page(symbol, page)
+            except Exception:
+                pass
+        return pages
+
+    def get_rate(self, name):
+        """
+        Fetches the current yield of the rate [name] (e.g. "^TNX") as a
+        decimal.
+
+        Args:
+            name            string
+        Returns:
+            rate            float
+        """
+        raise NotImplementedError
+
+    def get_symbols(self):
+        """
+        Fetches the symbol master: every listed ticker symbol with its
+        company name, exchange, sector and listing status.
+
+        Returns:
+            symbols         dict list; one dict with the keys of SYMBOL_FIELDS
+                            per symbol
+        """
+        raise NotImplementedError
+
+class YahooProvider(MarketDataProvider):
+    """
+    Fetches market data from Yahoo! Finance with Pandas' DataReader, the
+    yfinance Python library and web scraping. Requests for many symbols are
+    sent concurrently over a bounded thread pool. Every request, including
+    the ones DataReader and yfinance send, goes through one shared HTTP
+    session, so that connections are reused and no request can take longer
+    than [timeout] seconds to connect or to send its next bytes. The HTTP
+    and market data libraries are imported on first use, since they are
+    slow to import.
+
+    Args:
+        max_workers     int; maximum number of requests sent at once
+        timeout         float; number of seconds to wait for each request
+    """
+
+    def __init__(self, max_workers=16, timeout=10):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.http_session = None
+
+    @property
+    def session(self):
+        """
+        Returns:
+            session         requests Session shared by every request, which
+                            gives requests sent without a timeout the
+                            provider's timeout
+        """
+        if self.http_session is None:
+            import requests
+
+            timeout = self.timeout
+
+            class TimeoutAdapter(requests.adapters.HTTPAdapter):
+                def send(self, request, **kwargs):
+                    if kwargs.get("timeout") is None:
+                        kwargs["timeout"] = timeout
+                    return requests.adapters.HTTPAdapter.send(self, request,
+                    **kwargs)
+
+            session = requests.Session()
+            adapter = TimeoutAdapter(pool_connections=4,
+            pool_maxsize=self.max_workers)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self.http_session = session
+        return self.http_session
+
+    def get_history(self, symbols, start, end):
+        import pandas_datareader.data as web
+        symbols = list(symbols)
+        if len(symbols) == 1:
+            bars = web.DataReader(symbols[0], data_source="yahoo",
+            start=start, end=end, session=self.session, timeout=self.timeout)
+            return {symbols[0]: bars[COLUMNS]}
+        bars = web.DataReader(symbols, data_source="yahoo", start=start,
+        end=end, session=self.session, timeout=self.timeout)
+        history = {}
+        # symbols DataReader could not download are missing from its columns
+        downloaded = set(bars.columns.get_level_values(1)) \
+        if len(bars.columns) > 0 else set()
+        for symbol in symbols:
+            if symbol in downloaded:
+                history[symbol] = bars.xs(symbol, axis=1, level=1)[COLUMNS] \
+                .dropna(how="all")
+        return history
+
+    def get_info(self, symbols):
+        import yfinance as yf
+        info, failures = fetch_concurrently(lambda symbol:
+        yf.Ticker(symbol, session=self.session).info, symbols,
+        self.max_workers, self.timeout)
+        if len(symbols) == 1 and len(failures) == 1:
+            raise failures[symbols[0]]
+        return info
+
+    def get_page(self, symbol, page=""):
+        url = "https://finance.yahoo.com/quote/" + symbol
+        if page != "":
+            url = url + "/" + page
+        return self.session.get(url, timeout=self.timeout).content
+
+    def get_pages(self, symbols, page=""):
+        pages, failures = fetch_concurrently(lambda symbol:
+        self.get_page(symbol, page), symbols, self.max_workers, self.timeout)
+        return pages
+
+    def get_rate(self, name):
+        price = extract_rate(self.get_page(name))["price"]
+        return float(price.replace(",", ""))/100.0
+
+    def get_symbols(self):
+        symbols = []
+        for url in SYMBOL_DIRECTORIES:
+            lines = self.session.get(url, timeout=self.timeout).text \
+            .strip().splitlines()
+            header = lines[0].split("|")
+            for line in lines[1:]:
+                row = dict(zip(header, line.split("|")))
+                if "File Creation Time" in line or row["Test Issue"] == "Y":
+                    continue
+                if "Symbol" in row:
+                    symbols.append({"symbol": row["Symbol"],
+                    "name": row["Security Name"], "exchange": "NASDAQ",
+                    "sector": "", "status": "active"
+                    if row["Financial Status"] in ("N", "") else "deficient"})
+                else:
+                    symbols.append({"symbol": row["ACT Symbol"]
+                    .replace(".", "-"), "name": row["Security Name"],
+                    "exchange": EXCHANGES.get(row["Exchange"], row["Exchange"]),
+                    "sector": "", "status": "active"})
+        return symbols
+
+class LocalProvider(MarketDataProvider):
+    """
+    Serves market data from files saved under [directory], laid out as:
+
+        history/[symbol].parquet or history/[symbol].csv    daily bars
+        info/[symbol].json                                  stock information
+        pages/[symbol].html                                 quote page
+        pages/[symbol]-[page].html                          quote subpage
+        rates.json                                          {name: rate}
+        symbols.csv                                         symbol master
+
+    A missing file raises IOError, the same way a failed download would.
+    tests/data holds a small sample set in this layout.
+
+    Args:
+        directory       string; folder containing the saved market data
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, *parts):
+        return os.path.join(self.directory, *parts)
+
+    def get_history(self, symbols, start, end):
+        history = {}
+        for symbol in symbols:
+            parquet_path = self.path("history", symbol + ".parquet")
+            if os.path.exists(parquet_path):
+                bars = pd.read_parquet(parquet_path)
+            else:
+                bars = pd.read_csv(self.path("history", symbol + ".csv"),
+                index_col=0, parse_dates=True)
+            bars.index.name = "Date"
+            history[symbol] = bars.sort_index().loc[start:end][COLUMNS]
+        return history
+
+    def get_info(self, symbols):
+        info = {}
+        for symbol in symbols:
+            try:
+                with open(self.path("info", symbol + ".json")) as f:
+                    info[symbol] = json.load(f)
+            except IOError:
+                if len(symbols) == 1:
+                    raise
+        return info
+
+    def get_page(self, symbol, page=""):
+        name = symbol if page == "" else symbol + "-" + page
+        with open(self.path("pages", name + ".html"), "rb") as f:
+            return f.read()
+
+    def get_rate(self, name):
+        with open(self.path("rates.json")) as f:
+            rates = json.load(f)
+        try:
+            return float(rates[name])
+        except KeyError:
+            raise IOError("no saved rate for " + name)
+
+    def get_symbols(self):
+        with open(self.path("symbols.csv"), newline="") as f:
+            return [dict((field, row.get(field) or "")
+            for field in SYMBOL_FIELDS) for row in csv.DictReader(f)]
+
+def fetch_concurrently(function, items, max_workers=16, timeout=10):
+    """
+    Calls [function] on every item in [items] over a thread pool of at most
+    [max_workers] threads. A call that raises, or that has not returned
+    [timeout] seconds after it started, is reported as a failure instead of
+    stopping the other calls; calls waiting for a thread are not timed until
+    they start. A call that has timed out cannot be stopped and keeps its
+    thread, so [function] should give its own requests the same timeout.
+
+    Args:
+        function        function taking one item
+        items           list
+        max_workers     int
+        timeout         float; number of seconds allowed per call
+    Returns:
+        results,        dict tuple; item to result of [function] for the
+        failures        calls that succeeded, and item to exception for the
+                        calls that failed
+    """
+    results = {}
+    failures = {}
+    if len(items) == 0:
+        return results, failures
+    started = {}
+
+    def call(position):
+        started[position] = time.time()
+        return function(items[position])
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers,
+    len(items))))
+    positions = dict((pool.submit(call, position), position)
+    for position in range(len(items)))
+    pending = set(positions)
+    while len(pending) > 0:
+        deadlines = [started[positions[future]] + timeout
+        for future in pending if positions[future] in started]
+        done, pending = wait(pending, max(0, min(deadlines) - time.time())
+        if len(deadlines) > 0 else timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                results[items[positions[future]]] = future.result()
+            except Exception as e:
+                failures[items[positions[future]]] = e
+        now = time.time()
+        for future in list(pending):
+            position = positions[future]
+            if position in started and now - started[position] >= timeout:
+                pending.discard(future)
+                failures[items[position]] = TimeoutError("no answer after "
+                + str(timeout) + " seconds")
+    # the threads of calls that timed out are left to finish on their own
+    pool.shutdown(wait=False)
+    return results, failures
+
+def record_fixtures(symbols, start, end, directory, source=None):
+    """
+    Saves the market data of [symbols] from [source] into [directory] in the
+    layout read by LocalProvider, so later runs can use it offline.
+
+    Args:
+        symbols         string list
+        start           string; formatted YYYY-MM-DD
+        end             string; formatted YYYY-MM-DD
+        directory       string
+        source          MarketDataProvider; default is YahooProvider
+    """
+    if source is None:
+        source = YahooProvider()
+    for folder in ("history", "info", "pages"):
+        os.makedirs(os.path.join(directory, folder), exist_ok=True)
+
+    for symbol, bars in source.get_history(symbols, start, end).items():
+        bars.to_csv(os.path.join(directory, "history", symbol + ".csv"))
+    for symbol, info in source.get_info(symbols).items():
+        with open(os.path.join(directory, "info", symbol + ".json"), "w") as f:
+            json.dump(info, f)
+    for symbol in symbols:
+        for page in ("", "key-statistics"):
+            name = symbol if page == "" else symbol + "-" + page
+            with open(os.path.join(directory, "pages", name + ".html"),
+            "wb") as f:
+                f.write(source.get_page(symbol, page))
+    with open(os.path.join(directory, "rates.json"), "w") as f:
+        json.dump({"^TNX": source.get_rate("^TNX")}, f)
+    write_symbols(os.path.join(directory, "symbols.csv"), source.get_symbols())
+
+def write_symbols(path, symbols):
+    """
+    Saves the symbol master [symbols] as a CSV file sorted by symbol, in the
+    layout read by LocalProvider.
+
+    Args:
+        path            string
+        symbols         dict list; one dict with the keys of SYMBOL_FIELDS
+                        per symbol
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, SYMBOL_FIELDS)
+        writer.writeheader()
+        writer.writerows(sorted(symbols, key=lambda row: row["symbol"]))
+    os.replace(tmp_path, path)
+
+current_provider = None
+
+def get_provider():
+    """
+    Returns the provider used for all market data. On first use, this is a
+    LocalProvider if the STOCK_ENGINE_DATA environment variable names a
+    folder of saved market data, and a YahooProvider otherwise.
+
+    Returns:
+        provider        MarketDataProvider
+    """
+    global current_provider
+    if current_provider is None:
+        if os.environ.get("STOCK_ENGINE_DATA"):
+            current_provider = LocalProvider(os.environ["STOCK_ENGINE_DATA"])
+        else:
+            current_provider = YahooProvider()
+    return current_provider
+
+def set_provider(provider):
+    """
+    Makes [provider] the provider used for all market data.
+
+    Args:
+        provider        MarketDataProvider
+    """
+    global current_provider
+    current_provider = provider
+
+class ProviderError(IOError):
+    """
+    Raised when a provider answers without the data requested.
+    """
+    pass
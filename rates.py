@@ -0,0 +1,144 @@
+"""
+Primary module for rates
+
+This module contains the rate service for the stock portfolio engine, which
+caches the yield of Treasury Yield 10 Years (^TNX) used as the risk free rate.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import os
+import json
+import time
+import threading
+from stock import *
+
+class RateService(object):
+    """
+    Caches the current yield of the rate [name] in memory and on disk. A
+    cached yield is reused until it is older than [max_age] seconds. If a new
+    yield cannot be fetched, the last known yield is returned no matter how
+    old it is, and no new fetch is tried for [retry_after] seconds, so that
+    an unreachable provider does not hold up every caller with a timeout.
+    Only one thread fetches at a time; the others use the last known yield
+    meanwhile.
+
+    Args:
+        name            string; ticker symbol of the rate, default is "^TNX"
+        max_age         float; number of seconds a cached yield stays fresh
+        path            string; location of the file caching the yields
+        retry_after     float; number of seconds to wait after a failed
+                        fetch before fetching again
+    """
+
+    def __init__(self, name="^TNX", max_age=3600,
+    path=os.path.join(DATA_DIR, "rates.json"), retry_after=300):
+        self.name = name
+        self.max_age = max_age
+        self.path = path
+        self.retry_after = retry_after
+        self.rate = None
+        self.fetched_at = 0.
+        self.failed_at = 0.
+        self.lock = threading.Lock()
+
+    def load(self):
+        """
+        Reads the last known yield, the time it was fetched and the time of
+        the last failed fetch from disk, if no yield is cached in memory yet.
+        """
+        if self.rate is not None:
+            return
+        try:
+            with open(self.path) as f:
+                cached = json.load(f)[self.name]
+            self.failed_at = float(cached.get("failed_at", 0.))
+            if cached.get("rate") is not None:
+                self.rate = float(cached["rate"])
+                self.fetched_at = float(cached["fetched_at"])
+        except (IOError, ValueError, KeyError):
+            pass
+
+    def save(self):
+        """
+        Writes the cached yield and the time it was fetched to disk.
+        """
+        try:
+            with open(self.path) as f:
+                cached = json.load(f)
+        except (IOError, ValueError):
+            cached = {}
+        cached[self.name] = {"rate": self.rate, "fetched_at": self.fetched_at,
+        "failed_at": self.failed_at}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cached, f)
+        os.replace(tmp_path, self.path)
+
+    def waiting(self):
+        """
+        Returns:
+            waiting         bool; True if the cached yield is fresh, or a
+                            fetch failed less than [retry_after] seconds ago
+        """
+        now = time.time()
+        return (self.rate is not None and now - self.fetched_at
+        <= self.max_age) or now - self.failed_at <= self.retry_after
+
+    def current(self):
+        """
+        Returns the current yield as a decimal, fetching it only if the cached
+        yield is missing or stale and no fetch failed recently.
+
+        Returns:
+            rate                        float
+        Raises:
+            TreasuryYieldFetchError     exception when the yield cannot be
+                                        fetched and no yield is cached
+        """
+        self.load()
+        if not self.waiting():
+            # a thread that has a yield to fall back on does not wait for
+            # another thread's fetch
+            if self.lock.acquire(blocking=self.rate is None):
+                try:
+                    if not self.waiting():
+                        self.fetch()
+                finally:
+                    self.lock.release()
+        if self.rate is None:
+            raise TreasuryYieldFetchError
+        return self.rate
+
+    def fetch(self):
+        """
+        Fetches the current yield and saves it, or saves the time of the
+        failure if it cannot be fetched.
+        """
+        try:
+            self.rate = get_provider().get_rate(self.name)
+            self.fetched_at = time.time()
+        except Exception:
+            self.failed_at = time.time()
+        try:
+            self.save()
+        except (IOError, OSError):
+            pass
+
+    def history(self, start, end=None):
+        """
+        Returns the daily yields between [start] and [end] as decimals. The
+        yields come from the price store, so a Sharpe ratio over any window
+        can use the yield of each day without extra requests.
+
+        Args:
+            start           string; formatted YYYY-MM-DD
+            end             string; formatted YYYY-MM-DD, default is today
+        Returns:
+            rates           pandas Series indexed by date
+        """
+        return get_price_history(self.name, start, end, "Close") / 100.0
+
+rate_service = RateService()
@@ -0,0 +1,145 @@
+"""
+Primary module for portfolio return series
+
+This module contains the return series of the stock portfolio engine, which
+builds the aligned matrix of stock returns once and derives the daily,
+weekly and monthly returns and cumulative returns of each stock and of a
+weighted portfolio from it, so that charts and statistics share them.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+from datetime import date
+import numpy as np
+import pandas as pd
+from cache import *
+
+# return frequencies and the pandas period each one follows
+FREQUENCIES = {
+    "daily": None,
+    "weekly": "W",
+    "monthly": "M",
+}
+
+class ReturnSeries(object):
+    """
+    Holds the prices of a universe of stocks aligned on the same days and
+    their daily returns, and derives the other series from them the first
+    time each is asked for:
+
+        - the returns of each stock at a frequency, from the prices on the
+          last trading day of each week or month,
+        - the returns of a portfolio of the stocks at a frequency, weighted
+          by its weights and rebalanced back to them at the start of each
+          period, where a missing stock return counts as 0, and
+        - the growth of $1 invested in each stock or in the portfolio.
+
+    Every series is kept once it has been derived.
+
+    Args:
+        prices          pandas DataFrame; daily prices with one column per
+                        stock
+    """
+
+    def __init__(self, prices):
+        self.prices = prices
+        self.symbols = list(prices.columns)
+        self.series = {"daily": prices.pct_change()}
+
+    def memoize(self, key, derive):
+        """
+        Returns the series kept under [key], calling [derive] to derive it
+        the first time.
+
+        Args:
+            key             tuple
+            derive          function; takes no arguments
+        Returns:
+            series          pandas Series or DataFrame
+        """
+        if key not in self.series:
+            self.series[key] = derive()
+        return self.series[key]
+
+    def returns(self, frequency="daily"):
+        """
+        Args:
+            frequency       string; key of FREQUENCIES
+        Returns:
+            returns         pandas DataFrame; returns of each stock, NaN for
+                            the first period
+        Raises:
+            ValueError      exception raised when [frequency] is unknown
+        """
+        if frequency not in FREQUENCIES:
+            raise ValueError("unknown frequency " + str(frequency))
+        if frequency == "daily":
+            return self.series["daily"]
+
+        def derive():
+            period_ends = ~self.prices.index.to_period(FREQUENCIES[frequency]) \
+            .duplicated(keep="last")
+            return self.prices[period_ends].pct_change()
+        return self.memoize(frequency, derive)
+
+    def cumulative(self, frequency="daily"):
+        """
+        Args:
+            frequency       string; key of FREQUENCIES
+        Returns:
+            growth          pandas DataFrame; growth of $1 invested in each
+                            stock
+        """
+        return self.memoize(("cumulative", frequency),
+        lambda: (self.returns(frequency) + 1).cumprod())
+
+    def portfolio_returns(self, weights, frequency="daily"):
+        """
+        Args:
+            weights         numpy array; one weight per stock
+            frequency       string; key of FREQUENCIES
+        Returns:
+            returns         pandas Series; returns of the portfolio
+        """
+        weights = tuple(float(weight) for weight in weights)
+        returns = self.returns(frequency)
+        return self.memoize(("portfolio", frequency, weights),
+        lambda: pd.Series(returns.fillna(0.).values.dot(weights),
+        index=returns.index, name="Portfolio"))
+
+    def portfolio_cumulative(self, weights, frequency="daily"):
+        """
+        Args:
+            weights         numpy array; one weight per stock
+            frequency       string; key of FREQUENCIES
+        Returns:
+            growth          pandas Series; growth of $1 invested in the
+                            portfolio
+        """
+        weights = tuple(float(weight) for weight in weights)
+        return self.memoize(("portfolio cumulative", frequency, weights),
+        lambda: (self.portfolio_returns(weights, frequency) + 1).cumprod())
+
+series_cache = PriceCache(ttl=86400, max_entries=8)
+
+def get_return_series(stock_list, start, end=None):
+    """
+    Returns the return series of the stocks in [stock_list] priced between
+    [start] and [end], building it only if it is not cached.
+
+    Args:
+        stock_list          string list
+        start               string; formatted YYYY-MM-DD
+        end                 string; formatted YYYY-MM-DD, default is today
+    Returns:
+        series              ReturnSeries
+    """
+    if end is None:
+        end = str(date.today())
+    key = (tuple(stock_list), start, end)
+    series = series_cache.get(key)
+    if series is None:
+        series = ReturnSeries(get_price_history(list(stock_list), start, end))
+        series_cache.put(key, series)
+    return series
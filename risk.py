@@ -0,0 +1,292 @@
+"""
+Primary module for risk
+
+This module contains the risk engine for the stock portfolio engine, which
+calculates the Value-at-Risk and Conditional Value-at-Risk (expected
+shortfall) of many portfolios of the same stocks at once, historically,
+parametrically and by Monte Carlo simulation.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import math
+from statistics import NormalDist
+import numpy as np
+from stats import *
+
+# ways Value-at-Risk can be calculated
+METHODS = ("historical", "parametric", "monte_carlo")
+
+# largest number of bytes a Monte Carlo simulation may hold in memory
+MEMORY_BUDGET = 64 * 2**20
+
+# fewest scenarios a Monte Carlo simulation draws at a time
+MIN_CHUNK = 1024
+
+class RiskEngine(object):
+    """
+    Calculates Value-at-Risk (VaR) and Conditional Value-at-Risk (CVaR) for
+    every row of a matrix of portfolio weights. Losses are fractions of the
+    portfolio's value, so a VaR of 0.02 at 95% confidence means that on 95%
+    of [horizon] day periods the portfolio loses less than 2%, and the CVaR
+    is the average loss on the other 5%.
+
+    The historical method uses the daily returns of the stocks, summed over
+    overlapping [horizon] day periods. The parametric method assumes normal
+    returns with the mean returns and covariance matrix of the statistics
+    engine. The Monte Carlo method simulates returns from the same normal
+    distribution with the Cholesky factor of the covariance matrix, a chunk
+    of scenarios at a time, keeping only the largest losses of each
+    portfolio so that its memory use stays within [memory_budget] bytes;
+    portfolios whose largest losses would not fit together are simulated in
+    groups over the same scenarios.
+
+    Args:
+        returns         pandas DataFrame; daily returns with one column per
+                        stock
+        engine          StatsEngine; of the same stocks
+        memory_budget   int; bytes a Monte Carlo simulation may hold
+    """
+
+    def __init__(self, returns, engine, memory_budget=MEMORY_BUDGET):
+        self.symbols = engine.symbols
+        self.returns = returns[self.symbols].iloc[1:].fillna(0.).values
+        self.mean_returns = engine.mean_returns / engine.trading_days
+        self.cov_matrix = engine.cov_matrix / engine.trading_days
+        self.memory_budget = memory_budget
+        self.cholesky_factor = None
+
+    def cholesky(self):
+        """
+        Returns the Cholesky factor of the daily covariance matrix, computed
+        once. A covariance matrix that is not positive definite (e.g. with
+        more stocks than days) is factored from its eigendecomposition
+        instead, with its negative eigenvalues set to 0.
+
+        Returns:
+            factor          numpy array; (stocks x stocks) matrix L with
+                            L L^T equal to the covariance, lower triangular
+                            unless it came from the eigendecomposition
+        """
+        if self.cholesky_factor is None:
+            try:
+                self.cholesky_factor = np.linalg.cholesky(self.cov_matrix)
+            except np.linalg.LinAlgError:
+                values, vectors = np.linalg.eigh(self.cov_matrix)
+                self.cholesky_factor = vectors * np.sqrt(np.clip(values, 0.,
+                None))
+        return self.cholesky_factor
+
+    def value_at_risk(self, weights, confidence=(0.95, 0.99), horizon=1,
+    method="historical", n_scenarios=100000, seed=None):
+        """
+        Calculates the VaR and CVaR of every row of [weights] at each
+        [confidence] level over [horizon] trading days.
+
+        Args:
+            weights             numpy array; (portfolios x stocks) matrix,
+                                or a single weights vector
+            confidence          float or float tuple; e.g. 0.95 for 95%
+            horizon             int; number of trading days
+            method              string; one of METHODS
+            n_scenarios         int; number of Monte Carlo scenarios
+            seed                int; Monte Carlo seed, default is None
+        Returns:
+            var,                numpy array tuple; (confidence levels x
+            cvar                portfolios) matrices of losses
+        Raises:
+            ValueError          exception raised when [method] is unknown
+        """
+        weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+        levels = np.atleast_1d(np.asarray(confidence, dtype=np.float64))
+        if method == "historical":
+            daily = self.returns.dot(weights.T)
+            totals = np.vstack([np.zeros((1, len(weights))),
+            np.cumsum(daily, axis=0)])
+            losses = -(totals[horizon:] - totals[:-horizon])
+            return tail_risk(largest_losses(losses, tail_size(len(losses),
+            levels)), len(losses), levels)
+        elif method == "parametric":
+            return self.parametric(weights, levels, horizon)
+        elif method == "monte_carlo":
+            return self.monte_carlo(weights, levels, horizon, n_scenarios,
+            seed)
+        raise ValueError("unknown method " + str(method))
+
+    def parametric(self, weights, levels, horizon):
+        """
+        Args:
+            weights             numpy array; (portfolios x stocks) matrix
+            levels              numpy array; confidence levels
+            horizon             int
+        Returns:
+            var,                numpy array tuple; (confidence levels x
+            cvar                portfolios) matrices
+        """
+        mean = weights.dot(self.mean_returns) * horizon
+        sd = np.sqrt(np.einsum("ij,ij->i", weights.dot(self.cov_matrix),
+        weights) * horizon)
+        normal = NormalDist()
+        z = np.array([normal.inv_cdf(level) for level in levels])[:, None]
+        density = np.array([normal.pdf(normal.inv_cdf(level))
+        for level in levels])[:, None]
+        var = z * sd - mean
+        cvar = density / (1. - levels[:, None]) * sd - mean
+        return var, cvar
+
+    def monte_carlo(self, weights, levels, horizon, n_scenarios, seed=None):
+        """
+        Simulates [n_scenarios] normal [horizon] day returns of the stocks
+        for as many portfolios at a time as the memory budget allows. Every
+        group of portfolios is simulated over the same scenarios, so the
+        results do not depend on how the portfolios were grouped.
+
+        Args:
+            weights             numpy array; (portfolios x stocks) matrix
+            levels              numpy array; confidence levels
+            horizon             int
+            n_scenarios         int
+            seed                int; default is None
+        Returns:
+            var,                numpy array tuple; (confidence levels x
+            cvar                portfolios) matrices
+        Raises:
+            ValueError          exception raised when the largest losses of
+                                a single portfolio do not fit in the memory
+                                budget
+        """
+        n_portfolios, n_stocks = weights.shape
+        size = tail_size(n_scenarios, levels)
+        # the largest losses of a group take up at most half of the budget,
+        # leaving the other half for large chunks of scenarios (see simulate
+        # for what is held), but a single portfolio may take more as long as
+        # a chunk of MIN_CHUNK scenarios still fits
+        min_chunk = min(n_scenarios, MIN_CHUNK)
+        if 24 * (size + min_chunk) + 16 * min_chunk * n_stocks \
+        > self.memory_budget:
+            raise ValueError("the memory budget is too small for "
+            + str(n_scenarios) + " scenarios")
+        group = int(min(max(self.memory_budget // 2 // (24 * size), 1),
+        n_portfolios))
+
+        seed = np.random.SeedSequence(seed)
+        results = [self.simulate(weights[first:first + group], levels,
+        horizon, n_scenarios, size, seed)
+        for first in range(0, n_portfolios, group)]
+        return np.hstack([var for var, cvar in results]), \
+        np.hstack([cvar for var, cvar in results])
+
+    def simulate(self, weights, levels, horizon, n_scenarios, size, seed):
+        """
+        Simulates [n_scenarios] returns a chunk at a time, as the mean plus
+        the Cholesky factor times standard normal draws, and keeps the
+        [size] largest losses of each portfolio.
+
+        Args:
+            weights             numpy array; (portfolios x stocks) matrix
+            levels              numpy array; confidence levels
+            horizon             int
+            n_scenarios         int
+            size                int; number of largest losses kept
+            seed                numpy SeedSequence
+        Returns:
+            var,                numpy array tuple; (confidence levels x
+            cvar                portfolios) matrices
+        """
+        n_portfolios, n_stocks = weights.shape
+        # bytes held per scenario: the normal draws and stock returns, and
+        # the portfolio losses, joined with the largest losses so far and
+        # partitioned; the largest losses are held three times the same way
+        per_scenario = 8 * (2 * n_stocks + 3 * n_portfolios)
+        chunk = (self.memory_budget - 3 * 8 * size * n_portfolios) \
+        // per_scenario
+        chunk = int(min(max(chunk, 1), n_scenarios))
+
+        rng = np.random.default_rng(seed)
+        factor = self.cholesky().T * np.sqrt(horizon)
+        mean = self.mean_returns * horizon
+        tail = np.empty((0, n_portfolios))
+        for start in range(0, n_scenarios, chunk):
+            draws = rng.standard_normal((min(chunk, n_scenarios - start),
+            n_stocks))
+            returns = draws.dot(factor)
+            returns += mean
+            del draws
+            losses = -returns.dot(weights.T)
+            del returns
+            tail = largest_losses(np.vstack([tail, losses]), size)
+        return tail_risk(tail, n_scenarios, levels)
+
+def tail_size(n_losses, levels):
+    """
+    Args:
+        n_losses            int; number of losses
+        levels              numpy array; confidence levels
+    Returns:
+        size                int; number of largest losses needed for the
+                            VaR and CVaR at every level
+    """
+    return max(1, int(math.ceil(n_losses * (1. - levels.min()) - 1e-9)))
+
+def largest_losses(losses, size):
+    """
+    Args:
+        losses              numpy array; (scenarios x portfolios) matrix
+        size                int
+    Returns:
+        losses              numpy array; the [size] largest losses of each
+                            portfolio, in no particular order
+    """
+    if len(losses) <= size:
+        return losses
+    return np.partition(losses, len(losses) - size, axis=0)[-size:]
+
+def tail_risk(tail, n_losses, levels):
+    """
+    Calculates the VaR and CVaR at each level from the largest losses of
+    each portfolio. At level a, the VaR is the k-th largest of [n_losses]
+    losses, where k is n_losses times (1 - a) rounded up, and the CVaR is
+    the average of the k largest losses.
+
+    Args:
+        tail                numpy array; (largest losses x portfolios)
+        n_losses            int; number of losses the tail was taken from
+        levels              numpy array; confidence levels
+    Returns:
+        var,                numpy array tuple; (confidence levels x
+        cvar                portfolios) matrices
+    """
+    tail = -np.sort(-tail, axis=0)
+    var = np.empty((len(levels), tail.shape[1]))
+    cvar = np.empty((len(levels), tail.shape[1]))
+    for i, level in enumerate(levels):
+        size = tail_size(n_losses, np.array([level]))
+        var[i] = tail[size - 1]
+        cvar[i] = tail[:size].mean(axis=0)
+    return var, cvar
+
+risk_engine_cache = PriceCache(ttl=86400, max_entries=8)
+
+def get_risk_engine(stock_list, start, end=None):
+    """
+    Returns the risk engine for the stocks in [stock_list] priced between
+    [start] and [end], built from the shared return series and statistics
+    engine, and cached so that its Cholesky factor is only computed once.
+
+    Args:
+        stock_list          string list
+        start               string; formatted YYYY-MM-DD
+        end                 string; formatted YYYY-MM-DD, default is today
+    Returns:
+        engine              RiskEngine
+    """
+    if end is None:
+        end = str(date.today())
+    key = (tuple(stock_list), start, end)
+    engine = risk_engine_cache.get(key)
+    if engine is None:
+        engine = RiskEngine(get_return_series(stock_list, start, end)
+        .returns(), get_stats_engine(stock_list, start, end))
+        risk_engine_cache.put(key, engine)
+    return engine
@@ -0,0 +1,205 @@
+"""
+Primary module for rolling statistics
+
+This module contains the rolling window statistics engine for the stock
+portfolio engine. Rolling and expanding means, variances and covariances are
+updated one day at a time with Welford-style streaming updates, so a whole
+history is computed in one pass without recomputing each window.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import numpy as np
+import pandas as pd
+from stats import TRADING_DAYS, align_rates
+
+# ticker symbol of the benchmark that betas and correlations are measured
+# against
+BENCHMARK = "^GSPC"
+
+# rolling windows shown by default, in trading days (a month, a quarter and
+# a year)
+WINDOWS = (21, 63, 252)
+
+class RollingMoments(object):
+    """
+    Keeps the mean and variance of each of [n_series] return series, and
+    their covariance with a benchmark, over the last [window] days. Each
+    update adds the newest day and drops the oldest one in constant time per
+    series. With no [window], the moments are kept over every day seen
+    (an expanding window). With [pairwise], the covariance matrix between
+    the series is kept as well.
+
+    Args:
+        n_series        int
+        window          int; number of days, default is None
+        pairwise        bool; default is False
+    """
+
+    def __init__(self, n_series, window=None, pairwise=False):
+        self.window = window
+        self.pairwise = pairwise
+        self.count = 0
+        self.position = 0
+        if window is not None:
+            self.x_buffer = np.zeros((window, n_series))
+            self.y_buffer = np.zeros(window)
+        self.mean_x = np.zeros(n_series)
+        self.mean_y = 0.
+        self.m2_x = np.zeros(n_series)
+        self.m2_y = 0.
+        self.c_xy = np.zeros(n_series)
+        if pairwise:
+            self.c_xx = np.zeros((n_series, n_series))
+
+    def update(self, x, y):
+        """
+        Adds one day of returns [x] and benchmark return [y].
+
+        Args:
+            x               numpy array; one return per series
+            y               float
+        """
+        if self.window is None or self.count < self.window:
+            self.count += 1
+            dx = x - self.mean_x
+            dy = y - self.mean_y
+            self.mean_x = self.mean_x + dx / self.count
+            self.mean_y = self.mean_y + dy / self.count
+            self.m2_x += dx * (x - self.mean_x)
+            self.m2_y += dy * (y - self.mean_y)
+            self.c_xy += dx * (y - self.mean_y)
+            if self.pairwise:
+                self.c_xx += np.outer(dx, x - self.mean_x)
+        else:
+            # replace the oldest day, keeping the window size fixed
+            x_old = self.x_buffer[self.position]
+            y_old = self.y_buffer[self.position]
+            dx = x - x_old
+            dy = y - y_old
+            self.m2_x += x ** 2 - x_old ** 2 - 2 * self.mean_x * dx \
+            - dx ** 2 / self.window
+            self.m2_y += y ** 2 - y_old ** 2 - 2 * self.mean_y * dy \
+            - dy ** 2 / self.window
+            self.c_xy += x * y - x_old * y_old - self.mean_x * dy \
+            - self.mean_y * dx - dx * dy / self.window
+            if self.pairwise:
+                self.c_xx += np.outer(x, x) - np.outer(x_old, x_old) \
+                - np.outer(self.mean_x, dx) - np.outer(dx, self.mean_x) \
+                - np.outer(dx, dx) / self.window
+            self.mean_x = self.mean_x + dx / self.window
+            self.mean_y = self.mean_y + dy / self.window
+
+        if self.window is not None:
+            self.x_buffer[self.position] = x
+            self.y_buffer[self.position] = y
+            self.position = (self.position + 1) % self.window
+
+    def ready(self):
+        """
+        Returns:
+            ready           bool; True once the window is full (or, for an
+                            expanding window, once there are two days)
+        """
+        if self.window is None:
+            return self.count >= 2
+        return self.count >= self.window
+
+    def statistics(self, trading_days=TRADING_DAYS, risk_free_rate=0.):
+        """
+        Returns the annualized statistics of each series over the window.
+
+        Args:
+            trading_days        int
+            risk_free_rate      float
+        Returns:
+            statistics          dict; "return", "volatility", "sharpe",
+                                "beta" and "correlation" to numpy arrays
+        """
+        n = self.count - 1
+        var_x = np.maximum(self.m2_x / n, 0.)
+        var_y = max(self.m2_y / n, 0.)
+        cov_xy = self.c_xy / n
+        annual_return = self.mean_x * trading_days
+        volatility = np.sqrt(var_x * trading_days)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return {
+                "return": annual_return,
+                "volatility": volatility,
+                "sharpe": (annual_return - risk_free_rate) / volatility,
+                "beta": cov_xy / var_y,
+                "correlation": cov_xy / np.sqrt(var_x * var_y),
+            }
+
+    def correlation_matrix(self):
+        """
+        Returns:
+            correlation     numpy array; correlation matrix between the
+                            series over the window, if [pairwise]
+        """
+        sd = np.sqrt(np.maximum(np.diag(self.c_xx), 0.))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.c_xx / np.outer(sd, sd)
+
+def rolling_statistics(returns, benchmark, window=None,
+trading_days=TRADING_DAYS, risk_free_rate=0.):
+    """
+    Computes rolling annualized return, volatility, Sharpe ratio, beta and
+    correlation to [benchmark] for every column of [returns] in one pass
+    over the days. Missing returns count as 0. The Sharpe ratio of each
+    window is measured over the average risk free rate in the window.
+
+    Args:
+        returns             pandas DataFrame; daily returns with one column
+                            per series
+        benchmark           pandas Series; daily benchmark returns
+        window              int; number of days, default is None for an
+                            expanding window
+        trading_days        int
+        risk_free_rate      float, or pandas Series of the annual risk free
+                            rate indexed by date
+    Returns:
+        statistics          dict; "return", "volatility", "sharpe", "beta"
+                            and "correlation" to pandas DataFrames with the
+                            same index and columns as [returns], NaN until
+                            the window is full
+    """
+    benchmark = benchmark.reindex(returns.index).fillna(0.).values
+    values = returns.fillna(0.).values
+    moments = RollingMoments(values.shape[1], window)
+    # running sums of the daily rates give the average rate of each window
+    rate_sums = np.concatenate(([0.],
+    np.cumsum(align_rates(risk_free_rate, returns.index))))
+    output = {}
+    for name in ("return", "volatility", "sharpe", "beta", "correlation"):
+        output[name] = np.full(values.shape, np.nan)
+    for t in range(len(values)):
+        moments.update(values[t], benchmark[t])
+        if moments.ready():
+            first = 0 if window is None else t + 1 - window
+            average_rate = (rate_sums[t + 1] - rate_sums[first]) \
+            / (t + 1 - first)
+            for name, value in moments.statistics(trading_days,
+            average_rate).items():
+                output[name][t] = value
+    return {name: pd.DataFrame(value, index=returns.index,
+    columns=returns.columns) for name, value in output.items()}
+
+def current_correlations(returns, window=WINDOWS[-1]):
+    """
+    Computes the pairwise correlation matrix between the columns of
+    [returns] over the last [window] days with the streaming updates.
+
+    Args:
+        returns             pandas DataFrame; daily returns
+        window              int
+    Returns:
+        correlation         pandas DataFrame
+    """
+    values = returns.fillna(0.).values
+    moments = RollingMoments(values.shape[1], window, pairwise=True)
+    for row in values:
+        moments.update(row, 0.)
+    return pd.DataFrame(moments.correlation_matrix(), index=returns.columns,
+    columns=returns.columns)
@@ -0,0 +1,367 @@
+"""
+Primary module for the API server
+
+This module contains the HTTP/JSON API server of the stock portfolio engine,
+a long-running asyncio service that answers quote, profile, statistics,
+history, portfolio, optimize, risk, backtest, search and chart requests.
+Every request is served by the same process, so the price, statistics and
+fundamentals caches stay warm between requests and are shared by all of
+them. Requests are run on thread pools, one for quick lookups and one for
+optimizations, simulations and charts, so slow requests never block the
+event loop or the quick ones.
+
+    python main.py --serve [host:][port]
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import os
+import json
+import asyncio
+import traceback
+from urllib.parse import urlsplit, parse_qsl
+from concurrent.futures import ThreadPoolExecutor
+from batch import *
+
+# default address the server listens on
+HOST = "127.0.0.1"
+PORT = 8080
+
+# largest request line or header line accepted, in bytes
+MAX_LINE = 8192
+
+# status codes and reasons of the responses sent
+STATUSES = {200: "OK", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 500: "Internal Server Error"}
+
+# content types of the chart formats
+CONTENT_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+class HTTPError(Exception):
+    """
+    Raised to send an error response with [status].
+
+    Args:
+        status          int; HTTP status code
+        message         string
+    """
+
+    def __init__(self, status, message=""):
+        Exception.__init__(self, message)
+        self.status = status
+
+class EngineServer(object):
+    """
+    Serves the engine over HTTP. Each route takes the query parameters of a
+    GET request, written as name=value, e.g.:
+
+        /quote?symbol=goog
+        /profile?symbol=goog
+        /statistics?symbol=goog
+        /history?symbol=goog&start=2020-01-01&points=500
+        /search?q=alphabet
+        /portfolio?name=retirement&weights=0.5,0.5
+        /basis?name=retirement
+        /optimize?name=retirement&goal=volatility&estimator=ledoit_wolf
+        /risk?name=retirement&confidence=0.99&horizon=10
+        /backtest?name=retirement&schedule=quarterly
+        /chart?symbol=goog&kind=rolling&format=svg
+        /chart?name=retirement&kind=portfolio
+
+    and answers with JSON, except /chart, which answers with the chart's
+    PNG or SVG file. The parameters are the same as batch mode's inline
+    options, and "name" selects a saved portfolio (default is
+    DEFAULT_PORTFOLIO). Requests never change a saved portfolio: weights
+    given with a request are only used to answer it.
+
+    Args:
+        io_workers          int; threads answering quick lookups
+        compute_workers     int; threads answering optimizations,
+                            simulations and charts, default is the number of
+                            CPUs
+    """
+
+    def __init__(self, io_workers=16, compute_workers=None):
+        self.io_pool = ThreadPoolExecutor(io_workers)
+        self.compute_pool = ThreadPoolExecutor(compute_workers
+        or os.cpu_count() or 1)
+        self.routes = {
+            "/health": (self.io_pool, self.health),
+            "/quote": (self.io_pool, self.quote),
+            "/profile": (self.io_pool, self.profile),
+            "/statistics": (self.io_pool, self.statistics),
+            "/history": (self.io_pool, self.history),
+            "/search": (self.io_pool, self.search),
+            "/portfolio": (self.compute_pool, self.portfolio),
+            "/basis": (self.io_pool, self.basis),
+            "/optimize": (self.compute_pool, self.optimize),
+            "/risk": (self.compute_pool, self.risk),
+            "/backtest": (self.compute_pool, self.backtest),
+            "/chart": (self.compute_pool, self.chart),
+        }
+
+    async def serve(self, host=HOST, port=PORT):
+        """
+        Listens on [host]:[port] until the task is cancelled.
+
+        Args:
+            host            string
+            port            int
+        """
+        server = await asyncio.start_server(self.handle_connection, host,
+        port)
+        address = server.sockets[0].getsockname()
+        print(Colors.blue + "Serving the stock portfolio engine on http://"
+        + str(address[0]) + ":" + str(address[1]) + Colors.end)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.io_pool.shutdown(wait=False)
+            self.compute_pool.shutdown(wait=False)
+
+    async def handle_connection(self, reader, writer):
+        """
+        Answers the requests sent on one connection, keeping it open between
+        requests unless the client asks to close it.
+
+        Args:
+            reader          asyncio StreamReader
+            writer          asyncio StreamWriter
+        """
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as error:
+                    status, content_type, body = error_response(error.status,
+                    error)
+                    writer.write(response_head(status, content_type,
+                    len(body), False) + body)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, target, headers = request
+                status, content_type, body = await self.respond(method,
+                target)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(response_head(status, content_type, len(body),
+                keep_alive) + (body if method != "HEAD" else b""))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, method, target):
+        """
+        Runs the route for [target] on its thread pool.
+
+        Args:
+            method          string; HTTP method
+            target          string; request target, e.g. "/quote?symbol=goog"
+        Returns:
+            status,         tuple; int, string and bytes
+            content_type,
+            body
+        """
+        url = urlsplit(target)
+        try:
+            if url.path not in self.routes:
+                raise HTTPError(404, "unknown path " + url.path)
+            if method not in ("GET", "HEAD"):
+                raise HTTPError(405, "only GET requests are answered")
+            params = dict((name.lower(), option_value(value))
+            for name, value in parse_qsl(url.query))
+            pool, route = self.routes[url.path]
+            result = await asyncio.get_running_loop().run_in_executor(pool,
+            route, params)
+            if isinstance(result, tuple):
+                return (200,) + result
+            return 200, "application/json", json_body(result)
+        except HTTPError as error:
+            return error_response(error.status, error)
+        except InexistentStock as error:
+            return error_response(404, error)
+        except (Malformed, ValueError, KeyError, WeightsMismatch,
+        WeightsMiscalculation, WeightsMalformed) as error:
+            return error_response(400, error)
+        except Exception as error:
+            traceback.print_exc()
+            return error_response(500, error)
+
+    def session(self, params):
+        """
+        Args:
+            params          dict
+        Returns:
+            session         BatchSession; for the portfolio named by the
+                            "name" parameter
+        """
+        return BatchSession(str(params.pop("name", DEFAULT_PORTFOLIO)))
+
+    def symbol(self, params):
+        """
+        Args:
+            params          dict
+        Returns:
+            symbol          string; lowercase "symbol" parameter
+        Raises:
+            HTTPError       exception raised when there is no symbol
+        """
+        if "symbol" not in params:
+            raise HTTPError(400, "missing symbol")
+        return str(params.pop("symbol")).lower()
+
+    def health(self, params):
+        return {"ok": True, "prices_cached": len(price_cache.entries),
+        "engines_cached": len(engine_cache.entries),
+        "fundamentals_cached": len(fundamentals_cache.snapshots)}
+
+    def quote(self, params):
+        return self.session(params).view([self.symbol(params)], params)
+
+    def profile(self, params):
+        return self.session(params).view([self.symbol(params), "profile"],
+        params)
+
+    def statistics(self, params):
+        return self.session(params).view([self.symbol(params), "statistics"],
+        params)
+
+    def history(self, params):
+        symbol = capitalize(self.symbol(params))
+        check_symbol(symbol)
+        start = str(params.get("start", minus_five_years()))
+        prices = get_price_history(symbol, start, params.get("end")).dropna()
+        if "points" in params:
+            prices = downsample(prices, int(params["points"]))
+        return {"symbol": symbol, "dates": [str(day.date())
+        for day in prices.index], "prices": prices.values}
+
+    def search(self, params):
+        if "q" not in params:
+            raise HTTPError(400, "missing q")
+        return self.session(params).search(str(params.pop("q")).split(),
+        params)
+
+    def portfolio(self, params):
+        return self.session(params).score_portfolio([], params)
+
+    def basis(self, params):
+        return self.session(params).basis([], params)
+
+    def optimize(self, params):
+        return self.session(params).optimize(["portfolio",
+        str(params.pop("goal", "sharpe")).lower()], params)
+
+    def risk(self, params):
+        return self.session(params).risk([], params)
+
+    def backtest(self, params):
+        return self.session(params).backtest([], params)
+
+    def chart(self, params):
+        session = self.session(params)
+        kind = str(params.pop("kind", "history")).lower()
+        if kind in ("portfolio", "backtest", "frontier"):
+            words = [kind]
+        else:
+            words = [self.symbol(params), kind]
+        params.pop("path", None)
+        result = session.chart(words, params)
+        with open(result["path"], "rb") as f:
+            return CONTENT_TYPES[result["format"]], f.read()
+
+async def read_request(reader):
+    """
+    Reads the request line and headers of the next request on a connection.
+
+    Args:
+        reader              asyncio StreamReader
+    Returns:
+        method,             tuple; strings and a dict of lowercase header
+        target,             names to values, or None if the connection was
+        headers             closed
+    Raises:
+        HTTPError           exception raised when the request is malformed
+    """
+    line = await reader.readline()
+    if line == b"":
+        return None
+    if len(line) > MAX_LINE:
+        raise HTTPError(400, "request line too long")
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3:
+        raise HTTPError(400, "malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(line) > MAX_LINE:
+            raise HTTPError(400, "header line too long")
+        name, colon, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0) or 0)
+    if length > 0:
+        await reader.readexactly(length)
+    return parts[0].upper(), parts[1], headers
+
+def response_head(status, content_type, length, keep_alive=True):
+    """
+    Args:
+        status              int
+        content_type        string
+        length              int; length of the body in bytes
+        keep_alive          bool
+    Returns:
+        head                bytes; status line and headers
+    """
+    return ("HTTP/1.1 " + str(status) + " " + STATUSES[status] + "\r\n"
+    + "Content-Type: " + content_type + "\r\n"
+    + "Content-Length: " + str(length) + "\r\n"
+    + "Connection: " + ("keep-alive" if keep_alive else "close") + "\r\n"
+    + "\r\n").encode("latin-1")
+
+def json_body(value):
+    """
+    Args:
+        value               any; converted with to_json
+    Returns:
+        body                bytes
+    """
+    return json.dumps(to_json(value)).encode("utf-8")
+
+def error_response(status, error):
+    """
+    Args:
+        status              int
+        error               Exception
+    Returns:
+        status,             tuple; int, string and bytes
+        content_type,
+        body
+    """
+    return status, "application/json", json_body({"error":
+    type(error).__name__, "message": str(error)})
+
+def run_server(host=HOST, port=PORT):
+    """
+    Runs the API server on [host]:[port] until it is interrupted.
+
+    Args:
+        host                string
+        port                int
+    """
+    try:
+        asyncio.run(EngineServer().serve(host, port))
+    except KeyboardInterrupt:
+        print("\nStopped serving.")
+
+if __name__ == "__main__":
+    run_server()
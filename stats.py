@@ -0,0 +1,248 @@
+"""
+Primary module for portfolio statistics
+
+This module contains the statistics engine for the stock portfolio engine,
+which scores many portfolios of the same stocks at once.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import copy
+from datetime import date
+import numpy as np
+import pandas as pd
+from cache import *
+from covariance import *
+from returns import *
+
+# there are 252 trading days in a year
+TRADING_DAYS = 252
+
+# largest difference between a cached daily return and the same day's return
+# in newer price history for the engine to still be rolled forward
+RETURN_TOLERANCE = 1e-10
+
+class StatsEngine(object):
+    """
+    Precomputes the annualized mean returns and covariance matrix of a
+    universe of stocks once, then calculates the expected return, variance,
+    volatility and Sharpe ratio of a whole matrix of portfolio weights with
+    matrix products instead of one portfolio at a time.
+
+    With no [estimator], the covariance matrix is the pairwise sample
+    covariance, the same as the pandas DataFrame.cov. The engine can be
+    rolled forward to a later window of returns with roll, which only adds
+    the new days and removes the days that left the window. Cached engines
+    are shared between threads, so they are never rolled in place; rolled
+    returns a rolled copy instead.
+
+    Args:
+        returns         pandas DataFrame; daily returns with one column per
+                        stock
+        trading_days    int; number of trading days used to annualize
+        estimator       CovarianceEstimator; default is None
+    """
+
+    def __init__(self, returns, trading_days=TRADING_DAYS, estimator=None):
+        self.symbols = list(returns.columns)
+        self.trading_days = trading_days
+        self.estimator = PairwiseCovariance() if estimator is None \
+        else estimator
+        self.returns = returns
+        self.counts = np.array(returns.count().values, dtype=np.float64)
+        self.sums = np.array(returns.sum().values, dtype=np.float64)
+        self.estimator.fit(returns)
+        self.refresh()
+
+    def refresh(self):
+        """
+        Recalculates the annualized mean returns and covariance matrix from
+        the running sums.
+        """
+        self.mean_returns = self.sums / self.counts * self.trading_days
+        self.cov_matrix = self.estimator.covariance() * self.trading_days
+
+    def add(self, row, sign=1.):
+        """
+        Adds the returns of one day to the running sums, or removes them when
+        [sign] is -1, with a rank-1 update.
+
+        Args:
+            row             numpy array; one daily return per stock
+            sign            float; 1 to add the day, -1 to remove it
+        """
+        row = np.asarray(row, dtype=np.float64)
+        present = ~np.isnan(row)
+        self.counts += sign * present
+        self.sums += sign * np.where(present, row, 0.)
+        if present.all() or self.estimator.accepts_missing:
+            if sign > 0:
+                self.estimator.update(row)
+            else:
+                self.estimator.remove(row)
+
+    def covers(self, returns):
+        """
+        Args:
+            returns         pandas DataFrame; daily returns of the same stocks
+        Returns:
+            covers          bool; whether the engine can be rolled forward
+                            to [returns], which is the case when they start
+                            and end no earlier than the engine's returns, the
+                            two overlap, and the returns of the days they
+                            share are the same, i.e. no earlier price was
+                            restated since the engine was built
+        """
+        if returns is self.returns:
+            return True
+        if len(self.returns) == 0 or len(returns) == 0:
+            return False
+        if not (self.returns.index[0] <= returns.index[0]
+        <= self.returns.index[-1] <= returns.index[-1]):
+            return False
+        # the first day of a window has no return, so it is not compared
+        old = self.returns[self.returns.index > returns.index[0]]
+        new = returns[(returns.index > returns.index[0])
+        & (returns.index <= self.returns.index[-1])]
+        return old.index.equals(new.index) and np.allclose(old.values,
+        new.values, rtol=0., atol=RETURN_TOLERANCE, equal_nan=True)
+
+    def roll(self, returns):
+        """
+        Moves the engine forward to the window of [returns]. The first day of
+        a window has no return, so the days up to and including the first
+        day of [returns] are removed, and the days after the engine's last
+        day are added.
+
+        Args:
+            returns         pandas DataFrame; daily returns of the same
+                            stocks, which the engine covers
+        """
+        old = self.returns
+        for row in old[old.index <= returns.index[0]].values:
+            self.add(row, -1.)
+        for row in returns[returns.index > old.index[-1]].values:
+            self.add(row)
+        self.returns = returns
+        self.refresh()
+
+    def rolled(self, returns):
+        """
+        Returns a copy of the engine rolled forward to the window of
+        [returns], leaving the engine itself unchanged.
+
+        Args:
+            returns         pandas DataFrame; daily returns of the same
+                            stocks, which the engine covers
+        Returns:
+            engine          StatsEngine
+        """
+        engine = copy.copy(self)
+        engine.estimator = copy.deepcopy(self.estimator)
+        engine.counts = self.counts.copy()
+        engine.sums = self.sums.copy()
+        engine.roll(returns)
+        return engine
+
+    def evaluate(self, weights, risk_free_rate=0.):
+        """
+        Calculates annualized statistics for every row of [weights], where
+        column i of [weights] is the weight of stock i in self.symbols.
+
+        Args:
+            weights                     numpy array; (portfolios x stocks)
+                                        matrix, or a single weights vector
+            risk_free_rate              float
+        Returns:
+            expected_returns,           numpy array tuple; one entry per
+            expected_sd,                portfolio
+            sharpe_ratios,
+            variances
+        """
+        weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+        expected_returns = weights.dot(self.mean_returns)
+        variances = np.einsum("ij,ij->i", weights.dot(self.cov_matrix),
+        weights)
+        expected_sd = np.sqrt(variances)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe_ratios = (expected_returns - risk_free_rate) / expected_sd
+        return expected_returns, expected_sd, sharpe_ratios, variances
+
+# engines are rolled forward from day to day, so they are kept for a week
+engine_cache = PriceCache(ttl=7 * 86400, max_entries=8)
+
+def get_stats_engine(stock_list, start, end=None, estimator=None):
+    """
+    Returns the statistics engine for the stocks in [stock_list] priced
+    between [start] and [end], building it only if it is not cached.
+    Engines are keyed by the length of their window rather than its dates,
+    so a window that has moved forward since the engine was built, e.g. the
+    last ten years on the next day, rolls the cached engine forward instead
+    of building a new one. The cached engine is left unchanged for the
+    threads that may still be using it, and its rolled copy is cached in
+    its place. A cached engine is only used while the returns it was built
+    from match the current price history, so it is built again once an
+    earlier price is restated, e.g. adjusted for a split or dividend.
+
+    Args:
+        stock_list          string list
+        start               string; formatted YYYY-MM-DD
+        end                 string; formatted YYYY-MM-DD, default is today
+        estimator           string; covariance estimator spec accepted by
+                            make_estimator, default is None for the pairwise
+                            sample covariance
+    Returns:
+        engine              StatsEngine
+    """
+    if end is None:
+        end = str(date.today())
+    window = (date.fromisoformat(end) - date.fromisoformat(start)).days
+    key = (tuple(stock_list), window, estimator)
+    cached = engine_cache.get(key)
+    returns = get_return_series(stock_list, start, end).returns()
+    if cached is not None and cached[2].covers(returns):
+        if cached[:2] == (start, end):
+            return cached[2]
+        engine = cached[2].rolled(returns)
+    elif estimator is None:
+        engine = StatsEngine(returns)
+    else:
+        engine = StatsEngine(returns, estimator=make_estimator(estimator))
+    engine_cache.put(key, (start, end, engine))
+    return engine
+
+def random_weights(n_portfolios, n_stocks, seed=None):
+    """
+    Draws [n_portfolios] random long-only portfolios of [n_stocks] stocks,
+    uniformly over all weights that add up to 1.
+
+    Args:
+        n_portfolios        int
+        n_stocks            int
+        seed                int; default is None
+    Returns:
+        weights             numpy array; (n_portfolios x n_stocks) matrix
+    """
+    rng = np.random.default_rng(seed)
+    return rng.dirichlet(np.ones(n_stocks), n_portfolios)
+
+def align_rates(risk_free_rate, index):
+    """
+    Returns the annual risk free rate of each day in [index]: the last rate
+    known on or before the day, or the first rate known for days before it.
+
+    Args:
+        risk_free_rate      float, or pandas Series of annual rates indexed
+                            by date
+        index               pandas DatetimeIndex
+    Returns:
+        rates               numpy array
+    """
+    if not isinstance(risk_free_rate, pd.Series):
+        return np.full(len(index), float(risk_free_rate))
+    rates = risk_free_rate.dropna().sort_index()
+    if len(rates) == 0:
+        return np.zeros(len(index))
+    positions = rates.index.searchsorted(index, side="right") - 1
+    return rates.values[np.maximum(positions, 0)].astype(np.float64)
@@ -7,14 +7,16 @@ Daisy Shu
 May 3rd, 2020
 """
 
-import requests
-import json
 from colors import *
+from cache import *
+from provider import *
+from symbols import *
+from fundamentals import *
+from extract import *
+from rolling import *
 from datetime import date
-import pandas_datareader.data as web
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import yfinance as yf
-from bs4 import BeautifulSoup
 
 class Stock():
     """
@@ -62,35 +64,60 @@ class Stock():
 
         return long_name
 
-    def get_summary(self):
+    def get_info(self):
         """
-        Web scrapes stock summary for stock interested from Yahoo! Finance
-        page using Beautiful Soup Python package, and returns the stock
-        summary.
+        Returns the stock information of stock interested, fetching it from
+        the market data provider only if its snapshot is stale.
 
+        Returns:
+            json_text           dict
+        """
+        return fundamentals_cache.get(self.symbol, "info",
+        lambda: get_provider().get_info([self.symbol])[self.symbol])
+
+    def get_summary(self, page=None):
+        """
+        Returns the stock summary scraped from the Yahoo! Finance quote page
+        of stock interested, fetching and parsing the page only if its
+        snapshot is stale.
+
+        Args:
+            page                bytes; HTML of the quote page if it was
+                                already fetched, default is None
         Returns:
             price,              string tuple
             market_cap
         Raises:
             InexistentStock     exception when stock entered does not exist
         """
-        try:
-            page = requests.get("https://finance.yahoo.com/quote/" + self.symbol)
-            soup = BeautifulSoup(page.content, 'html.parser')
-            try:
-                price = soup.select_one("div span[data-reactid='50']").text.strip()
-            except:
-                price = "N/A"
-            try:
-                market_cap = soup.select_one("td[data-test='MARKET_CAP-value']").text.strip()
-            except:
-                market_cap = "N/A"
+        if page is not None:
+            summary = self.parse_summary(page)
+            if len(page) > 0:
+                fundamentals_cache.put(self.symbol, "summary", summary)
+            return summary
+        return tuple(fundamentals_cache.get(self.symbol, "summary",
+        lambda: self.parse_summary(get_provider().get_page(self.symbol))))
+
+    def parse_summary(self, page):
+        """
+        Extracts stock summary for stock interested from its Yahoo! Finance
+        quote page in one pass, and returns the stock summary.
 
-            return str(price), str(market_cap)
+        Args:
+            page                bytes; HTML of the quote page
+        Returns:
+            price,              string tuple
+            market_cap
+        Raises:
+            InexistentStock     exception when stock entered does not exist
+        """
+        try:
+            fields = extract_summary(page)
+            return fields["price"], fields["market_cap"]
         except:
             raise InexistentStock
 
-    def fetch_stock_summary(self):
+    def fetch_stock_summary(self, json_text=None, page=None):
         """
         Combines stock information fetched from yfinance Python library and
         stock summary web scraped from Yahoo! Finance page for a given
@@ -119,14 +146,21 @@ class Stock():
         between current price and previous closing price of stock interested.
         If difference is positive, difference string is green, red otherwise.
 
+        Args:
+            json_text           dict; stock information if it was already
+                                fetched, default is None
+            page                bytes; HTML of the quote page if it was
+                                already fetched, default is None
         Returns:
             summary             string
         Raises:
             InexistentStock     exception when stock entered does not exist
         """
         try:
-            stock = yf.Ticker(self.symbol)
-            json_text = stock.info
+            if json_text is None:
+                json_text = self.get_info()
+            else:
+                fundamentals_cache.put(self.symbol, "info", json_text)
 
             try:
                 close = str(round(json_text["previousClose"], 2)).strip()
@@ -183,7 +217,7 @@ class Stock():
             except:
                 div_yield = "N/A"
 
-            price, market_cap = self.get_summary()
+            price, market_cap = self.get_summary(page)
                 
             try:
                 curr_price = float(price.replace(",", ""))
@@ -270,8 +304,7 @@ class Stock():
             InexistentStock     exception when stock entered does not exist
         """
         try:
-            stock = yf.Ticker(self.symbol)
-            json_text = stock.info
+            json_text = self.get_info()
 
             try:
                 address = json_text["address1"].strip()
@@ -368,10 +401,33 @@ class Stock():
 
     def get_statistics(self):
         """
-        Web scrapes stock statistics for stock interested from Yahoo! Finance
-        page using Beautiful Soup Python package, and returns the stock
+        Returns the stock statistics scraped from the Yahoo! Finance key
+        statistics page of stock interested, fetching and parsing the page
+        only if its snapshot is stale.
+
+        Returns:
+            revenue,                string tuple
+            revenue_per_share,
+            gross_profit,
+            operating_margin,
+            return_on_assets,
+            return_on_equity
+        Raises:
+            InexistentStock         exception when stock entered does not
+                                    exist
+        """
+        return tuple(fundamentals_cache.get(self.symbol, "statistics",
+        lambda: self.parse_statistics(get_provider().get_page(self.symbol,
+        "key-statistics"))))
+
+    def parse_statistics(self, page):
+        """
+        Extracts stock statistics for stock interested from its Yahoo!
+        Finance key statistics page in one pass, and returns the stock
         statistics.
 
+        Args:
+            page                    bytes; HTML of the key statistics page
         Returns:
             revenue,                string tuple
             revenue_per_share,
@@ -384,36 +440,10 @@ class Stock():
                                     exist
         """
         try:
-            page = requests.get("https://finance.yahoo.com/quote/" + self.symbol + "/key-statistics")
-            soup = BeautifulSoup(page.content, 'html.parser')
-            div = soup.find("div", {"id": "app"})
-            try:
-                revenue = div.select_one("#Col1-0-KeyStatistics-Proxy > section > div.Mstart\\(a\\).Mend\\(a\\) > div.Fl\\(start\\).W\\(50\\%\\).smartphone_W\\(100\\%\\) > div > div:nth-child(4) > div > div > table > tbody > tr.Bxz\\(bb\\).H\\(36px\\).BdY.Bdc\\(\\$seperatorColor\\) > td.Fw\\(500\\).Ta\\(end\\).Pstart\\(10px\\).Miw\\(60px\\)").text.strip()
-            except:
-                revenue = "N/A"
-            try:
-                revenue_per_share = div.select_one("#Col1-0-KeyStatistics-Proxy > section > div.Mstart\\(a\\).Mend\\(a\\) > div.Fl\\(start\\).W\\(50\\%\\).smartphone_W\\(100\\%\\) > div > div:nth-child(4) > div > div > table > tbody > tr:nth-child(2) > td.Fw\\(500\\).Ta\\(end\\).Pstart\\(10px\\).Miw\\(60px\\)").text.strip()
-            except:
-                revenue_per_share = "N/A"
-            try:
-                gross_profit = div.select_one("#Col1-0-KeyStatistics-Proxy > section > div.Mstart\\(a\\).Mend\\(a\\) > div.Fl\\(start\\).W\\(50\\%\\).smartphone_W\\(100\\%\\) > div > div:nth-child(4) > div > div > table > tbody > tr:nth-child(4) > td.Fw\\(500\\).Ta\\(end\\).Pstart\\(10px\\).Miw\\(60px\\)").text.strip()
-            except:
-                gross_profit = "N/A"
-            try:
-                operating_margin = div.select_one("#Col1-0-KeyStatistics-Proxy > section > div.Mstart\\(a\\).Mend\\(a\\) > div.Fl\\(start\\).W\\(50\\%\\).smartphone_W\\(100\\%\\) > div > div:nth-child(2) > div > div > table > tbody > tr.Bxz\\(bb\\).H\\(36px\\).BdB.Bdbc\\(\\$seperatorColor\\) > td.Fw\\(500\\).Ta\\(end\\).Pstart\\(10px\\).Miw\\(60px\\)").text.strip()
-            except:
-                operating_margin = "N/A"
-            try:
-                return_on_assets = div.select_one("#Col1-0-KeyStatistics-Proxy > section > div.Mstart\\(a\\).Mend\\(a\\) > div.Fl\\(start\\).W\\(50\\%\\).smartphone_W\\(100\\%\\) > div > div:nth-child(3) > div > div > table > tbody > tr.Bxz\\(bb\\).H\\(36px\\).BdY.Bdc\\(\\$seperatorColor\\) > td.Fw\\(500\\).Ta\\(end\\).Pstart\\(10px\\).Miw\\(60px\\)").text.strip()
-            except:
-                return_on_assets = "N/A"
-            try:
-                return_on_equity = div.select_one("#Col1-0-KeyStatistics-Proxy > section > div.Mstart\\(a\\).Mend\\(a\\) > div.Fl\\(start\\).W\\(50\\%\\).smartphone_W\\(100\\%\\) > div > div:nth-child(3) > div > div > table > tbody > tr.Bxz\\(bb\\).H\\(36px\\).BdB.Bdbc\\(\\$seperatorColor\\) > td.Fw\\(500\\).Ta\\(end\\).Pstart\\(10px\\).Miw\\(60px\\)").text.strip()
-            except:
-                return_on_equity = "N/A"
-            return str(revenue), str(revenue_per_share), str(gross_profit), \
-            str(operating_margin), str(return_on_assets), \
-            str(return_on_equity)
+            fields = extract_statistics(page)
+            return fields["revenue"], fields["revenue_per_share"], \
+            fields["gross_profit"], fields["operating_margin"], \
+            fields["return_on_assets"], fields["return_on_equity"]
         except:
             raise InexistentStock
 
@@ -446,8 +476,7 @@ class Stock():
             InexistentStock     exception when stock entered does not exist
         """
         try:
-            stock = yf.Ticker(self.symbol)
-            json_text = stock.info
+            json_text = self.get_info()
 
             try:
                 fifty_two_week_low = str(round(json_text["fiftyTwoWeekLow"], 2)).strip()
@@ -520,7 +549,8 @@ class Stock():
     def fetch_stock_historical_data(self):
         """
         Fetches stock historical data between five years ago and current
-        date from Pandas' DataReader.
+        date from the local price store, which downloads any missing dates
+        with Pandas' DataReader.
 
         Returns:
             historical_data     string; table of historical data for
@@ -529,7 +559,7 @@ class Stock():
         period1 = minus_five_years()
         period2 = str(date.today())
         print()
-        print(web.get_data_yahoo(self.symbol, period1, period2))
+        print(price_store.load(self.symbol, period1, period2))
 
     def stock_return_sd(self):
         """
@@ -539,8 +569,7 @@ class Stock():
         Returns:
             return_sd      string
         """
-        data = web.DataReader(self.symbol, data_source="yahoo",
-        start=minus_five_years())['Adj Close']
+        data = get_price_history(self.symbol, minus_five_years())
         data.sort_index(inplace=True)
         returns = data.pct_change()
         mean_return = returns.mean()
@@ -553,6 +582,51 @@ class Stock():
             + ", and the annualized volatility\n" + "is "
             + str(annualized_sd) + ".\n" + Colors.end)
 
+    def rolling_statistics(self, window, risk_free_rate=0.):
+        """
+        Calculates rolling annualized return, volatility, Sharpe ratio, and
+        beta and correlation to the S&P 500 of stock interested over the past
+        five years.
+
+        Args:
+            window          int; number of trading days in each window
+            risk_free_rate  float, or pandas Series of the annual risk free
+                            rate indexed by date
+        Returns:
+            statistics      dict; "return", "volatility", "sharpe", "beta"
+                            and "correlation" to pandas Series
+        """
+        prices = get_price_history([self.symbol, BENCHMARK],
+        minus_five_years())
+        returns = prices.pct_change().iloc[1:]
+        statistics = rolling_statistics(returns[[self.symbol]],
+        returns[BENCHMARK], window, risk_free_rate=risk_free_rate)
+        return {name: value[self.symbol] for name, value in statistics.items()}
+
+    def print_rolling_statistics(self, risk_free_rate=0.):
+        """
+        Prints the latest rolling statistics of stock interested over the
+        past month, quarter and year.
+
+        Args:
+            risk_free_rate          float, or pandas Series of the annual
+                                    risk free rate indexed by date
+        Returns:
+            rolling_statistics      string
+        """
+        print("\n" + Colors.bold + self.symbol + " Rolling Statistics"
+        + Colors.end + "\n" + Colors.blue + "Window:       " + Colors.end
+        + "".join(str(window).rjust(9) + " days" for window in WINDOWS))
+        latest = [self.rolling_statistics(window, risk_free_rate)
+        for window in WINDOWS]
+        for name, label in (("return", "Return:       "),
+        ("volatility", "Volatility:   "), ("sharpe", "Sharpe Ratio: "),
+        ("beta", "Beta:         "), ("correlation", "Correlation:  ")):
+            print(Colors.blue + label + Colors.end + "".join(
+            str(round(statistics[name].iloc[-1], 2)).rjust(14)
+            for statistics in latest))
+        print("\nBeta and correlation are measured against the S&P 500.\n")
+
     def split_number(self, number, lst):
         """
         Splits any number over 3 digits with commas for every thousandths place.
@@ -591,6 +665,61 @@ class Stock():
         else:
             return number
 
+def fetch_stock_summaries(symbols):
+    """
+    Prints the stock summary of every stock in [symbols]. The stock
+    information and quote pages of all the stocks without a fresh snapshot
+    are fetched concurrently, so viewing many stocks takes about as long as
+    the slowest one. A stock whose information or quote page could not be
+    fetched is reported as failed rather than printed without its data.
+
+    Args:
+        symbols             string list
+    Returns:
+        failed              string list; symbols whose summary could not
+                            be fetched
+    """
+    failed = []
+    stale_info = [symbol for symbol in symbols
+    if not fundamentals_cache.fresh(symbol, "info")]
+    stale_pages = [symbol for symbol in symbols
+    if not fundamentals_cache.fresh(symbol, "summary")]
+    provider = get_provider()
+    info = {}
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        pages_future = pool.submit(provider.get_pages, stale_pages)
+        if len(stale_info) > 0:
+            try:
+                info = pool.submit(provider.get_info, stale_info).result()
+            except Exception:
+                pass
+        pages = pages_future.result()
+
+    for symbol in symbols:
+        if (symbol in stale_info and symbol not in info) \
+        or (symbol in stale_pages and symbol not in pages):
+            failed.append(symbol)
+            continue
+        page = pages.get(symbol)
+        try:
+            Stock(symbol).fetch_stock_summary(info.get(symbol), page)
+        except InexistentStock:
+            failed.append(symbol)
+    return failed
+
+def check_symbol(symbol):
+    """
+    Checks [symbol] against the symbol index, asking the market data
+    provider only when the index does not list it.
+
+    Args:
+        symbol              string
+    Raises:
+        InexistentStock     exception when [symbol] is not a ticker symbol
+    """
+    if not symbol_index.exists(symbol):
+        raise InexistentStock
+
 class InexistentStock(Exception):
     """
     Raised when the stock entered does not exist.
@@ -604,27 +733,6 @@ class TreasuryYieldFetchError(Exception):
     """
     pass
 
-def get_gov_bond_rate():
-    """
-    Web scrapes current rate (percentage) for Treasury Yield 10 Years from
-    Yahoo! Finance page using Beautiful Soup Python package, and returns
-    its current rate (percentage) divided by 100.
-
-    Returns:
-        price                       float
-    Raises:
-        TreasuryYieldFetchError     exception when an error occurs when
-                                    fetching yield of government treasury
-                                    bond
-    """
-    try:
-        page = requests.get("https://finance.yahoo.com/quote/^TNX")
-        soup = BeautifulSoup(page.content, 'html.parser')
-        price = soup.select_one("div span[data-reactid='33']").text.strip()
-        return float(price)/100.0
-    except:
-        raise TreasuryYieldFetchError
-
 def minus_five_years():
     """
     Calculates the exact date five years ago, where month and day
@@ -0,0 +1,367 @@
+"""
+Primary module for the price store
+
+This module contains the on-disk price store for the stock portfolio engine.
+Daily bars are kept per symbol as memory-mapped NumPy arrays, so repeat
+queries read from disk and only the missing dates are fetched from the
+market data provider.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import os
+import json
+import logging
+import threading
+from contextlib import ExitStack
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+from provider import *
+
+# directory holding everything the engine saves to disk
+DATA_DIR = os.environ.get("STOCK_ENGINE_HOME",
+    os.path.join(os.path.expanduser("~"), ".stock_portfolio_engine"))
+
+# relative change in a stored adjusted close, when downloaded again, above
+# which the provider is taken to have adjusted the stored prices since
+RESTATED_TOLERANCE = 1e-4
+
+log = logging.getLogger(__name__)
+
+class PriceStore(object):
+    """
+    Stores daily OHLCV and adjusted closing prices for each symbol on disk.
+    Each symbol has a dates array and a values array (one column per entry
+    in COLUMNS) saved in NumPy format, plus an entry in index.json recording
+    the date range that has already been downloaded. A query only downloads
+    the dates outside of that range and saves them with the stored bars.
+    Since the provider adjusts past prices again after every split and
+    dividend, each download overlaps a stored bar; if that bar has changed,
+    every bar of the symbol is downloaded again instead.
+
+    Each symbol has its own lock, held while its bars are topped up, so a
+    slow download only holds up queries for the same symbol; the lock of
+    the store itself only guards the coverage index.
+
+    Args:
+        directory       string; folder where the price files are kept
+    """
+
+    def __init__(self, directory=os.path.join(DATA_DIR, "prices")):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.symbol_locks = {}
+        self.index = None
+
+    def symbol_lock(self, symbol):
+        """
+        Args:
+            symbol          string
+        Returns:
+            lock            threading Lock; held while the bars of [symbol]
+                            are read, downloaded and written
+        """
+        with self.lock:
+            return self.symbol_locks.setdefault(symbol, threading.Lock())
+
+    def index_path(self):
+        """
+        Returns:
+            path            string; location of the coverage index file
+        """
+        return os.path.join(self.directory, "index.json")
+
+    def symbol_paths(self, symbol):
+        """
+        Args:
+            symbol          string
+        Returns:
+            dates_path,     string tuple; locations of the dates and values
+            values_path     arrays of [symbol]
+        """
+        return os.path.join(self.directory, symbol + ".dates.npy"), \
+        os.path.join(self.directory, symbol + ".values.npy")
+
+    def load_index(self):
+        """
+        Returns the coverage index, reading it from disk on first use.
+
+        Returns:
+            index           dict; symbol to {"start": string, "end": string}
+        """
+        if self.index is None:
+            try:
+                with open(self.index_path()) as f:
+                    self.index = json.load(f)
+            except (IOError, ValueError):
+                self.index = {}
+        return self.index
+
+    def save_index(self):
+        """
+        Writes the coverage index to disk.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.index_path() + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path())
+
+    def read(self, symbol):
+        """
+        Reads every stored bar of [symbol] from disk.
+
+        Args:
+            symbol          string
+        Returns:
+            bars            pandas DataFrame indexed by date, or None if
+                            nothing is stored for [symbol]
+        """
+        dates_path, values_path = self.symbol_paths(symbol)
+        if not os.path.exists(values_path):
+            return None
+        dates = np.load(dates_path)
+        values = np.load(values_path, mmap_mode="r")
+        return pd.DataFrame(np.array(values), index=pd.DatetimeIndex(dates,
+        name="Date"), columns=COLUMNS)
+
+    def write(self, symbol, bars):
+        """
+        Writes [bars] to disk as the stored bars of [symbol].
+
+        Args:
+            symbol          string
+            bars            pandas DataFrame indexed by date
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        dates_path, values_path = self.symbol_paths(symbol)
+        for path, array in ((dates_path,
+        bars.index.values.astype("datetime64[D]")),
+        (values_path, bars[COLUMNS].values.astype(np.float64))):
+            tmp_path = path + ".tmp.npy"
+            np.save(tmp_path, array)
+            os.replace(tmp_path, path)
+
+    def download(self, symbol, start, end):
+        """
+        Downloads daily bars of [symbol] between [start] and [end] from the
+        market data provider.
+
+        Args:
+            symbol          string
+            start           string; formatted YYYY-MM-DD
+            end             string; formatted YYYY-MM-DD
+        Returns:
+            bars            pandas DataFrame indexed by date
+        Raises:
+            IOError         exception raised when the bars could not be
+                            downloaded
+        """
+        history = get_provider().get_history([symbol], start, end)
+        if symbol not in history:
+            raise ProviderError("no bars were returned for " + symbol)
+        return history[symbol]
+
+    def restated(self, stored, bars, day):
+        """
+        Tells whether the adjusted close of [day] in freshly downloaded
+        [bars] differs from the one in [stored], which means the provider
+        has adjusted the prices again since they were stored, e.g. after a
+        split or a dividend.
+
+        Args:
+            stored          pandas DataFrame; stored bars, including [day]
+            bars            pandas DataFrame; downloaded bars
+            day             pandas Timestamp
+        Returns:
+            restated        bool; True if [bars] is missing [day] or its
+                            adjusted close differs by more than
+                            RESTATED_TOLERANCE
+        """
+        if len(bars) == 0:
+            return False
+        if day not in bars.index:
+            return True
+        return not np.isclose(bars.loc[day, "Adj Close"],
+        stored.loc[day, "Adj Close"], rtol=RESTATED_TOLERANCE, atol=0.)
+
+    def prefetch(self, symbols, start, end=None):
+        """
+        Downloads the bars of every symbol in [symbols] that has nothing
+        stored yet with a single provider request, and stores them. Symbols
+        the provider returns nothing for are left for load to download.
+
+        Args:
+            symbols         string list
+            start           string; formatted YYYY-MM-DD
+            end             string; formatted YYYY-MM-DD, default is today
+        Raises:
+            IOError         exception raised when the bars could not be
+                            downloaded
+        """
+        if end is None:
+            end = str(date.today())
+        with self.lock:
+            index = self.load_index()
+            missing = [symbol for symbol in symbols if symbol not in index]
+        if len(missing) < 2:
+            return
+        with ExitStack() as stack:
+            for symbol in sorted(missing):
+                stack.enter_context(self.symbol_lock(symbol))
+            # another thread may have stored some of them in the meantime
+            with self.lock:
+                missing = [symbol for symbol in missing if symbol not in index]
+            if len(missing) == 0:
+                return
+            history = get_provider().get_history(missing, start, end)
+            for symbol, bars in history.items():
+                self.write(symbol, bars)
+            with self.lock:
+                for symbol in history:
+                    index[symbol] = {"start": start, "end": end}
+                self.save_index()
+
+    def load(self, symbol, start, end=None):
+        """
+        Returns the daily bars of [symbol] between [start] and [end]. Only the
+        dates before the stored range and the dates since the last stored
+        date are downloaded; they are saved together with the stored bars.
+        Each download includes a stored bar, and if the provider has
+        adjusted it since it was stored, the whole range is downloaded again
+        so that old and new prices are never joined. If a download fails but
+        bars are stored, the stored bars are returned so that repeat runs
+        keep working offline.
+
+        Args:
+            symbol          string
+            start           string; formatted YYYY-MM-DD
+            end             string; formatted YYYY-MM-DD, default is today
+        Returns:
+            bars            pandas DataFrame with columns COLUMNS
+        Raises:
+            IOError         exception raised when nothing is stored for
+                            [symbol] and its bars could not be downloaded
+        """
+        if end is None:
+            end = str(date.today())
+        with self.symbol_lock(symbol):
+            with self.lock:
+                coverage = self.load_index().get(symbol)
+            stored = self.read(symbol)
+            if stored is None or coverage is None or len(stored) == 0:
+                bars = self.download(symbol, start, end)
+                coverage = {"start": start, "end": end}
+            else:
+                bars, coverage = self.top_up(symbol, stored, coverage, start,
+                end)
+            if bars is not stored:
+                bars = bars[~bars.index.duplicated(keep="last")].sort_index()
+                self.write(symbol, bars)
+                with self.lock:
+                    self.load_index()[symbol] = coverage
+                    self.save_index()
+
+        return bars.loc[start:end]
+
+    def top_up(self, symbol, stored, coverage, start, end):
+        """
+        Downloads the bars of [symbol] between [start] and [end] that are
+        outside of its stored range, or every bar if the provider has
+        adjusted the stored ones since. Falls back to [stored] if a download
+        fails.
+
+        Args:
+            symbol          string
+            stored          pandas DataFrame; stored bars
+            coverage        dict; stored range, {"start": string, "end":
+                            string}
+            start           string; formatted YYYY-MM-DD
+            end             string; formatted YYYY-MM-DD
+        Returns:
+            bars,           tuple; pandas DataFrame, which is [stored] if
+            coverage        nothing was downloaded, and the dict of its range
+        """
+        pieces = [stored]
+        topped_up = dict(coverage)
+        try:
+            if start < coverage["start"]:
+                # the first stored day is downloaded again to check that the
+                # stored prices have not been adjusted since
+                first = stored.index[0]
+                earlier = self.download(symbol, start, str(first.date()))
+                if self.restated(stored, earlier, first):
+                    return self.download_again(symbol, stored, coverage,
+                    start, end)
+                pieces.insert(0, earlier)
+                topped_up["start"] = start
+            if end > coverage["end"]:
+                # the last stored day is downloaded again in case its bar was
+                # saved before the market closed, and the day before it to
+                # check that the stored prices have not been adjusted since
+                overlap = stored.index[max(len(stored) - 2, 0)]
+                later = self.download(symbol, str(overlap.date()), end)
+                if self.restated(stored, later, overlap):
+                    return self.download_again(symbol, stored, coverage,
+                    start, end)
+                pieces.append(later)
+                topped_up["end"] = end
+        except IOError as error:
+            log.warning("could not top up %s: %s", symbol, error)
+        if len(pieces) == 1:
+            return stored, coverage
+        return pd.concat(pieces), topped_up
+
+    def download_again(self, symbol, stored, coverage, start, end):
+        """
+        Downloads every bar of [symbol] over its stored range extended to
+        [start] and [end], to replace stored bars the provider has adjusted
+        since they were stored. Falls back to [stored] if the download fails.
+
+        Args:
+            symbol          string
+            stored          pandas DataFrame; stored bars
+            coverage        dict; stored range
+            start           string; formatted YYYY-MM-DD
+            end             string; formatted YYYY-MM-DD
+        Returns:
+            bars,           tuple; pandas DataFrame and the dict of its range
+            coverage
+        """
+        start = min(start, coverage["start"])
+        end = max(end, coverage["end"])
+        try:
+            return self.download(symbol, start, end), {"start": start,
+            "end": end}
+        except IOError as error:
+            log.warning("could not download %s again: %s", symbol, error)
+            return stored, coverage
+
+    def get_history(self, symbols, start, end=None, field="Adj Close"):
+        """
+        Returns the daily [field] prices of [symbols] between [start] and
+        [end] from the store.
+
+        Args:
+            symbols         string or string list
+            start           string; formatted YYYY-MM-DD
+            end             string; formatted YYYY-MM-DD, default is today
+            field           string; one of COLUMNS
+        Returns:
+            prices          pandas Series if [symbols] is a string, pandas
+                            DataFrame with one column per symbol otherwise
+        """
+        if isinstance(symbols, str):
+            return self.load(symbols, start, end)[field].rename(symbols)
+        try:
+            self.prefetch(symbols, start, end)
+        except IOError as error:
+            # each symbol is downloaded on its own by load instead
+            log.warning("could not download %s together: %s",
+            ", ".join(symbols), error)
+        return pd.concat([self.load(symbol, start, end)[field].rename(symbol)
+        for symbol in symbols], axis=1)
+
+price_store = PriceStore()
@@ -0,0 +1,184 @@
+"""
+Primary module for parameter sweeps
+
+This module contains the parameter sweep runner for the stock portfolio
+engine. Every combination of a grid of optimizer and backtest settings is
+optimized and backtested in parallel, each result is cached on disk under a
+hash of its parameters, and all results are written to one CSV file.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import os
+import json
+import hashlib
+import itertools
+import pandas as pd
+from multiprocessing import Pool
+from optimize import *
+from backtest import *
+from rates import *
+from store import DATA_DIR
+
+# settings swept by default, from the fixed ones used elsewhere in the engine
+DEFAULT_GRID = {
+    "years": [5, 10],
+    "trading_days": [TRADING_DAYS],
+    "risk_free": ["treasury", "zero"],
+    "estimator": ["sample", "ledoit_wolf", "ewma:60"],
+    "schedule": ["monthly", "quarterly"],
+    "method": ["max_sharpe", "min_volatility"],
+}
+
+# price history shared with the worker processes
+sweep_prices = None
+
+def parameter_grid(grid):
+    """
+    Returns every combination of the values in [grid].
+
+    Args:
+        grid                dict; parameter name to a list of values
+    Returns:
+        cells               dict list; one parameter name to value dict per
+                            combination
+    """
+    names = sorted(grid)
+    return [dict(zip(names, values))
+    for values in itertools.product(*[grid[name] for name in names])]
+
+def risk_free_value(source, inflation_rate=0.018):
+    """
+    Returns the risk free rate from [source]: "treasury" for the 10-year
+    treasury yield adjusted for [inflation_rate], "nominal" for the yield
+    itself, "zero", or a number.
+
+    Args:
+        source              string or float
+        inflation_rate      float
+    Returns:
+        risk_free_rate      float
+    """
+    if source == "treasury":
+        return ((1.0 + rate_service.current())/(1.0 + inflation_rate)) - 1.0
+    elif source == "nominal":
+        return rate_service.current()
+    elif source == "zero":
+        return 0.
+    return float(source)
+
+def cell_key(cell):
+    """
+    Returns the hash that a sweep result is cached under.
+
+    Args:
+        cell                dict; everything the result depends on
+    Returns:
+        key                 string; hex digest
+    """
+    text = json.dumps(cell, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def set_sweep_prices(prices):
+    """
+    Initializer for the worker processes of run_sweep.
+
+    Args:
+        prices              pandas DataFrame
+    """
+    global sweep_prices
+    sweep_prices = prices
+
+def run_cell(cell):
+    """
+    Optimizes the portfolio on the last cell["years"] years of prices with
+    the cell's settings, then backtests the optimized weights over the same
+    years. If the optimizer fails, the weights are equally distributed.
+
+    Args:
+        cell                dict; one combination of parameter_grid, with
+                            the risk free rate in cell["risk_free_rate"]
+    Returns:
+        row                 dict; the cell, the expected performance and
+                            weights of the optimized portfolio and the
+                            backtest summary
+    """
+    end = sweep_prices.index[-1]
+    prices = sweep_prices[sweep_prices.index
+    > end - pd.DateOffset(years=cell["years"])]
+    returns = prices.pct_change()
+    trading_days = cell["trading_days"]
+    risk_free_rate = cell["risk_free_rate"]
+
+    engine = StatsEngine(returns, trading_days,
+    make_estimator(cell["estimator"]))
+    try:
+        session = OptimizationSession(engine, risk_free_rate)
+        weights = getattr(session, cell["method"])()[0]
+        weights = np.array([weights[symbol] for symbol in engine.symbols])
+    except Exception:
+        weights = np.ones(len(engine.symbols)) / len(engine.symbols)
+    expected_return, expected_sd, sharpe_ratio = \
+    [float(value[0]) for value in engine.evaluate(weights, risk_free_rate)[:3]]
+
+    result = backtest(prices, weights, cell["schedule"],
+    trading_days=trading_days)
+    row = dict(cell)
+    row.update({"expected_return": expected_return,
+    "expected_volatility": expected_sd, "expected_sharpe": sharpe_ratio})
+    row.update({key: float(value) for key, value in result.summary().items()})
+    row.update({"weight_" + symbol: float(weight)
+    for symbol, weight in zip(engine.symbols, weights)})
+    return row
+
+def run_sweep(prices, grid=DEFAULT_GRID, processes=None,
+directory=os.path.join(DATA_DIR, "sweeps"), path=None):
+    """
+    Runs every combination of [grid] against [prices] across [processes]
+    worker processes. Results already cached in [directory] under the same
+    parameters, stocks, price dates and risk free rate are reused, so adding
+    a value to [grid] only runs the new combinations.
+
+    Args:
+        prices              pandas DataFrame; daily prices with one column
+                            per stock, covering the largest "years"
+        grid                dict; parameter name to a list of values, with
+                            the keys of DEFAULT_GRID
+        processes           int; default is the number of CPUs
+        directory           string; location of the cached results
+        path                string; location of the CSV file, default is
+                            sweep.csv in [directory]
+    Returns:
+        results             pandas DataFrame; one row per combination
+    """
+    if path is None:
+        path = os.path.join(directory, "sweep.csv")
+    os.makedirs(os.path.join(directory, "cells"), exist_ok=True)
+    rates = {source: risk_free_value(source)
+    for source in set(grid["risk_free"])}
+
+    cells = []
+    for cell in parameter_grid(grid):
+        cell["risk_free_rate"] = rates[cell["risk_free"]]
+        key = cell_key({"cell": cell, "symbols": list(prices.columns),
+        "start": prices.index[0], "end": prices.index[-1]})
+        cells.append((cell, os.path.join(directory, "cells", key + ".json")))
+
+    missing = [(cell, cell_path) for cell, cell_path in cells
+    if not os.path.exists(cell_path)]
+    if len(missing) > 0:
+        with Pool(processes, initializer=set_sweep_prices,
+        initargs=(prices,)) as pool:
+            rows = pool.map(run_cell, [cell for cell, _ in missing])
+        for (_, cell_path), row in zip(missing, rows):
+            with open(cell_path, "w") as f:
+                json.dump(row, f)
+
+    rows = []
+    for cell, cell_path in cells:
+        with open(cell_path) as f:
+            rows.append(json.load(f))
+    results = pd.DataFrame(rows)
+    results.to_csv(path, index=False)
+    return results
@@ -0,0 +1,273 @@
+"""
+Primary module for the symbol index
+
+This module contains the symbol index for the stock portfolio engine, a
+local copy of the symbol master that ticker symbols are checked against
+without a network request, and that companies can be looked up in by
+symbol or name.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import os
+import csv
+import time
+import bisect
+import difflib
+import threading
+from provider import *
+from store import DATA_DIR
+
+# number of seconds to wait after a failed refresh of the symbol master
+# before trying again
+RETRY_DELAY = 3600
+
+class SymbolIndex(object):
+    """
+    Keeps the symbol master in memory as a hash of symbol to record, for
+    checking symbols, and as sorted lists of symbols and lowercase names,
+    for prefix lookups with a binary search. The master is saved to [path]
+    and read from there on first use. Every lookup checks its age, so a
+    long-running server picks up a new master as well: once it is older than
+    [max_age] seconds, it is downloaded from the market data provider again
+    in the background, and the copy in memory keeps being used until the
+    download is done, or if it fails, in which case the download is tried
+    again after RETRY_DELAY seconds.
+
+    The symbol master only lists US stocks, so a symbol it does not list
+    (e.g. a foreign listing such as RY.TO or a mutual fund such as VFIAX)
+    is checked with the market data provider before it is rejected.
+
+    Args:
+        path            string; location of the symbol master CSV file
+        max_age         float; number of seconds before the saved master is
+                        refreshed, default is one week
+    """
+
+    def __init__(self, path=os.path.join(DATA_DIR, "symbols.csv"),
+    max_age=7 * 86400):
+        self.path = path
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.records = None
+        self.symbols = []
+        self.names = []
+        self.confirmed = set()
+        self.saved_at = 0.
+        self.failed_at = 0.
+        self.refresh_thread = None
+
+    def build(self, records):
+        """
+        Replaces the index with [records].
+
+        Args:
+            records         dict list; one dict with the keys of
+                            SYMBOL_FIELDS per symbol
+        """
+        self.records = dict((record["symbol"], record) for record in records)
+        self.symbols = sorted(self.records)
+        self.names = sorted((record["name"].lower(), record["symbol"])
+        for record in records)
+
+    def read(self, path):
+        """
+        Args:
+            path            string; location of a symbol master CSV file
+        Returns:
+            records         dict list
+        """
+        with open(path, newline="") as f:
+            return [dict((field, row.get(field) or "")
+            for field in SYMBOL_FIELDS) for row in csv.DictReader(f)]
+
+    def load(self, wait=False):
+        """
+        Reads the saved symbol master on first use, and starts refreshing it
+        in the background if it is missing or stale. Called on every lookup.
+
+        Args:
+            wait            bool; whether to wait for the refresh when there
+                            is no saved master to use meanwhile
+        """
+        with self.lock:
+            if self.records is None:
+                try:
+                    self.build(self.read(self.path))
+                    self.saved_at = os.path.getmtime(self.path)
+                except (IOError, OSError):
+                    self.build([])
+            now = time.time()
+            if now - self.saved_at > self.max_age \
+            and now - self.failed_at > RETRY_DELAY \
+            and (self.refresh_thread is None
+            or not self.refresh_thread.is_alive()):
+                self.refresh_thread = threading.Thread(target=self.refresh,
+                daemon=True)
+                self.refresh_thread.start()
+            thread = self.refresh_thread
+        if wait and len(self.records) == 0 and thread is not None:
+            thread.join()
+
+    def refresh(self):
+        """
+        Downloads the symbol master from the market data provider and saves
+        it. Does nothing but note the time if it cannot be downloaded.
+
+        Returns:
+            refreshed       bool; True if the master was downloaded
+        """
+        try:
+            records = get_provider().get_symbols()
+        except Exception:
+            records = []
+        if len(records) == 0:
+            with self.lock:
+                self.failed_at = time.time()
+            return False
+        with self.lock:
+            write_symbols(self.path, records)
+            self.build(records)
+            self.saved_at = time.time()
+        return True
+
+    def load_file(self, path):
+        """
+        Replaces the symbol master with the one in the CSV file at [path]
+        (with the columns of SYMBOL_FIELDS), for use without a network.
+
+        Args:
+            path            string
+        """
+        records = self.read(path)
+        with self.lock:
+            write_symbols(self.path, records)
+            self.build(records)
+            self.saved_at = time.time()
+
+    def validate(self, symbol):
+        """
+        Checks whether [symbol] is listed in the symbol master, without a
+        network request.
+
+        Args:
+            symbol          string
+        Returns:
+            valid           bool; True if [symbol] is listed or was confirmed
+                            by the market data provider before, or None if
+                            the index cannot vouch for it, in which case the
+                            provider has to be asked
+        """
+        self.load()
+        if symbol in self.records or symbol in self.confirmed:
+            return True
+        return None
+
+    def exists(self, symbol):
+        """
+        Checks whether [symbol] is a ticker symbol, with the symbol master
+        first and the market data provider for symbols it does not list.
+        Symbols the provider finds are remembered.
+
+        Args:
+            symbol          string
+        Returns:
+            exists          bool
+        """
+        if self.validate(symbol):
+            return True
+        try:
+            get_provider().get_info([symbol])
+        except Exception:
+            return False
+        self.confirm([symbol])
+        return True
+
+    def confirm(self, symbols):
+        """
+        Remembers [symbols] as ticker symbols the market data provider has
+        found, so they are not checked again.
+
+        Args:
+            symbols         string list
+        """
+        with self.lock:
+            self.confirmed.update(symbols)
+
+    def get(self, symbol):
+        """
+        Args:
+            symbol          string
+        Returns:
+            record          dict, or None if [symbol] is not listed
+        """
+        self.load(wait=True)
+        return self.records.get(symbol)
+
+    def prefix(self, text, limit=10):
+        """
+        Returns the listed symbols starting with [text], then the symbols of
+        the companies whose names start with [text].
+
+        Args:
+            text            string
+            limit           int; maximum number of symbols returned
+        Returns:
+            symbols         string list
+        """
+        self.load(wait=True)
+        matches = []
+        upper = text.upper()
+        start = bisect.bisect_left(self.symbols, upper)
+        for symbol in self.symbols[start:start + limit]:
+            if not symbol.startswith(upper):
+                break
+            matches.append(symbol)
+        lower = text.lower()
+        start = bisect.bisect_left(self.names, (lower, ""))
+        for name, symbol in self.names[start:]:
+            if len(matches) >= limit or not name.startswith(lower):
+                break
+            if symbol not in matches:
+                matches.append(symbol)
+        return matches[:limit]
+
+    def search(self, query, limit=10):
+        """
+        Looks up [query] by symbol or company name: prefix matches first,
+        followed by company names that start with something close to [query]
+        (for misspelled names), then company names that contain it.
+
+        Args:
+            query           string
+            limit           int; maximum number of records returned
+        Returns:
+            records         dict list
+        """
+        matches = self.prefix(query, limit)
+        if len(matches) < limit:
+            lower = query.lower()
+            matcher = difflib.SequenceMatcher()
+            matcher.set_seq2(lower)
+            scores = []
+            for name, symbol in self.names:
+                matcher.set_seq1(name[:len(lower)])
+                if matcher.real_quick_ratio() >= 0.75 \
+                and matcher.quick_ratio() >= 0.75:
+                    score = matcher.ratio()
+                    if score >= 0.75:
+                        scores.append((-score, symbol))
+            for score, symbol in sorted(scores):
+                if len(matches) >= limit:
+                    break
+                if symbol not in matches:
+                    matches.append(symbol)
+            for name, symbol in self.names:
+                if len(matches) >= limit:
+                    break
+                if lower in name and symbol not in matches:
+                    matches.append(symbol)
+        return [self.records[symbol] for symbol in matches[:limit]]
+
+symbol_index = SymbolIndex()
@@ -0,0 +1,108 @@
+"""
+Tests for page extraction
+
+This module checks the extraction of quote, key statistics and rate fields
+from saved Yahoo! Finance pages, through the embedded JSON state and through
+both streaming parsers.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import os
+import unittest
+from unittest import mock
+import extract
+from extract import *
+
+# folder of the saved pages, in the layout read by LocalProvider
+PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data",
+"pages")
+
+def read_page(name):
+    """
+    Args:
+        name                string; file name without ".html"
+    Returns:
+        page                bytes
+    """
+    with open(os.path.join(PAGES, name + ".html"), "rb") as f:
+        return f.read()
+
+class StreamingExtractionTest(object):
+    """
+    Checks of the streaming path, run once with lxml and once with the
+    standard library parser by the subclasses below.
+    """
+
+    def test_summary(self):
+        self.assertEqual(extract_summary(read_page("GOOG")),
+        {"price": "1,515.55", "market_cap": "1.031T"})
+
+    def test_statistics(self):
+        self.assertEqual(extract_statistics(read_page("GOOG-key-statistics")),
+        {"revenue": "166.68B", "revenue_per_share": "242.21",
+        "gross_profit": "89.96B", "operating_margin": "21.10%",
+        "return_on_assets": "7.84%", "return_on_equity": "17.00%"})
+
+    def test_rate(self):
+        self.assertEqual(extract_rate(read_page("^TNX")), {"price": "0.6840"})
+
+    def test_missing_fields(self):
+        self.assertEqual(extract_summary(read_page("^TNX")),
+        {"price": "N/A", "market_cap": "N/A"})
+
+    def test_stops_once_found(self):
+        # a thousand paragraphs follow the rate's price, and at most one
+        # chunk's worth of them reach the target before parsing stops
+        page = read_page("^TNX").replace(b"</body>",
+        b"<p>filler</p>" * 1000 + b"</body>")
+        tags = []
+
+        class CountingTarget(FieldTarget):
+            def start(self, tag, attributes):
+                FieldTarget.start(self, tag, attributes)
+                tags.append(tag)
+
+        with mock.patch.object(extract, "CHUNK_SIZE", 256), \
+        mock.patch.object(extract, "FieldTarget", CountingTarget):
+            self.assertEqual(extract_rate(page), {"price": "0.6840"})
+        self.assertLess(tags.count("p"), 50)
+
+@unittest.skipIf(lxml_etree() is None, "lxml is not installed")
+class LxmlExtractionTest(StreamingExtractionTest, unittest.TestCase):
+
+    def setUp(self):
+        lxml_etree()
+
+class HTMLParserExtractionTest(StreamingExtractionTest, unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(extract, "etree", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_uses_html_parser(self):
+        self.assertIsNone(lxml_etree())
+
+class EmbeddedStateTest(unittest.TestCase):
+
+    def test_summary_from_state(self):
+        # the price is taken from the embedded state, which differs from
+        # the price in the HTML, and the market cap, which the state does
+        # not have, from the HTML
+        self.assertEqual(extract_summary(read_page("GOOG-state")),
+        {"price": "1,520.10", "market_cap": "1.031T"})
+
+    def test_statistics_from_state_only(self):
+        with mock.patch.object(extract, "lxml_etree",
+        side_effect=AssertionError("the HTML was parsed")):
+            fields = extract_statistics(read_page("GOOG-state"))
+        self.assertEqual(fields["revenue"], "166.68B")
+        self.assertEqual(fields["return_on_equity"], "17.00%")
+
+    def test_no_state(self):
+        self.assertIsNone(embedded_state(read_page("GOOG")))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Tests for the efficient frontier
+
+This module checks that random portfolios are sampled in chunks that fit
+the memory budget, and that runs with nothing to sample are rejected.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from frontier import *
+
+class FakeEngine(object):
+    """
+    Holds the mean returns and covariance matrix of three stocks.
+    """
+
+    def __init__(self):
+        self.symbols = ["AAA", "BBB", "CCC"]
+        self.mean_returns = np.array([0.05, 0.08, 0.12])
+        self.cov_matrix = np.diag([0.01, 0.04, 0.09])
+
+class FakeSession(object):
+    """
+    Stands in for an OptimizationSession over FakeEngine.
+    """
+
+    def __init__(self):
+        self.engine = FakeEngine()
+        self.risk_free_rate = 0.02
+
+    def trace_frontier(self, n_points):
+        return None
+
+class FrontierTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "frontier.npy")
+
+    def test_rejects_no_portfolios(self):
+        for n_portfolios in (0, -5):
+            with self.assertRaises(ValueError):
+                generate_frontier(FakeSession(), n_portfolios, path=self.path)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_rejects_budget_below_one_portfolio(self):
+        with self.assertRaises(ValueError):
+            generate_frontier(FakeSession(), 10,
+            memory_budget=chunk_bytes(3) - 1, path=self.path)
+
+    def test_samples_in_chunks_of_the_budget(self):
+        # a budget of 7 portfolios splits 100 into 15 chunks
+        with generate_frontier(FakeSession(), 100,
+        memory_budget=7 * chunk_bytes(3), processes=2, path=self.path,
+        seed=0) as result:
+            samples = result.samples()
+            self.assertEqual(samples.shape, (100, 3))
+            self.assertEqual(np.isfinite(samples).all(), True)
+            self.assertAlmostEqual(result.max_sharpe[0],
+            float(samples[:, 2].max()), places=5)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Tests for the portfolio store
+
+This module checks the cost basis of purchase lots recorded out of date
+order, and that the portfolios handed out cannot change the stored ones.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from holdings import *
+
+class PortfolioStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.store = PortfolioStore(os.path.join(directory, "portfolios.db"))
+        self.addCleanup(lambda: self.store.connection.close())
+
+    def test_backdated_sale_uses_average_cost_on_its_date(self):
+        self.store.add_lot("test", "AAA", 10, 100., "2021-01-04")
+        self.store.add_lot("test", "AAA", 10, 200., "2021-03-01")
+        # a sale recorded after the second purchase, but made before it,
+        # sells the shares bought at 100
+        self.store.add_lot("test", "AAA", -10, 150., "2021-02-01")
+        self.assertEqual([lot[3] for lot in self.store.lots("test")],
+        ["2021-01-04", "2021-02-01", "2021-03-01"])
+        self.assertEqual(self.store.cost_basis("test"),
+        {"AAA": (10., 2000., 200.)})
+
+    def test_same_day_lots_keep_their_order(self):
+        self.store.add_lot("test", "AAA", 10, 100., "2021-01-04")
+        self.store.add_lot("test", "AAA", -5, 120., "2021-01-04")
+        self.store.add_lot("test", "AAA", 5, 130., "2021-01-04")
+        self.assertEqual(self.store.cost_basis("test"),
+        {"AAA": (10., 1150., 115.)})
+
+    def test_loaded_portfolio_is_a_copy(self):
+        self.store.add_symbol("test", "AAA")
+        self.store.add_symbol("test", "BBB")
+        self.store.set_weights("test", {"AAA": 0.4, "BBB": 0.6})
+        pf_dict = self.store.load("test")
+        pf_dict["Stock List"].append("CCC")
+        pf_dict["Weights"]["AAA"] = 1.
+        self.assertEqual(self.store.load("test"), {"Stock List": ["AAA",
+        "BBB"], "Weights": {"AAA": 0.4, "BBB": 0.6}})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+"""
+Tests for the local provider
+
+This module runs the engine offline against the fixture market data in
+tests/data, which is laid out the way LocalProvider reads it, with the
+STOCK_ENGINE_DATA environment variable pointing at it.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from rates import *
+from symbols import *
+from stats import *
+
+# folder of the fixture market data
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# stocks with fixture price history, and the dates it covers
+SYMBOLS = ["AAA", "BBB", "CCC"]
+START = "2021-01-01"
+END = "2021-12-31"
+
+class LocalProviderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.home = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.home)
+        for patcher in (
+            mock.patch.dict(os.environ, {"STOCK_ENGINE_DATA": FIXTURES}),
+            mock.patch.object(price_store, "directory",
+            os.path.join(self.home, "prices")),
+            mock.patch.object(price_store, "index", None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        set_provider(None)
+        self.addCleanup(set_provider, None)
+        for cache in (price_cache, series_cache, engine_cache):
+            cache.clear()
+
+    def test_environment_selects_local_provider(self):
+        self.assertIsInstance(get_provider(), LocalProvider)
+
+    def test_portfolio_calculation(self):
+        rate = RateService(path=os.path.join(self.home, "rates.json")) \
+        .current()
+        self.assertEqual(rate, 0.0152)
+        weights = np.array([0.5, 0.3, 0.2])
+        results = get_stats_engine(SYMBOLS, START, END).evaluate(weights,
+        rate)
+
+        # the same calculation straight from the fixture files
+        prices = pd.concat([pd.read_csv(os.path.join(FIXTURES, "history",
+        symbol + ".csv"), index_col=0, parse_dates=True)["Adj Close"]
+        .rename(symbol) for symbol in SYMBOLS], axis=1)
+        returns = prices.pct_change()
+        mean_returns = returns.mean().values * TRADING_DAYS
+        variance = weights.dot(returns.cov().values * TRADING_DAYS) \
+        .dot(weights)
+        expected = (weights.dot(mean_returns), np.sqrt(variance),
+        (weights.dot(mean_returns) - rate) / np.sqrt(variance), variance)
+        for result, value in zip(results, expected):
+            self.assertAlmostEqual(result[0], value, places=12)
+
+        # the bars were saved to the price store, and a second run reads
+        # them from there with the same result
+        self.assertEqual(sorted(price_store.load_index()), SYMBOLS)
+        for cache in (price_cache, series_cache, engine_cache):
+            cache.clear()
+        with mock.patch.object(LocalProvider, "get_history",
+        side_effect=AssertionError("downloaded again")):
+            again = get_stats_engine(SYMBOLS, START, END).evaluate(weights,
+            rate)
+        np.testing.assert_array_equal(np.array(again), np.array(results))
+
+    def test_historical_risk_free_rates(self):
+        from portfolio import Portfolio
+        rates = Portfolio().risk_free_rates(START, END)
+        yields = pd.read_csv(os.path.join(FIXTURES, "history", "^TNX.csv"),
+        index_col=0, parse_dates=True)["Close"] / 100.
+        np.testing.assert_allclose(rates.values,
+        ((1. + yields.values) / 1.018) - 1.)
+
+    def test_information_and_pages(self):
+        provider = get_provider()
+        self.assertEqual(provider.get_info(["AAA"])["AAA"]["longName"],
+        "Alpha Apparel Inc.")
+        self.assertEqual(provider.get_info(["AAA", "ZZZ"]).keys(), {"AAA"})
+        self.assertEqual(extract_summary(provider.get_page("GOOG"))["price"],
+        "1,515.55")
+        self.assertEqual(provider.get_rate("^TNX"), 0.0152)
+        with self.assertRaises(IOError):
+            provider.get_page("ZZZ")
+
+    def test_symbol_index(self):
+        index = SymbolIndex(path=os.path.join(self.home, "symbols.csv"))
+        self.assertEqual([record["symbol"] for record in
+        index.search("alph")], ["AAA", "GOOG"])
+        self.assertTrue(index.validate("AAA"))
+        self.assertIsNone(index.validate("RY.TO"))
+
+    def test_symbol_index_refreshes_when_stale(self):
+        index = SymbolIndex(path=os.path.join(self.home, "symbols.csv"))
+        index.get("AAA")
+        records = get_provider().get_symbols() + [{"symbol": "NEW",
+        "name": "New Listing Inc.", "exchange": "NYSE", "sector": "",
+        "status": "active"}]
+        with mock.patch.object(LocalProvider, "get_symbols",
+        return_value=records) as get_symbols:
+            self.assertIsNone(index.validate("NEW"))
+            self.assertEqual(get_symbols.call_count, 0)
+            # a week later, the next lookup refreshes the master
+            index.saved_at -= index.max_age + 1
+            index.validate("AAA")
+            index.refresh_thread.join()
+            self.assertTrue(index.validate("NEW"))
+            self.assertEqual(index.search("new listing")[0]["symbol"], "NEW")
+            self.assertEqual(get_symbols.call_count, 1)
+
+    def test_symbol_index_waits_after_failed_refresh(self):
+        index = SymbolIndex(path=os.path.join(self.home, "symbols.csv"))
+        index.get("AAA")
+        index.saved_at -= index.max_age + 1
+        with mock.patch.object(LocalProvider, "get_symbols",
+        side_effect=IOError("symbol directory unavailable")) as get_symbols:
+            for i in range(3):
+                self.assertTrue(index.validate("AAA"))
+                index.refresh_thread.join()
+            self.assertEqual(get_symbols.call_count, 1)
+
+class FetchConcurrentlyTest(unittest.TestCase):
+
+    def test_timeout_counts_from_each_call_start(self):
+        def fetch(item):
+            time.sleep(1. if item == "slow" else 0.05)
+            return item
+
+        # the calls queued behind the slow one wait for its thread, but
+        # their own time only starts once they run
+        results, failures = fetch_concurrently(fetch, ["slow", "a", "b",
+        "c"], max_workers=1, timeout=0.3)
+        self.assertEqual(results, {"a": "a", "b": "b", "c": "c"})
+        self.assertEqual(list(failures), ["slow"])
+        self.assertIsInstance(failures["slow"], TimeoutError)
+
+    def test_errors_are_reported_per_item(self):
+        def fetch(item):
+            if item == "bad":
+                raise KeyError(item)
+            return item
+
+        results, failures = fetch_concurrently(fetch, ["a", "bad", "b"])
+        self.assertEqual(results, {"a": "a", "b": "b"})
+        self.assertIsInstance(failures["bad"], KeyError)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Tests for historical risk free rates
+
+This module checks that backtests and rolling statistics measure their
+Sharpe ratios over the risk free rate of the days they cover.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+from backtest import *
+from rolling import *
+
+def make_prices(n_days=500, seed=0):
+    """
+    Args:
+        n_days              int
+        seed                int
+    Returns:
+        prices              pandas DataFrame; random walk prices of two
+                            stocks
+    """
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range("2020-01-01", periods=n_days)
+    return pd.DataFrame(100. * np.cumprod(1. + rng.normal(0.0005, 0.01,
+    (n_days, 2)), axis=0), index=days, columns=["AAA", "BBB"])
+
+def make_rates(days):
+    """
+    Args:
+        days                pandas DatetimeIndex
+    Returns:
+        rates               pandas Series; an annual rate of 1% that rises
+                            to 4% halfway through [days], given on calendar
+                            days only from the tenth day on
+    """
+    calendar = pd.date_range(days[10], days[-1])
+    return pd.Series(np.where(calendar < days[len(days) // 2], 0.01, 0.04),
+    index=calendar)
+
+class RiskFreeRateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.prices = make_prices()
+        self.rates = make_rates(self.prices.index)
+
+    def test_align_rates(self):
+        days = self.prices.index
+        rates = align_rates(self.rates, days)
+        # days before the first rate take the first rate
+        np.testing.assert_array_equal(rates[:len(days) // 2], 0.01)
+        np.testing.assert_array_equal(rates[len(days) // 2:], 0.04)
+        np.testing.assert_array_equal(align_rates(0.03, days), 0.03)
+
+    def test_backtest_sharpe_uses_average_rate(self):
+        weights = np.array([0.5, 0.5])
+        result = backtest(self.prices, weights, risk_free_rate=self.rates)
+        summary = result.summary()
+        daily = result.nav.pct_change().dropna()
+        average_rate = align_rates(self.rates, daily.index).mean()
+        self.assertAlmostEqual(summary["sharpe_ratio"],
+        (summary["annual_return"] - average_rate) / summary["volatility"])
+        flat = backtest(self.prices, weights, risk_free_rate=average_rate)
+        self.assertAlmostEqual(flat.summary()["sharpe_ratio"],
+        summary["sharpe_ratio"])
+
+    def test_rolling_sharpe_uses_window_rate(self):
+        returns = self.prices.pct_change().iloc[1:]
+        window = 60
+        statistics = rolling_statistics(returns, returns["BBB"], window,
+        risk_free_rate=self.rates)
+        rates = align_rates(self.rates, returns.index)
+        for t in (window - 1, len(returns) // 2 + 10, len(returns) - 1):
+            average_rate = rates[t + 1 - window:t + 1].mean()
+            expected = (statistics["return"].iloc[t]
+            - average_rate) / statistics["volatility"].iloc[t]
+            np.testing.assert_allclose(statistics["sharpe"].iloc[t],
+            expected)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Tests for the statistics engine
+
+This module checks that the statistics engine matches a fresh calculation
+when it is rolled forward from one day's window to the next.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from stats import *
+
+def make_prices(n_days=600, seed=0):
+    """
+    Args:
+        n_days              int
+        seed                int
+    Returns:
+        prices              pandas DataFrame; random walk prices of three
+                            stocks, the last of which starts later
+    """
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range("2020-01-01", periods=n_days)
+    returns = rng.normal(0.0005, 0.01, (n_days, 3))
+    prices = pd.DataFrame(100. * np.cumprod(1. + returns, axis=0),
+    index=days, columns=["AAA", "BBB", "CCC"])
+    prices.iloc[:50, 2] = np.nan
+    return prices
+
+class RollingEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.prices = make_prices()
+        self.symbols = list(self.prices.columns)
+        series_cache.clear()
+        engine_cache.clear()
+
+    def window(self, first, last):
+        """
+        Caches the return series of the prices between day positions [first]
+        and [last] the way get_return_series would, and returns its dates.
+        """
+        start = str(self.prices.index[first].date())
+        end = str(self.prices.index[last].date())
+        series_cache.put((tuple(self.symbols), start, end),
+        ReturnSeries(self.prices.iloc[first:last + 1]))
+        return start, end
+
+    def assert_matches_fresh(self, engine, first, last, estimator=None):
+        returns = self.prices.iloc[first:last + 1].pct_change()
+        fresh = StatsEngine(returns, estimator=None if estimator is None
+        else make_estimator(estimator))
+        np.testing.assert_allclose(engine.mean_returns, fresh.mean_returns)
+        np.testing.assert_allclose(engine.cov_matrix, fresh.cov_matrix,
+        rtol=1e-8, atol=1e-12)
+
+    def test_default_engine_matches_pandas(self):
+        returns = self.prices.pct_change()
+        engine = StatsEngine(returns)
+        np.testing.assert_allclose(engine.cov_matrix,
+        returns.cov().values * TRADING_DAYS)
+
+    def test_next_day_reuses_engine(self):
+        for estimator in (None, "sample", "ledoit_wolf", "semicovariance"):
+            engine_cache.clear()
+            start, end = self.window(0, 400)
+            day_n = get_stats_engine(self.symbols, start, end, estimator)
+            cov_matrix = day_n.cov_matrix.copy()
+            # the window keeps its length but moves forward a week, and the
+            # engine is rolled forward from day N's running sums without
+            # being fitted again
+            start, end = self.window(5, 405)
+            with mock.patch.object(type(day_n.estimator), "fit",
+            side_effect=AssertionError("estimator refitted")):
+                day_n1 = get_stats_engine(self.symbols, start, end,
+                estimator)
+            self.assertIsInstance(day_n1.estimator, type(day_n.estimator))
+            self.assert_matches_fresh(day_n1, 5, 405, estimator)
+            # day N's engine may still be in use, so it is left as it was
+            np.testing.assert_array_equal(day_n.cov_matrix, cov_matrix)
+            self.assertIs(get_stats_engine(self.symbols, start, end,
+            estimator), day_n1)
+
+    def test_rolls_past_a_later_listing(self):
+        start, end = self.window(20, 420)
+        get_stats_engine(self.symbols, start, end)
+        start, end = self.window(80, 480)
+        with mock.patch.object(PairwiseCovariance, "fit",
+        side_effect=AssertionError("estimator refitted")):
+            engine = get_stats_engine(self.symbols, start, end)
+        self.assert_matches_fresh(engine, 80, 480)
+
+    def test_earlier_window_is_rebuilt(self):
+        start, end = self.window(100, 500)
+        engine = get_stats_engine(self.symbols, start, end)
+        start, end = self.window(90, 490)
+        self.assertIsNot(get_stats_engine(self.symbols, start, end), engine)
+
+    def test_restated_prices_rebuild_engine(self):
+        start, end = self.window(0, 400)
+        engine = get_stats_engine(self.symbols, start, end)
+        # a dividend paid on day 200 is adjusted for in the prices before it,
+        # which changes the return of day 200 in both windows
+        self.prices.iloc[:200, 0] *= 0.98
+        for first, last in ((0, 400), (5, 405)):
+            start, end = self.window(first, last)
+            rebuilt = get_stats_engine(self.symbols, start, end)
+            self.assertIsNot(rebuilt, engine)
+            self.assert_matches_fresh(rebuilt, first, last)
+
+    def test_split_keeps_engine(self):
+        start, end = self.window(0, 400)
+        get_stats_engine(self.symbols, start, end)
+        # a split divides every earlier price alike and leaves the returns
+        # as they were, so the engine is still rolled forward
+        self.prices.iloc[:, 1] /= 4.
+        start, end = self.window(5, 405)
+        with mock.patch.object(PairwiseCovariance, "fit",
+        side_effect=AssertionError("estimator refitted")):
+            engine = get_stats_engine(self.symbols, start, end)
+        self.assert_matches_fresh(engine, 5, 405)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Tests for the price store
+
+This module checks that the price store only joins downloaded bars onto
+stored ones adjusted the same way, and that a failed download of many
+symbols falls back to downloading them one at a time.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from store import *
+
+# trading days the fake provider serves
+DAYS = pd.bdate_range("2021-01-04", periods=120)
+
+class SplitProvider(MarketDataProvider):
+    """
+    Serves the bars of stocks whose prices are all divided by 4 once
+    [split] is set, the way Yahoo! Finance adjusts past prices after a 4:1
+    split, and records every request. Requests for many symbols at once
+    fail with [batch_error] if it is set, and leave out the symbols in
+    [left_out].
+    """
+
+    def __init__(self, symbols):
+        rng = np.random.default_rng(0)
+        self.prices = pd.DataFrame(100. * np.cumprod(1. + rng.normal(0.,
+        0.01, (len(DAYS), len(symbols))), axis=0), index=DAYS,
+        columns=symbols)
+        self.split = False
+        self.batch_error = None
+        self.left_out = ()
+        self.requests = []
+
+    def adjusted(self, symbol):
+        return self.prices[symbol] / (4. if self.split else 1.)
+
+    def get_history(self, symbols, start, end):
+        self.requests.append((tuple(symbols), start, end))
+        if len(symbols) > 1 and self.batch_error is not None:
+            raise self.batch_error
+        history = {}
+        for symbol in symbols:
+            if len(symbols) > 1 and symbol in self.left_out:
+                continue
+            prices = self.adjusted(symbol).loc[start:end]
+            bars = pd.DataFrame({column: prices for column in COLUMNS})
+            bars["Volume"] = 1000.
+            bars.index.name = "Date"
+            history[symbol] = bars
+        return history
+
+class PriceStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.store = PriceStore(self.directory)
+        self.provider = SplitProvider(["AAA", "BBB"])
+        set_provider(self.provider)
+        self.addCleanup(set_provider, None)
+
+    def day(self, position):
+        return str(DAYS[position].date())
+
+    def assert_adjusted(self, bars, symbol, first, last):
+        expected = self.provider.adjusted(symbol).iloc[first:last + 1]
+        np.testing.assert_allclose(bars["Adj Close"].values, expected.values)
+        self.assertGreater(bars["Adj Close"].pct_change().min(), -0.5)
+
+    def test_top_up_downloads_only_new_days(self):
+        self.store.load("AAA", self.day(0), self.day(59))
+        bars = self.store.load("AAA", self.day(0), self.day(119))
+        self.assert_adjusted(bars, "AAA", 0, 119)
+        self.assertEqual(self.provider.requests[-1],
+        (("AAA",), self.day(58), self.day(119)))
+
+    def test_split_after_last_stored_day(self):
+        self.store.load("AAA", self.day(0), self.day(59))
+        self.provider.split = True
+        bars = self.store.load("AAA", self.day(0), self.day(119))
+        self.assert_adjusted(bars, "AAA", 0, 119)
+        # the stored bars were replaced, not joined onto
+        self.assert_adjusted(self.store.read("AAA"), "AAA", 0, 119)
+        self.assertEqual(self.provider.requests[-1],
+        (("AAA",), self.day(0), self.day(119)))
+
+    def test_split_before_first_stored_day(self):
+        self.store.load("AAA", self.day(30), self.day(59))
+        self.provider.split = True
+        bars = self.store.load("AAA", self.day(0), self.day(59))
+        self.assert_adjusted(bars, "AAA", 0, 59)
+
+    def test_failed_batch_falls_back_to_each_symbol(self):
+        self.provider.batch_error = IOError("batch download failed")
+        with self.assertLogs("store", "WARNING"):
+            prices = self.store.get_history(["AAA", "BBB"], self.day(0),
+            self.day(59))
+        self.assertEqual(list(prices.columns), ["AAA", "BBB"])
+        self.assertEqual(prices.notna().all().all(), True)
+
+    def test_symbol_left_out_of_batch(self):
+        self.provider.left_out = ("BBB",)
+        prices = self.store.get_history(["AAA", "BBB"], self.day(0),
+        self.day(59))
+        self.assert_adjusted(self.store.read("BBB"), "BBB", 0, 59)
+        self.assertEqual(self.provider.requests[-1],
+        (("BBB",), self.day(0), self.day(59)))
+        self.assertEqual(prices.notna().all().all(), True)
+
+if __name__ == "__main__":
+    unittest.main()
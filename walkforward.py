@@ -0,0 +1,143 @@
+"""
+Primary module for walk-forward backtests
+
+This module contains the walk-forward optimizer for the stock portfolio
+engine. On every rebalance date the portfolio is re-optimized on a trailing
+window of returns only, and those weights are held over the following
+out-of-sample period. The windows are optimized in parallel across a pool of
+processes that share one copy of the return matrix.
+
+Daisy Shu
+October 17th, 2026
+"""
+
+import numpy as np
+import pandas as pd
+from multiprocessing import Pool, shared_memory
+from backtest import *
+from covariance import *
+from stats import TRADING_DAYS, align_rates
+
+class WalkForwardResult(BacktestResult):
+    """
+    Holds the output of a walk-forward backtest: the out-of-sample net asset
+    value and turnover of a BacktestResult, plus the weights chosen on each
+    rebalance date.
+
+    Args:
+        result              BacktestResult
+        weights             pandas DataFrame; weights chosen on each
+                            rebalance date, one column per stock
+    """
+
+    def __init__(self, result, weights):
+        BacktestResult.__init__(self, result.nav, result.turnover,
+        result.costs, result.trading_days, result.risk_free_rate)
+        self.weights = weights
+
+def optimize_window(task):
+    """
+    Optimizes the weights for one rebalance date. Runs in a worker process,
+    reading the trailing window of returns from shared memory. If the
+    optimizer fails, the weights are equally distributed.
+
+    Args:
+        task                tuple; (shared memory name, shape of the return
+                            matrix, first day of the window, rebalance day,
+                            method, covariance estimator spec, risk free
+                            rate, trading days)
+    Returns:
+        weights             numpy array
+    """
+    name, shape, start, end, method, estimator, risk_free_rate, \
+    trading_days = task
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        window = np.array(np.ndarray(shape, dtype=np.float64,
+        buffer=shm.buf)[start:end])
+    finally:
+        shm.close()
+
+    n_stocks = shape[1]
+    mean_returns = np.nanmean(window, axis=0) * trading_days
+    if estimator is None:
+        estimator = "sample"
+    cov_matrix = make_estimator(estimator).fit(window).covariance() \
+    * trading_days
+    from pypfopt.efficient_frontier import EfficientFrontier
+    try:
+        ef = EfficientFrontier(mean_returns, cov_matrix)
+        if method == "max_sharpe":
+            ef.max_sharpe(risk_free_rate)
+        else:
+            ef.min_volatility()
+        weights = np.array([ef.clean_weights()[i] for i in range(n_stocks)])
+        return weights / weights.sum()
+    except Exception:
+        return np.ones(n_stocks) / n_stocks
+
+def walk_forward(prices, method="max_sharpe", lookback=756,
+schedule="quarterly", estimator=None, risk_free_rate=0., cost=0.001,
+processes=None, trading_days=TRADING_DAYS):
+    """
+    Runs a walk-forward backtest of the stocks in [prices]. On the first
+    trading day of every [schedule] period that has [lookback] days of
+    returns behind it, the portfolio is optimized with [method] on those
+    returns only, then held until the next rebalance, maximizing the Sharpe
+    ratio over the risk free rate on the rebalance date. The optimizations
+    run in parallel across [processes] worker processes.
+
+    Args:
+        prices              pandas DataFrame; daily prices with one column
+                            per stock
+        method              string; "max_sharpe" or "min_volatility"
+        lookback            int; number of trading days in each training
+                            window, default is 756 (three years)
+        schedule            string; "monthly", "quarterly" or "yearly"
+        estimator           string; covariance estimator spec, default is
+                            None for the sample covariance
+        risk_free_rate      float, or pandas Series of the annual risk free
+                            rate indexed by date
+        cost                float; transaction cost per unit traded
+        processes           int; default is the number of CPUs
+        trading_days        int
+    Returns:
+        result              WalkForwardResult; out-of-sample results, which
+                            start on the first rebalance date
+    Raises:
+        NotEnoughHistory    exception raised when no rebalance date has
+                            [lookback] days of prices of every stock behind
+                            it
+    """
+    prices = prices.ffill().dropna()
+    returns = prices.pct_change().fillna(0.).values.astype(np.float64)
+    rebalances = calendar_rebalances(prices.index, schedule)
+    rebalances = rebalances[rebalances >= lookback]
+    if len(rebalances) == 0:
+        raise NotEnoughHistory("not enough history for a " + str(lookback)
+        + "-day lookback")
+
+    shm = shared_memory.SharedMemory(create=True, size=returns.nbytes)
+    np.ndarray(returns.shape, dtype=np.float64, buffer=shm.buf)[:] = returns
+    rates = align_rates(risk_free_rate, prices.index[rebalances])
+    tasks = [(shm.name, returns.shape, day - lookback, day, method, estimator,
+    rate, trading_days) for day, rate in zip(rebalances, rates)]
+    try:
+        with Pool(processes) as pool:
+            weights = np.array(pool.map(optimize_window, tasks))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    out_of_sample = prices.iloc[rebalances[0]:]
+    result = simulate(out_of_sample, rebalances - rebalances[0], weights,
+    cost, trading_days=trading_days, risk_free_rate=risk_free_rate)
+    return WalkForwardResult(result, pd.DataFrame(weights,
+    index=prices.index[rebalances], columns=prices.columns))
+
+class NotEnoughHistory(ValueError):
+    """
+    Raised when the stocks do not have enough prices in common for a
+    walk-forward backtest.
+    """
+    pass